@@ -0,0 +1,29 @@
+import logging
+
+from aiohttp import web
+
+from ledfx.api import RestEndpoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AudioAnalysisEndpoint(RestEndpoint):
+    """REST end-point for querying the live audio analyses"""
+
+    ENDPOINT_PATH = "/api/audio/analysis"
+
+    async def get(self) -> web.Response:
+        """
+        Get which audio analyses are live, how many active effects consume
+        each and what each costs in microseconds per audio block
+
+        Returns:
+            web.Response: The response containing the analysis stats.
+        """
+        if self._ledfx.audio is None:
+            return await self.bare_request_success(
+                {"active": False, "analyses": {}}
+            )
+        return await self.bare_request_success(
+            self._ledfx.audio.get_analysis_stats()
+        )
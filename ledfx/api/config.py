@@ -90,6 +90,8 @@ class ConfigEndpoint(RestEndpoint):
         Returns:
             web.Response: The response indicating the success of the operation.
         """
+        # saves are written behind, get them into the backup
+        self._ledfx.config_writer.flush()
         create_backup(self._ledfx.config_dir, "DELETE")
         self._ledfx.config = CORE_CONFIG_SCHEMA({})
 
@@ -133,7 +135,8 @@ class ConfigEndpoint(RestEndpoint):
                     return await self.internal_error(msg, "error")
 
             # if we got this far, we are happy with and committing to the import config
-            # so backup the old one
+            # so backup the old one, with any saves not written yet
+            self._ledfx.config_writer.flush()
             create_backup(self._ledfx.config_dir, "IMPORT")
 
             audio_config = AudioInputSource.AUDIO_CONFIG_SCHEMA.fget()(
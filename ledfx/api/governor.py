@@ -0,0 +1,25 @@
+import logging
+
+from aiohttp import web
+
+from ledfx.api import RestEndpoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GovernorEndpoint(RestEndpoint):
+    """REST end-point for querying the frame rate governor"""
+
+    ENDPOINT_PATH = "/api/governor"
+
+    async def get(self) -> web.Response:
+        """
+        Get the load measured by the frame rate governor, the virtuals it
+        is holding below their refresh rate and its latest decisions
+
+        Returns:
+            web.Response: The response containing the governor statistics.
+        """
+        return await self.bare_request_success(
+            self._ledfx.governor.get_stats()
+        )
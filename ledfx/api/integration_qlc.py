@@ -39,8 +39,8 @@ class QLCEndpoint(RestEndpoint):
 
         # generate dict of {effect_id: effect_name}
         effect_names = []
-        for effect_type, effect in self._ledfx.effects.classes().items():
-            effect_names.append(effect.NAME)
+        for effect_type in self._ledfx.effects.types():
+            effect_names.append(self._ledfx.effects.info(effect_type)["name"])
 
         scene_ids = []
         for scene in self._ledfx.config["scenes"]:
@@ -0,0 +1,44 @@
+import logging
+
+from aiohttp import web
+
+from ledfx.api import RestEndpoint
+from ledfx.perf import get_perf_stats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PerfEndpoint(RestEndpoint):
+    """REST end-point for querying per-stage frame timings"""
+
+    ENDPOINT_PATH = "/api/perf"
+
+    async def get(self) -> web.Response:
+        """
+        Get the rolling p50/p95/p99/max timings in milliseconds of each
+        pipeline stage for every active virtual and device, along with the
+        config file writes
+
+        Returns:
+            web.Response: The response containing the frame timings.
+        """
+        stats = get_perf_stats(self._ledfx)
+        stats["config_writes"] = self._ledfx.config_writer.get_stats()
+        return await self.bare_request_success(stats)
+
+    async def delete(self) -> web.Response:
+        """
+        Clear the frame timings of every virtual and device and the config
+        write statistics
+
+        Returns:
+            web.Response: The response indicating the timings were cleared.
+        """
+        for virtual in self._ledfx.virtuals.values():
+            virtual.perf.clear()
+        for device in self._ledfx.devices.values():
+            device.perf.clear()
+        self._ledfx.config_writer.clear()
+        return await self.request_success(
+            type="info", message="Frame timings cleared"
+        )
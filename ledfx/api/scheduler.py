@@ -0,0 +1,25 @@
+import logging
+
+from aiohttp import web
+
+from ledfx.api import RestEndpoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchedulerEndpoint(RestEndpoint):
+    """REST end-point for querying the frame scheduler"""
+
+    ENDPOINT_PATH = "/api/scheduler"
+
+    async def get(self) -> web.Response:
+        """
+        Get the refresh rate groups of the frame scheduler along with the
+        scheduling lag and overruns of each virtual
+
+        Returns:
+            web.Response: The response containing the scheduler statistics.
+        """
+        return await self.bare_request_success(
+            self._ledfx.scheduler.get_stats()
+        )
@@ -11,6 +11,7 @@ import voluptuous as vol
 from aiohttp import web
 
 from ledfx.api import RestEndpoint
+from ledfx.config import Transmission
 from ledfx.dedupequeue import VisDeduplicateQ
 from ledfx.events import Event
 from ledfx.utils import empty_queue
@@ -19,6 +20,17 @@ _LOGGER = logging.getLogger(__name__)
 MAX_PENDING_MESSAGES = 256
 MAX_VAL = 32767
 
+# Binary visualisation frames start with a fixed little endian header of
+# version, flags (bit 0 set for devices), visualisation index, rows, columns
+# and sequence number, followed by the raw RGB bytes of the frame
+BINARY_FRAME_VERSION = 1
+BINARY_FRAME_HEADER = struct.Struct("<BBHHHI")
+BINARY_FRAME_DEVICE = 0x01
+# Key of the queued message holding the bytes of a binary frame
+BINARY_MESSAGE_KEY = "_binary"
+# Key of the queued message holding an already JSON encoded message
+ENCODED_MESSAGE_KEY = "_json"
+
 BASE_MESSAGE_SCHEMA = vol.Schema(
     {
         vol.Required("id"): vol.Coerce(int),
@@ -51,25 +63,149 @@ WEB_AUDIO_CLIENTS = set()
 ACTIVE_AUDIO_STREAM = None
 
 
+class EncodedEvent:
+    """
+    An event being broadcast to websocket subscribers.
+
+    Each JSON encoding of the event is built the first time a subscriber
+    needs it and then shared by every other subscriber.
+    """
+
+    __slots__ = ("event", "event_dict", "_bodies")
+
+    def __init__(self, event):
+        self.event = event
+        self.event_dict = event.to_dict()
+        self._bodies = {}
+
+    def body(self, transmission_mode=None):
+        """
+        Returns the event encoded as the tail of a JSON object, ready to
+        follow the per subscription fields of a message.
+
+        Args:
+            transmission_mode (str): Re-encodes the pixels of a
+                visualisation update in this mode, None keeps the pixels
+                in the configured mode they were encoded in.
+        """
+        body = self._bodies.get(transmission_mode)
+        if body is None:
+            event_dict = self.event_dict
+            if transmission_mode is not None:
+                event_dict = {
+                    **event_dict,
+                    "pixels": encode_pixels(self.event.rgb, transmission_mode),
+                }
+            # drop the opening brace, the message prefix provides it
+            body = self._bodies[transmission_mode] = json.dumps(event_dict)[1:]
+        return body
+
+
+def encode_pixels(rgb, transmission_mode):
+    """Encodes raw RGB bytes for a JSON visualisation update"""
+    if transmission_mode == Transmission.BASE64_COMPRESSED:
+        return pybase64.b64encode(rgb).decode("ASCII")
+    return np.frombuffer(rgb, dtype=np.uint8).reshape(-1, 3).T.tolist()
+
+
+class WebsocketBroadcaster:
+    """
+    Fans events out to the subscriptions of every websocket connection.
+
+    Rather than each connection listening for events and encoding each one
+    itself, the broadcaster holds a single listener per event type and
+    encodes each event once for all the subscribed connections.
+    """
+
+    def __init__(self, ledfx):
+        self._ledfx = ledfx
+        # event type -> {(connection, subscription id): event filter}
+        self._subscriptions = {}
+        self._remove_listeners = {}
+
+    def subscribe(self, connection, id, event_type, event_filter=None):
+        """
+        Subscribes a websocket connection to an event type.
+
+        Args:
+            connection (WebsocketConnection): The subscribing connection.
+            id (int): The ID of the subscription.
+            event_type (str): The event type to subscribe to.
+            event_filter (dict): Only events with these values are sent.
+
+        Returns:
+            callable: Removes the subscription.
+        """
+        subscriptions = self._subscriptions.setdefault(event_type, {})
+        if not subscriptions:
+            self._remove_listeners[event_type] = (
+                self._ledfx.events.add_listener(self._broadcast, event_type)
+            )
+        key = (connection, id)
+        subscriptions[key] = event_filter or {}
+
+        def unsubscribe():
+            if subscriptions.pop(key, None) is None:
+                return
+            if not subscriptions:
+                self._subscriptions.pop(event_type, None)
+                self._remove_listeners.pop(event_type)()
+
+        return unsubscribe
+
+    def _broadcast(self, event):
+        subscriptions = self._subscriptions.get(event.event_type)
+        if not subscriptions:
+            return
+
+        encoded = EncodedEvent(event)
+        event_dict = encoded.event_dict
+        for (connection, id), event_filter in list(subscriptions.items()):
+            if any(
+                event_dict.get(key) != value
+                for key, value in event_filter.items()
+            ):
+                continue
+            try:
+                connection.send_encoded_event(id, encoded)
+            except TypeError as err:
+                _LOGGER.error(
+                    "Unable to serialize to JSON: %s\n%s", err, event_dict
+                )
+                return
+
+
 class WebsocketEndpoint(RestEndpoint):
     ENDPOINT_PATH = "/api/websocket"
 
+    def __init__(self, ledfx):
+        super().__init__(ledfx)
+        self._broadcaster = WebsocketBroadcaster(ledfx)
+
     async def get(self, request) -> web.Response:
         try:
-            return await WebsocketConnection(self._ledfx).handle(request)
+            return await WebsocketConnection(
+                self._ledfx, self._broadcaster
+            ).handle(request)
         except ConnectionResetError:
             _LOGGER.debug("Connection Reset Error on Websocket Connection.")
             return self.internal_error("Connection Reset Error.")
 
 
 class WebsocketConnection:
-    def __init__(self, ledfx):
+    def __init__(self, ledfx, broadcaster):
         self._ledfx = ledfx
+        self._broadcaster = broadcaster
         self._socket = None
         self._listeners = {}
         self._receiver_task = None
         self._sender_task = None
         self._sender_queue = VisDeduplicateQ(maxsize=MAX_PENDING_MESSAGES)
+        # None follows the configured transmission mode
+        self._transmission_mode = None
+        # binary frames refer to each virtual/device by a per connection index
+        self._vis_indexes = {}
+        self._vis_sequences = []
 
     def close(self):
         """
@@ -138,6 +274,80 @@ class WebsocketConnection:
 
         return self.send({"id": id, "type": "event", **event.to_dict()})
 
+    def send_encoded_event(self, id, encoded):
+        """
+        Sends an event notification using the encodings shared between all
+        the connections. Visualisation updates are sent in the transmission
+        mode negotiated by this connection.
+
+        Args:
+            id (int): The ID of the subscription.
+            encoded (EncodedEvent): The event being broadcast.
+        """
+        event = encoded.event
+        mode = None
+        if event.event_type == Event.VISUALISATION_UPDATE:
+            mode = self._transmission_mode
+            if mode == self._ledfx.config["transmission_mode"] or (
+                event.rgb is None
+            ):
+                mode = None
+            elif mode == Transmission.BINARY:
+                return self.send_binary_frame(id, event)
+
+        return self.send(
+            {
+                "event_type": event.event_type,
+                "vis_id": encoded.event_dict.get("vis_id"),
+                ENCODED_MESSAGE_KEY: f'{{"id": {id}, "type": "event", '
+                + encoded.body(mode),
+            }
+        )
+
+    def send_binary_frame(self, id, event):
+        """
+        Sends a visualisation update as a binary message. The first frame
+        of each virtual or device is preceded by a visualisation_index
+        message mapping its index in the binary header to its id.
+
+        Args:
+            id (int): The ID of the subscription.
+            event (VisualisationUpdateEvent): The visualisation update.
+        """
+        key = (event.is_device, event.vis_id)
+        index = self._vis_indexes.get(key)
+        if index is None:
+            index = self._vis_indexes[key] = len(self._vis_sequences)
+            self._vis_sequences.append(0)
+            self.send(
+                {
+                    "id": id,
+                    "type": "visualisation_index",
+                    "index": index,
+                    "is_device": event.is_device,
+                    "vis_id": event.vis_id,
+                }
+            )
+
+        sequence = self._vis_sequences[index]
+        self._vis_sequences[index] = (sequence + 1) & 0xFFFFFFFF
+        rows, columns = event.shape
+        header = BINARY_FRAME_HEADER.pack(
+            BINARY_FRAME_VERSION,
+            BINARY_FRAME_DEVICE if event.is_device else 0,
+            index,
+            rows,
+            columns,
+            sequence,
+        )
+        return self.send(
+            {
+                "event_type": event.event_type,
+                "vis_id": event.vis_id,
+                BINARY_MESSAGE_KEY: header + event.rgb,
+            }
+        )
+
     async def _sender(self):
         """
         Async write loop to pull from the queue and send
@@ -152,6 +362,12 @@ class WebsocketConnection:
             message = await self._sender_queue.get()
             try:
                 # _LOGGER.debug("Sending websocket message")
+                if message is not None and ENCODED_MESSAGE_KEY in message:
+                    await self._socket.send_str(message[ENCODED_MESSAGE_KEY])
+                    continue
+                if message is not None and BINARY_MESSAGE_KEY in message:
+                    await self._socket.send_bytes(message[BINARY_MESSAGE_KEY])
+                    continue
                 await self._socket.send_json(message, dumps=json.dumps)
             except TypeError as err:
                 _LOGGER.error(
@@ -266,9 +482,6 @@ class WebsocketConnection:
 
     @websocket_handler("subscribe_event")
     def subscribe_event_handler(self, message):
-        def notify_websocket(event):
-            self.send_event(message["id"], event)
-
         # Some events are not subscribable - send an error message if the user tries to subscribe to one with a hint on what to use instead
         if message.get("event_type") in NON_SUBSCRIBABLE_EVENTS.keys():
             msg = f"Websocket cannot subscribe to {message.get('event_type')} events - use {NON_SUBSCRIBABLE_EVENTS[message.get('event_type')]} instead"
@@ -280,8 +493,9 @@ class WebsocketConnection:
         _LOGGER.debug(
             f"Websocket subscribing to event {message.get('event_type')} with filter {message.get('event_filter')}"
         )
-        self._listeners[message["id"]] = self._ledfx.events.add_listener(
-            notify_websocket,
+        self._listeners[message["id"]] = self._broadcaster.subscribe(
+            self,
+            message["id"],
             message.get("event_type"),
             message.get("event_filter", {}),
         )
@@ -299,6 +513,30 @@ class WebsocketConnection:
                 f"Unsubscibe unknown subscription ID {subscription_id}"
             )
 
+    @websocket_handler("set_transmission_mode")
+    def set_transmission_mode_handler(self, message):
+        mode = message.get("transmission_mode")
+        if mode is not None and mode not in (
+            *Transmission.get_list(),
+            Transmission.BINARY,
+        ):
+            self.send_error(
+                message["id"], f"Unknown transmission mode {mode}."
+            )
+            return
+
+        _LOGGER.debug(f"Websocket transmission mode set to {mode}")
+        self._transmission_mode = mode
+        self.send(
+            {
+                "id": message["id"],
+                "success": True,
+                "type": "transmission_mode",
+                "transmission_mode": mode
+                or self._ledfx.config["transmission_mode"],
+            }
+        )
+
     @websocket_handler("audio_stream_start")
     def audio_stream_start_handler(self, message):
         client = message.get("client")
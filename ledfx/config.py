@@ -4,6 +4,9 @@ import logging
 import os
 import shutil
 import sys
+import threading
+import time
+from collections import deque
 
 import voluptuous as vol
 from pkg_resources import parse_version
@@ -14,6 +17,15 @@ CONFIG_DIRECTORY = ".ledfx"
 CONFIG_FILE_NAME = "config.json"
 PRESETS_FILE_NAME = "presets.json"
 
+# Seconds a config change waits for further changes before it is written
+CONFIG_SAVE_DELAY = 0.5
+# Longest a change waits while further changes keep coming in
+CONFIG_SAVE_MAX_DELAY = 2.0
+# Number of write times the average is taken over
+CONFIG_WRITE_HISTORY = 100
+# Attempts at serializing a config that is changed while it is written
+CONFIG_SERIALIZE_ATTEMPTS = 3
+
 PRIVATE_KEY_FILE = "privkey.pem"
 CHAIN_KEY_FILE = "fullchain.pem"
 
@@ -46,6 +58,7 @@ CORE_CONFIG_KEYS_NO_RESTART = [
     "flush_on_deactivate",
     "ui_brightness_boost",
     "startup_scene_id",
+    "screen_capture_fps",
 ]
 # Collection of keys that are used for visualisation configuration - used to check if we need to restart the visualisation event listeners
 VISUALISATION_CONFIG_KEYS = [
@@ -58,13 +71,19 @@ VISUALISATION_CONFIG_KEYS = [
 class Transmission:
     BASE64_COMPRESSED = "compressed"
     UNCOMPRESSED = "uncompressed"
+    # binary frames have to be negotiated by each websocket connection, they
+    # can't be the configured default as existing clients expect JSON
+    BINARY = "binary"
 
     @staticmethod
     def get_list():
         transmission_dict = vars(Transmission)
         t_list = []
         for attribute in transmission_dict.keys():
-            if attribute[:2] != "__" and attribute != "get_list":
+            if attribute[:2] != "__" and attribute not in (
+                "get_list",
+                "BINARY",
+            ):
                 t_list.append(getattr(Transmission, attribute))
         return t_list
 
@@ -150,6 +169,16 @@ CORE_CONFIG_SCHEMA = vol.Schema(
             vol.Coerce(float), vol.Range(0, 1.0)
         ),
         vol.Optional("startup_scene_id", default=""): str,
+        vol.Optional("render_workers", default=0): vol.All(
+            int, vol.Range(0, 64)
+        ),
+        vol.Optional("fps_governor", default=True): bool,
+        vol.Optional("render_precision", default="float32"): vol.In(
+            ["float32", "float64"]
+        ),
+        vol.Optional("screen_capture_fps", default=30): vol.All(
+            int, vol.Range(1, 120)
+        ),
     },
     extra=vol.ALLOW_EXTRA,
 )
@@ -777,25 +806,241 @@ def save_config(config: dict, config_dir: str) -> None:
     """
     Saves the configuration to the provided directory.
 
+    While LedFx is running the save is handed to its ConfigWriter, which
+    writes the file shortly after, off the event loop. Otherwise the file
+    is written before returning.
+
     Args:
         config (dict): The configuration to be saved.
         config_dir (str): The directory where the configuration file will be saved.
 
+    Returns:
+        None
+    """
+    config["configuration_version"] = CONFIGURATION_VERSION
+    writer = ConfigWriter.get(config_dir)
+    if writer is not None:
+        writer.save(config)
+    else:
+        write_config(config, config_dir)
+
+
+def write_config(config: dict, config_dir: str) -> None:
+    """
+    Writes the configuration file, replacing the old one atomically so a
+    crash mid-write can't leave a truncated config behind.
+
+    Args:
+        config (dict): The configuration to be written.
+        config_dir (str): The directory where the configuration file will be saved.
+
     Returns:
         None
     """
     config_file = ensure_config_file(config_dir)
     _LOGGER.info(f"Saving configuration file to {config_dir}")
     config["configuration_version"] = CONFIGURATION_VERSION
-    config_view = dict(config)
     unneeded_keys = ["ledfx_presets"]
-    for key in [key for key in config_view if key in unneeded_keys]:
-        del config_view[key]
 
-    with open(config_file, "w", encoding="utf-8") as file:
-        json.dump(
-            config_view, file, ensure_ascii=False, sort_keys=True, indent=4
+    for attempt in range(CONFIG_SERIALIZE_ATTEMPTS):
+        config_view = {
+            key: value
+            for key, value in list(config.items())
+            if key not in unneeded_keys
+        }
+        try:
+            data = json.dumps(
+                config_view, ensure_ascii=False, sort_keys=True, indent=4
+            )
+            break
+        except RuntimeError:
+            # changed by another thread while it was serialized
+            if attempt == CONFIG_SERIALIZE_ATTEMPTS - 1:
+                raise
+
+    temp_file = f"{config_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as file:
+            file.write(data)
+        os.replace(temp_file, config_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+class ConfigWriter:
+    """
+    Writes the configuration file behind the changes made to it.
+
+    Every change to the config saves it, and dragging a slider in the UI
+    changes it many times a second. Rather than serializing the whole
+    config on the event loop each time, a save marks the config dirty and
+    the writes are coalesced: the file is written once no further change
+    came in for CONFIG_SAVE_DELAY seconds, or CONFIG_SAVE_MAX_DELAY after
+    the first unsaved change. Writes run in the loop's executor, one at a
+    time.
+    """
+
+    _writers = {}
+
+    def __init__(
+        self,
+        config_dir,
+        loop,
+        delay=CONFIG_SAVE_DELAY,
+        max_delay=CONFIG_SAVE_MAX_DELAY,
+    ):
+        self._config_dir = config_dir
+        self._loop = loop
+        self._delay = delay
+        self._max_delay = max_delay
+        # guards the pending config and the statistics
+        self._lock = threading.Lock()
+        # held for the duration of a write
+        self._write_lock = threading.Lock()
+        self._config = None
+        self._dirty_since = None
+        self._handle = None
+        self._writing = False
+        self._closed = False
+        self.clear()
+
+    @classmethod
+    def get(cls, config_dir):
+        """Returns the running writer for config_dir, if any"""
+        return cls._writers.get(os.path.abspath(config_dir))
+
+    def start(self):
+        """Takes over the saves made to the config directory"""
+        self._writers[os.path.abspath(self._config_dir)] = self
+
+    def close(self):
+        """
+        Hands saves back to save_config and waits for a write in progress.
+        Changes not written yet are left for the caller to save.
+        """
+        self._closed = True
+        key = os.path.abspath(self._config_dir)
+        if self._writers.get(key) is self:
+            del self._writers[key]
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        with self._write_lock:
+            pass
+
+    def save(self, config):
+        """Marks config to be written, from any thread"""
+        with self._lock:
+            self.requests += 1
+            self._config = config
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+        try:
+            self._loop.call_soon_threadsafe(self._schedule)
+        except RuntimeError:
+            # the loop is closed, nothing would run the write
+            self.flush()
+
+    def flush(self):
+        """Writes the pending changes now, on the calling thread"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._write()
+        if self.pending:
+            # the write failed, retry it behind like any other save
+            try:
+                self._loop.call_soon_threadsafe(self._schedule)
+            except RuntimeError:
+                pass
+
+    @property
+    def pending(self):
+        return self._dirty_since is not None
+
+    def clear(self):
+        """Resets the write statistics"""
+        with self._lock:
+            self.requests = 0
+            self.writes = 0
+            self.failures = 0
+            self._write_times = deque(maxlen=CONFIG_WRITE_HISTORY)
+            self._last_write_time = 0.0
+
+    def get_stats(self):
+        """
+        Returns how many saves were requested, how many writes they were
+        coalesced into and how long the writes took in milliseconds.
+        """
+        with self._lock:
+            write_times = self._write_times
+            return {
+                "pending": self.pending,
+                "requests": self.requests,
+                "writes": self.writes,
+                "failures": self.failures,
+                "last_write_ms": round(self._last_write_time * 1000, 3),
+                "avg_write_ms": round(
+                    (
+                        sum(write_times) / len(write_times) * 1000
+                        if write_times
+                        else 0.0
+                    ),
+                    3,
+                ),
+                "max_write_ms": round(max(write_times, default=0.0) * 1000, 3),
+            }
+
+    def _schedule(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._closed or self._dirty_since is None:
+            return
+        delay = min(
+            self._delay,
+            self._dirty_since + self._max_delay - time.monotonic(),
         )
+        self._handle = self._loop.call_later(max(0, delay), self._start_write)
+
+    def _start_write(self):
+        self._handle = None
+        if self._writing:
+            # rescheduled once the write in progress is done
+            return
+        self._writing = True
+        future = self._loop.run_in_executor(None, self._write)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future):
+        self._writing = False
+        self._schedule()
+
+    def _write(self):
+        with self._write_lock:
+            with self._lock:
+                config = self._config
+                if self._closed or self._dirty_since is None:
+                    return
+                self._dirty_since = None
+            start = time.perf_counter()
+            try:
+                write_config(config, self._config_dir)
+            except Exception as e:
+                _LOGGER.exception(f"Failed to save configuration: {e}")
+                with self._lock:
+                    self.failures += 1
+                    # still unsaved, retried once the save delay has passed
+                    # rather than as soon as the write is done
+                    if self._dirty_since is None:
+                        self._dirty_since = time.monotonic()
+                return
+            write_time = time.perf_counter() - start
+            with self._lock:
+                self.writes += 1
+                self._last_write_time = write_time
+                self._write_times.append(write_time)
 
 
 def save_presets(config: dict, config_dir: str) -> None:
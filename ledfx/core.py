@@ -2,7 +2,6 @@ import asyncio
 import logging
 import os
 import sys
-import time
 import warnings
 import webbrowser
 from concurrent.futures import ThreadPoolExecutor
@@ -20,6 +19,7 @@ from ledfx.color import (
 )
 from ledfx.config import (
     VISUALISATION_CONFIG_KEYS,
+    ConfigWriter,
     Transmission,
     create_backup,
     get_ssl_certs,
@@ -34,13 +34,20 @@ from ledfx.events import (
     Event,
     Events,
     LedFxShutdownEvent,
+    PerfUpdateEvent,
     VisualisationUpdateEvent,
 )
+from ledfx.gif_cache import GIF_CACHE_DIR, GifFrameCache
+from ledfx.governor import FrameRateGovernor
 from ledfx.http_manager import HttpServer
 from ledfx.integrations import Integrations
 from ledfx.mdns_manager import ZeroConfRunner
+from ledfx.perf import get_perf_stats
 from ledfx.presets import ledfx_presets
+from ledfx.render_workers import RenderWorkers
 from ledfx.scenes import Scenes
+from ledfx.scheduler import FrameScheduler
+from ledfx.screen_capture import ScreenCapture
 from ledfx.tools.ts_generator import generate_typescript_types
 from ledfx.utils import (
     RollingQueueHandler,
@@ -54,9 +61,13 @@ from ledfx.utils import (
     shape_to_fit_len,
 )
 from ledfx.virtuals import Virtuals
+from ledfx.visualisation import VisualisationSampler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds between perf_update events sent to subscribed clients
+PERF_UPDATE_INTERVAL = 1.0
+
 if currently_frozen():
     warnings.filterwarnings("ignore")
 
@@ -123,6 +134,7 @@ class LedFxCore:
 
         self.thread_executor = ThreadPoolExecutor()
         self.loop.set_default_executor(self.thread_executor)
+        self.config_writer = ConfigWriter(self.config_dir, self.loop)
         self.loop.set_exception_handler(self.loop_exception_handler)
 
         if self.icon:
@@ -130,6 +142,7 @@ class LedFxCore:
 
         self.setup_logqueue()
         self.events = Events(self)
+        self.visualisation = VisualisationSampler(self)
         self.setup_visualisation_events()
         self.events.add_listener(
             self.handle_base_configuration_update, Event.BASE_CONFIG_UPDATE
@@ -205,40 +218,21 @@ class LedFxCore:
 
     def setup_visualisation_events(self):
         """
-        creates event listeners to fire visualisation events at
-        a given rate
+        sets up the handler that turns virtual and device pixel updates
+        into visualisation events. The updates are sampled at the
+        configured rate by the virtuals and devices themselves, so only
+        frames that will be sent to the frontend reach the event loop.
         """
-        # Remove existing listeners if they exist
-        if hasattr(self, "visualisation_update_listener"):
-            _LOGGER.debug(
-                "Removing existing visualisation event handler and event listeners."
-            )
-            self.visualisation_update_listener = None
-            self.virtual_listener()
-            self.device_listener()
-
-        min_time_since = 1 / self.config["visualisation_fps"]
-        time_since_last = {}
         max_len = self.config["visualisation_maxlen"]
 
         def handle_visualisation_update(event):
             is_device = event.event_type == Event.DEVICE_UPDATE
-            time_now = time.time()
 
             if is_device:
                 vis_id = getattr(event, "device_id")
             else:
                 vis_id = getattr(event, "virtual_id")
 
-            try:
-                time_since = time_now - time_since_last[vis_id]
-                if time_since < min_time_since:
-                    return
-            except KeyError:
-                pass
-
-            time_since_last[vis_id] = time_now
-
             # grab rows from up in virtual land
             virtual = self.virtuals.get(vis_id)
             # protect against deleted virtuals
@@ -262,32 +256,35 @@ class LedFxCore:
                     pixels, self.config["ui_brightness_boost"], 100
                 )
 
+            pixels = pixels.astype(np.uint8)
+            rgb = pixels.tobytes()
             if (
                 self.config["transmission_mode"]
                 == Transmission.BASE64_COMPRESSED
             ):
-                b_arr = bytes(pixels.astype(np.uint8).flatten())
-                pixels = pybase64.b64encode(b_arr).decode("ASCII")
+                pixels = pybase64.b64encode(rgb).decode("ASCII")
             else:
-                pixels = pixels.astype(np.uint8).T.tolist()
+                pixels = pixels.T.tolist()
 
             self.events.fire_event(
-                VisualisationUpdateEvent(is_device, vis_id, pixels, shape)
+                VisualisationUpdateEvent(is_device, vis_id, pixels, shape, rgb)
             )
 
         _LOGGER.debug("Setting up visualisation event handler.")
-        self.visualisation_update_listener = handle_visualisation_update
-        _LOGGER.debug("Adding virtual update event listener.")
-        self.virtual_listener = self.events.add_listener(
-            self.visualisation_update_listener,
-            Event.VIRTUAL_UPDATE,
-        )
-        _LOGGER.debug("Adding device update event listener.")
-        self.device_listener = self.events.add_listener(
-            self.visualisation_update_listener,
-            Event.DEVICE_UPDATE,
+        self.visualisation.configure(
+            handle_visualisation_update, self.config["visualisation_fps"]
         )
 
+    async def perf_update_loop(self):
+        """
+        Periodically fires a PerfUpdateEvent with the per-stage frame
+        timings. The stats are only gathered when something is listening.
+        """
+        while True:
+            await asyncio.sleep(PERF_UPDATE_INTERVAL)
+            if self.events.has_listeners(Event.PERF_UPDATE):
+                self.events.fire_event(PerfUpdateEvent(**get_perf_stats(self)))
+
     def setup_logqueue(self):
         def log_filter(record):
             return (record.name != "ledfx.api.log") and (record.levelno >= 20)
@@ -383,6 +380,14 @@ class LedFxCore:
             self.icon.notify(
                 "Started in background.\nUse the tray icon to open.", "LedFx"
             )
+        self.config_writer.start()
+        self.scheduler = FrameScheduler(self)
+        self.gif_cache = GifFrameCache(
+            os.path.join(self.config_dir, GIF_CACHE_DIR)
+        )
+        self.render_workers = RenderWorkers(self)
+        self.governor = FrameRateGovernor(self)
+        self.screen_capture = ScreenCapture(self)
         self.devices = Devices(self)
         self.effects = Effects(self)
         self.virtuals = Virtuals(self)
@@ -423,6 +428,8 @@ class LedFxCore:
         async_fire_and_forget(
             self.integrations.activate_integrations(), self.loop
         )
+        async_fire_and_forget(self.perf_update_loop(), self.loop)
+        async_fire_and_forget(self.governor.run(), self.loop)
 
         if open_ui:
             self.open_ui()
@@ -437,6 +444,9 @@ class LedFxCore:
                 os.path.join(current_script_dir, "..")
             )
             output_file_name = "ledfx_types.ts"
+            # The generator reads the effect registry directly, so every
+            # effect has to be imported first
+            self.effects.classes()
             ts_code_string = generate_typescript_types()
 
             try:
@@ -513,6 +523,7 @@ class LedFxCore:
                     pass
                 _LOGGER.debug("All tasks killed.")
             # Save the configuration before shutting down
+            self.config_writer.close()
             save_config(config=self.config, config_dir=self.config_dir)
 
         except Exception as e:
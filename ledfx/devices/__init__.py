@@ -12,12 +12,14 @@ import voluptuous as vol
 from sacn.sending.sender_socket_base import DEFAULT_PORT
 
 from ledfx.config import save_config
+from ledfx.devices.output import DeviceOutput
 from ledfx.events import (
     DeviceCreatedEvent,
     DevicesUpdatedEvent,
     DeviceUpdateEvent,
     Event,
 )
+from ledfx.perf import DeviceTimings, perf_counter
 from ledfx.utils import (
     AVAILABLE_FPS,
     WLED,
@@ -85,6 +87,13 @@ class Device(BaseRegistry):
         self._device_type = ""
         self._online = True
         self.lock = threading.Lock()
+        # guards _pixels and _output, devices can deactivate themselves on
+        # their output thread while a virtual is handing over a frame
+        self._frame_lock = threading.Lock()
+        self.perf = DeviceTimings()
+        self._output = None
+        # devices flushed by another device's output stage don't run one
+        self._own_output = True
 
     def __del__(self):
         if self._active:
@@ -142,34 +151,43 @@ class Device(BaseRegistry):
         return self._online
 
     def update_pixels(self, virtual_id, data):
-        # update each segment from this virtual
-        if not self._active:
-            _LOGGER.warning(
-                f"Cannot update pixels of inactive device {self.name}"
-            )
-            return
-
-        for pixels, start, end in data:
-            # protect against an empty race condition
-            if pixels.shape[0] != 0:
-                if np.shape(pixels) == (3,) or np.shape(
-                    self._pixels[start : end + 1]
-                ) == np.shape(pixels):
-                    self._pixels[start : end + 1] = pixels
+        with self._frame_lock:
+            # update each segment from this virtual
+            if not self._active:
+                _LOGGER.warning(
+                    f"Cannot update pixels of inactive device {self.name}"
+                )
+                return
 
-        if self.priority_virtual:
-            if virtual_id == self.priority_virtual.id:
-                frame = self.assemble_frame()
-                self.flush(frame)
-                # _LOGGER.debug(f"Device {self.id} flushed by Virtual {virtual_id}")
+            for pixels, start, end in data:
+                # protect against an empty race condition
+                if pixels.shape[0] != 0:
+                    if np.shape(pixels) == (3,) or np.shape(
+                        self._pixels[start : end + 1]
+                    ) == np.shape(pixels):
+                        self._pixels[start : end + 1] = pixels
 
-                self._ledfx.events.fire_event(
-                    DeviceUpdateEvent(self.id, frame)
+            priority_virtual = self.priority_virtual
+            if not priority_virtual:
+                _LOGGER.warning(
+                    f"Flush skipped as {self.id} has no priority_virtual"
                 )
-        else:
-            _LOGGER.warning(
-                f"Flush skipped as {self.id} has no priority_virtual"
-            )
+                return
+            if virtual_id != priority_virtual.id:
+                return
+
+            assemble_start = perf_counter()
+            frame = self.assemble_frame()
+            # the send itself happens on the output stage's thread
+            self._output.submit(frame)
+            self.perf.record("assemble_frame", perf_counter() - assemble_start)
+            # _LOGGER.debug(f"Device {self.id} flushed by Virtual {virtual_id}")
+
+        self._ledfx.visualisation.publish(
+            Event.DEVICE_UPDATE,
+            self.id,
+            lambda: DeviceUpdateEvent(self.id, frame),
+        )
 
     def assemble_frame(self):
         """
@@ -184,12 +202,22 @@ class Device(BaseRegistry):
         return frame
 
     def activate(self):
-        self._pixels = np.zeros((self.pixel_count, 3))
-        self._active = True
+        with self._frame_lock:
+            # the virtuals hand over frames already quantized to uint8
+            self._pixels = np.zeros((self.pixel_count, 3), dtype=np.uint8)
+            if self._output is None and self._own_output:
+                self._output = DeviceOutput(self)
+            self._active = True
 
     def deactivate(self):
-        self._pixels = None
-        self._active = False
+        with self._frame_lock:
+            self._active = False
+            output, self._output = self._output, None
+            self._pixels = None
+        # stop sending before subclasses close their sockets and ports,
+        # outside the lock as this waits for the frame being sent
+        if output is not None:
+            output.stop()
         # self.flush(np.zeros((self.pixel_count, 3)))
 
     def set_offline(self):
@@ -202,6 +230,9 @@ class Device(BaseRegistry):
         """
         Flushes the provided data to the device. This abstract method must be
         overwritten by the device implementation.
+
+        Args:
+            data (np.ndarray): The (pixel_count, 3) uint8 frame to send.
         """
 
     @property
@@ -306,12 +337,10 @@ class Device(BaseRegistry):
         for segment in self._segments:
             if segment[0] != virtual_id:
                 new_segments.append(segment)
-            else:
-                if self._pixels is not None:
-                    if self._ledfx.config.get("flush_on_deactivate", False):
-                        self._pixels[segment[1] : segment[2] + 1] = np.zeros(
-                            (segment[2] - segment[1] + 1, 3)
-                        )
+            elif self._ledfx.config.get("flush_on_deactivate", False):
+                with self._frame_lock:
+                    if self._pixels is not None:
+                        self._pixels[segment[1] : segment[2] + 1] = 0
         self._segments = new_segments
 
         if self.priority_virtual:
@@ -1,9 +1,10 @@
 import logging
 import math
+import socket
 
 import numpy as np
 import voluptuous as vol
-from stupidArtnet import StupidArtnet
+from stupidArtnet.ArtnetUtils import put_in_range, shift_this
 
 from ledfx.devices import NetworkedDevice
 from ledfx.devices.utils.rgbw_conversion import OutputMode, rgb_to_output_mode
@@ -11,6 +12,9 @@ from ledfx.utils import extract_uint8_seq
 
 _LOGGER = logging.getLogger(__name__)
 
+ARTNET_HEADER_SIZE = 18
+ARTNET_SEQUENCE_OFFSET = 12
+
 
 class ArtNetDevice(NetworkedDevice):
     """Art-Net device support"""
@@ -78,7 +82,8 @@ class ArtNetDevice(NetworkedDevice):
 
     def __init__(self, ledfx, config):
         super().__init__(ledfx, config)
-        self._artnet = None
+        self._sock = None
+        self._send_warning = False
         self._device_type = "ArtNet"
         self.config_use(config)
 
@@ -129,80 +134,125 @@ class ArtNetDevice(NetworkedDevice):
         self.packet_size = self._config["packet_size"]
         self.universe_count = math.ceil(self.channel_count / self.packet_size)
 
+        self._build_packets(total_pixels_per_device)
+
+    def _build_packets(self, total_pixels_per_device):
+        """
+        Compiles the channel layout of the device into a buffer of prebuilt
+        ArtDmx datagrams, one per universe, and an index map from the flat
+        output mode pixel data to its position in that buffer.
+
+        The pre and post ambles and the unused channels never change, so
+        they are written once here. A flush then only has to scatter the
+        pixel data into the buffer and send each datagram.
+        """
+        # the datagram length as announced in the header, Art-Net
+        # receivers may require an even number of channels
+        dmx_size = put_in_range(
+            self.packet_size, 2, 512, self._config["even_packet_size"]
+        )
+        datagram_size = ARTNET_HEADER_SIZE + dmx_size
+
+        self._packet_buffer = bytearray(self.universe_count * datagram_size)
+        packets = np.frombuffer(self._packet_buffer, dtype=np.uint8).reshape(
+            self.universe_count, datagram_size
+        )
+        size_msb, size_lsb = shift_this(dmx_size)
+        for i in range(self.universe_count):
+            universe_msb, universe_lsb = shift_this(
+                i + self._config["universe"]
+            )
+            packets[i, :ARTNET_HEADER_SIZE] = (
+                *b"Art-Net\x00",
+                0x00,
+                0x50,  # ArtDmx data packet
+                0x00,
+                14,  # protocol version
+                0x00,  # sequence, set on every flush
+                0x00,  # physical port
+                universe_lsb,
+                universe_msb & 0x7F,
+                size_msb,
+                size_lsb,
+            )
+
+        # position of every channel of the device within the universes
+        channels = np.arange(self.dmx_start_address, self.channel_count)
+        positions = (
+            (channels // self.packet_size) * datagram_size
+            + ARTNET_HEADER_SIZE
+            + channels % self.packet_size
+        ).reshape(self.num_devices, total_pixels_per_device)
+
+        pre_end = self.pre_amble.size
+        post_start = total_pixels_per_device - self.post_amble.size
+        flat_packets = packets.reshape(-1)
+        flat_packets[positions[:, :pre_end]] = self.pre_amble
+        flat_packets[positions[:, post_start:]] = self.post_amble
+
+        self._packets = packets
+        self._channel_index = positions[:, pre_end:post_start].ravel()
+        self._datagrams = [
+            memoryview(self._packet_buffer)[
+                i * datagram_size : (i + 1) * datagram_size
+            ]
+            for i in range(self.universe_count)
+        ]
+        self._sequence = 0
+
     def activate(self):
-        if self._artnet:
+        if self._sock:
             _LOGGER.warning(
                 f"Art-Net sender already started for device {self.config['name']}"
             )
-        self._artnet = StupidArtnet(
-            target_ip=self._config["ip_address"],
-            universe=self._config["universe"],
-            packet_size=self.packet_size,
-            fps=self._config["refresh_rate"],
-            even_packet_size=self._config["even_packet_size"],
-            broadcast=False,
-            port=self._config["port"],
-        )
-        # Don't use start for stupidArtnet - we handle fps locally, and it spawns hundreds of threads
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._target = (self._config["ip_address"], self._config["port"])
 
         _LOGGER.info(f"Art-Net sender for {self.config['name']} started.")
         super().activate()
 
     def deactivate(self):
         super().deactivate()
-        if not self._artnet:
+        if not self._sock:
             return
 
-        self._artnet.blackout()
-        self._artnet.close()
-        self._artnet = None
+        # blackout every channel, then restore the ambles for reactivation
+        dmx_data = self._packets[:, ARTNET_HEADER_SIZE:].copy()
+        self._packets[:, ARTNET_HEADER_SIZE:] = 0
+        self._send()
+        self._packets[:, ARTNET_HEADER_SIZE:] = dmx_data
+        self._sock.close()
+        self._sock = None
         _LOGGER.info(f"Art-Net sender for {self.config['name']} stopped.")
 
     def flush(self, data):
         with self.lock:
             """Flush the data to all the Art-Net channels"""
-            if not self._artnet:
+            if not self._sock:
                 self.activate()
 
             data = rgb_to_output_mode(data, self.output_mode)
 
-            data = data.flatten()[: self.data_max * self.channels_per_pixel]
-
-            # pre allocate the space
-            devices_data = np.empty(self.channel_count, dtype=np.uint8)
-
-            # Reshape the data into (self.num_devices, self.pixels_per_device * self.channels_per_pixel)
-            reshaped_data = data.reshape(
-                (
-                    self.num_devices,
-                    self.pixels_per_device * self.channels_per_pixel,
-                )
-            )
-
-            # Create the pre_amble and post_amble arrays to match the device count
-            pre_amble_repeated = np.tile(self.pre_amble, (self.num_devices, 1))
-            post_amble_repeated = np.tile(
-                self.post_amble, (self.num_devices, 1)
-            )
-
-            # Concatenate the pre_amble, reshaped data, and post_amble along the second axis
-            full_device_data = np.concatenate(
-                (pre_amble_repeated, reshaped_data, post_amble_repeated),
-                axis=1,
-            )
-
-            devices_data[0 : self.dmx_start_address] = 0
-            devices_data[self.dmx_start_address :] = full_device_data.ravel()
-
-            # TODO: Handle the data transformation outside of the loop and just use loop to set universe and send packets
+            # unsafe casting truncates the pixel values into the uint8 buffer
+            self._packets.reshape(-1)[self._channel_index] = data.reshape(-1)[
+                : self._channel_index.size
+            ]
+            self._send()
 
-            for i in range(self.universe_count):
-                start = i * self.packet_size
-                end = start + self.packet_size
-                packet = np.zeros(self.packet_size, dtype=np.uint8)
-                packet[: min(self.packet_size, self.channel_count - start)] = (
-                    devices_data[start:end]
+    def _send(self):
+        """Sends the datagram of every universe"""
+        self._sequence = self._sequence % 255 + 1
+        self._packets[:, ARTNET_SEQUENCE_OFFSET] = self._sequence
+        sendto = self._sock.sendto
+        target = self._target
+        try:
+            for datagram in self._datagrams:
+                sendto(datagram, target)
+            self._send_warning = False
+        except OSError as error:
+            # print warning only once until it clears
+            if not self._send_warning:
+                _LOGGER.warning(
+                    f"Art-Net sender for {self.config['name']} failed: {error}"
                 )
-                self._artnet.set_universe(i + self._config["universe"])
-                self._artnet.set(packet)
-                self._artnet.show()
+                self._send_warning = True
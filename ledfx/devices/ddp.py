@@ -8,6 +8,7 @@ import voluptuous as vol
 from numpy import ndarray
 
 from ledfx.devices import UDPDevice
+from ledfx.devices.delta import ChunkDelta
 from ledfx.events import DevicesUpdatedEvent
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,6 +36,9 @@ class DDPDevice(UDPDevice):
     DATATYPE = 0x01
     SOURCE = 0x01
     TIMEOUT = 1
+    # seconds between full frames when only changed packets are sent,
+    # well inside WLED's 2.5 second realtime timeout
+    DELTA_REFRESH = 1
 
     CONFIG_SCHEMA = vol.Schema(
         {
@@ -48,6 +52,11 @@ class DDPDevice(UDPDevice):
                 description="Port for the UDP device",
                 default=4048,
             ): vol.All(int, vol.Range(min=1, max=65535)),
+            vol.Optional(
+                "delta_chunks",
+                description="Only resend the packets of a frame whose pixels changed, for large mostly static matrices",
+                default=False,
+            ): bool,
         }
     )
 
@@ -57,6 +66,17 @@ class DDPDevice(UDPDevice):
         self.frame_count = 0
         self.connection_warning = False
         self.destination_port = self._config["port"]
+        self._delta = None
+
+    def activate(self):
+        if self._config.get("delta_chunks", False):
+            self._delta = ChunkDelta(
+                DDPDevice.MAX_DATALEN, DDPDevice.DELTA_REFRESH, push_last=True
+            )
+        else:
+            self._delta = None
+        self.perf.delta = self._delta
+        super().activate()
 
     def flush(self, data: ndarray) -> None:
         """
@@ -78,6 +98,7 @@ class DDPDevice(UDPDevice):
                 self.destination_port,
                 data,
                 self.frame_count,
+                self._delta,
             )
             if self.connection_warning:
                 # If we have reconnected, log it, come back online, and fire an event to the frontend
@@ -98,7 +119,12 @@ class DDPDevice(UDPDevice):
 
     @staticmethod
     def send_out(
-        sock: socket, dest: str, port: int, data: ndarray, frame_count: int
+        sock: socket,
+        dest: str,
+        port: int,
+        data: ndarray,
+        frame_count: int,
+        delta: ChunkDelta = None,
     ) -> None:
         """
         Sends out data packets over a socket using the DDP protocol.
@@ -109,17 +135,23 @@ class DDPDevice(UDPDevice):
             port (int): The destination port number.
             data (ndarray): The data to be sent in the packet.
             frame_count(int): The count of frames.
+            delta (ChunkDelta): If given, only the packets whose pixels
+                changed are sent.
 
         Returns:
         None
         """
         sequence = frame_count % 15 + 1
-        byteData = memoryview(data.astype(np.uint8).ravel())
+        byteArray = data.astype(np.uint8, copy=False).ravel()
+        byteData = memoryview(byteArray)
         packets, remainder = divmod(len(byteData), DDPDevice.MAX_DATALEN)
         if remainder == 0:
             packets -= 1  # divmod returns 1 when len(byteData) fits evenly in DDPDevice.MAX_DATALEN
+        changed = delta.changed(byteArray) if delta is not None else None
 
         for i in range(packets + 1):
+            if changed is not None and not changed[i]:
+                continue
             data_start = i * DDPDevice.MAX_DATALEN
             data_end = data_start + DDPDevice.MAX_DATALEN
             DDPDevice.send_packet(
@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+
+
+class ChunkDelta:
+    """
+    Change detection for frames sent as several packets.
+
+    The bytes of a frame are split into packet sized chunks and compared
+    against the bytes last sent, so only the packets whose pixels changed
+    need to be sent again. Every chunk is sent at least once per refresh
+    interval to keep receivers in realtime mode and to repair any packet
+    that was lost on the way.
+    """
+
+    def __init__(self, chunk_size, refresh_interval, push_last=False):
+        """
+        Args:
+            chunk_size (int): Bytes of frame data per packet.
+            refresh_interval (float): Seconds between full frames.
+            push_last (bool): Also send the last chunk whenever any chunk
+                changed, for protocols that only display a frame once its
+                last packet arrives.
+        """
+        self.chunk_size = chunk_size
+        self.refresh_interval = refresh_interval
+        self.push_last = push_last
+        self._last = None
+        self._diff = None
+        self._starts = None
+        self._chunk_bytes = None
+        self._last_refresh = 0.0
+        self.clear()
+
+    def clear(self):
+        """Resets the bandwidth counters"""
+        self.chunks_sent = 0
+        self.chunks_skipped = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+
+    def reset(self):
+        """Forgets the last frame, so the next one is sent in full"""
+        self._last = None
+
+    def changed(self, data):
+        """
+        Works out which chunks of a frame have to be sent, and takes the
+        frame as the one last sent.
+
+        Args:
+            data (np.ndarray): The frame as a flat array of uint8.
+
+        Returns:
+            np.ndarray: Whether each chunk has to be sent.
+        """
+        now = time.monotonic()
+        if self._last is None or len(self._last) != len(data):
+            self._resize(len(data))
+            send = np.ones(len(self._starts), dtype=bool)
+            self._last_refresh = now
+        elif now - self._last_refresh >= self.refresh_interval:
+            send = np.ones(len(self._starts), dtype=bool)
+            self._last_refresh = now
+        else:
+            np.not_equal(data, self._last, out=self._diff)
+            send = np.logical_or.reduceat(self._diff, self._starts)
+            if self.push_last and send.any():
+                send[-1] = True
+        np.copyto(self._last, data)
+
+        sent = int(self._chunk_bytes[send].sum())
+        chunks = int(np.count_nonzero(send))
+        self.chunks_sent += chunks
+        self.chunks_skipped += len(send) - chunks
+        self.bytes_sent += sent
+        self.bytes_saved += len(data) - sent
+        return send
+
+    def to_dict(self):
+        return {
+            "chunks_sent": self.chunks_sent,
+            "chunks_skipped": self.chunks_skipped,
+            "bytes_sent": self.bytes_sent,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def _resize(self, length):
+        self._last = np.zeros(length, dtype=np.uint8)
+        self._diff = np.zeros(length, dtype=bool)
+        self._starts = np.arange(0, max(length, 1), self.chunk_size)
+        self._chunk_bytes = np.diff(np.append(self._starts, length))
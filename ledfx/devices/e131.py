@@ -1,14 +1,31 @@
 import logging
+import random
+import socket
 import threading
+import timeit
 
 import numpy as np
-import sacn
 import voluptuous as vol
+from sacn.messages.data_packet import DataPacket, calculate_multicast_addr
+from sacn.messages.sync_packet import SyncPacket
+from sacn.messages.universe_discovery import UniverseDiscoveryPacket
+from sacn.sending.sender_socket_base import DEFAULT_PORT
 
 from ledfx.devices import NetworkedDevice
 
 _LOGGER = logging.getLogger(__name__)
 
+# Byte offsets within the packets built by the sacn library
+DMX_DATA_OFFSET = 126  # first DMX slot, after the start code
+DATA_SEQUENCE_OFFSET = 111
+SYNC_SEQUENCE_OFFSET = 44
+MAX_DMX_SLOTS = 512
+
+# Match the defaults of sacn.sACNsender so receivers see the same stream
+SYNC_UNIVERSE = 63999
+MULTICAST_TTL = 8
+UNIVERSE_DISCOVERY_INTERVAL = 10
+
 
 class E131Device(NetworkedDevice):
     """E1.31 device support"""
@@ -55,51 +72,33 @@ class E131Device(NetworkedDevice):
         # Allow for configuring in terms of "pixels" or "channels"
 
         self._device_type = "e131"
-        if "pixel_count" in self._config:
-            self._config["channel_count"] = self._config["pixel_count"] * 3
-        else:
-            self._config["pixel_count"] = self._config["channel_count"] // 3
-
-        span = (
-            self._config["channel_offset"] + self._config["channel_count"] - 1
-        )
-        self._config["universe_end"] = self._config["universe"] + int(
-            span / self._config["universe_size"]
-        )
-        if span % self._config["universe_size"] == 0:
-            self._config["universe_end"] -= 1
+        self._update_universe_span()
 
-        self._sacn = None
+        self._sock = None
+        self._packets = None
         self.device_lock = threading.Lock()
 
     def activate(self):
         with self.device_lock:
-            if self._config["ip_address"].lower() == "multicast":
-                multicast = True
-            else:
-                multicast = False
-
-            if self._sacn:
+            if self._sock:
                 _LOGGER.warning(
                     f"sACN sender already started for device {self.id}"
                 )
 
-            # Configure sACN and start the dedicated thread to flush the buffer
-            # Some variables are immutable and must be called here
-            self._sacn = sacn.sACNsender(source_name=self.name)
-
-            for universe in range(
-                self._config["universe"], self._config["universe_end"] + 1
-            ):
-                _LOGGER.info(f"sACN activating universe {universe}")
-                self._sacn.activate_output(universe)
-                self._sacn[universe].priority = self._config["packet_priority"]
-                self._sacn[universe].multicast = multicast
-                if not multicast:
-                    self._sacn[universe].destination = self.destination
-
-            self._sacn.start()
-            self._sacn.manual_flush = True
+            self._build_packets()
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._sock.setsockopt(
+                socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, MULTICAST_TTL
+            )
+            try:
+                # send from the sACN port like sacn.sACNsender does
+                self._sock.bind(("0.0.0.0", DEFAULT_PORT))
+            except OSError:
+                _LOGGER.debug(
+                    f"sACN sender for {self.id} could not bind to port {DEFAULT_PORT}"
+                )
 
             _LOGGER.info(f"sACN sender for {self.config['name']} started.")
             super().activate()
@@ -107,7 +106,7 @@ class E131Device(NetworkedDevice):
     def deactivate(self):
         super().deactivate()
 
-        if not self._sacn:
+        if not self._sock:
             # He's dead, Jim
             # _LOGGER.warning("sACN sender not started.")
             return
@@ -115,58 +114,161 @@ class E131Device(NetworkedDevice):
         self.flush(np.zeros(self._config["channel_count"]))
 
         with self.device_lock:
-            self._sacn.stop()
-            self._sacn = None
+            self._sock.close()
+            self._sock = None
+            self._packets = None
             _LOGGER.info(f"sACN sender for {self.config['name']} stopped.")
 
+    def config_updated(self, config):
+        self._update_universe_span()
+        if self._sock is not None:
+            with self.device_lock:
+                self._build_packets()
+
+    def _update_universe_span(self):
+        """Calculates the channel count and the last universe of the device"""
+        if "pixel_count" in self._config:
+            self._config["channel_count"] = self._config["pixel_count"] * 3
+        else:
+            self._config["pixel_count"] = self._config["channel_count"] // 3
+
+        span = (
+            self._config["channel_offset"] + self._config["channel_count"] - 1
+        )
+        self._config["universe_end"] = self._config["universe"] + int(
+            span / self._config["universe_size"]
+        )
+        if span % self._config["universe_size"] == 0:
+            self._config["universe_end"] -= 1
+
+    def _build_packets(self):
+        """
+        Prebuilds a sACN data packet for every universe of the device and
+        the map of where each input channel lands in those packets.
+
+        The packets are stored as rows of a single uint8 array, so a frame is
+        packed into every universe with one numpy assignment and each row is
+        handed straight to the socket.
+        """
+        universe_size = self._config["universe_size"]
+        if universe_size > MAX_DMX_SLOTS:
+            raise ValueError(
+                f"Device {self.name}: universe_size of {universe_size} exceeds the {MAX_DMX_SLOTS} DMX slots of a universe"
+            )
+
+        if self._config["ip_address"].lower() == "multicast":
+            multicast = True
+        else:
+            multicast = False
+
+        cid = tuple(random.randint(0, 255) for _ in range(16))
+        universes = range(
+            self._config["universe"], self._config["universe_end"] + 1
+        )
+        packets = []
+        destinations = []
+        indices = []
+        for row, universe in enumerate(universes):
+            _LOGGER.info(f"sACN activating universe {universe}")
+            packet = DataPacket(
+                cid=cid,
+                sourceName=self.name,
+                universe=universe,
+                priority=self._config["packet_priority"],
+                sync_universe=SYNC_UNIVERSE,
+            )
+            packets.append(packet.getBytes())
+            if multicast:
+                destinations.append(
+                    (calculate_multicast_addr(universe), DEFAULT_PORT)
+                )
+            else:
+                destinations.append((self.destination, DEFAULT_PORT))
+
+            # Calculate offset into the provide input buffer for the channel. There are some
+            # cleaner ways this can be done... This is just the quick and dirty
+            universe_start = (
+                universe - self._config["universe"]
+            ) * universe_size
+            universe_end = (
+                universe - self._config["universe"] + 1
+            ) * universe_size
+
+            dmx_start = (
+                max(universe_start, self._config["channel_offset"])
+                % universe_size
+            )
+            dmx_end = (
+                min(
+                    universe_end,
+                    self._config["channel_offset"]
+                    + self._config["channel_count"],
+                )
+                % universe_size
+            )
+            if dmx_end == 0:
+                dmx_end = universe_size
+
+            indices.append(
+                np.arange(dmx_start, dmx_end)
+                + row * len(packets[0])
+                + DMX_DATA_OFFSET
+            )
+
+        self._packets = np.array(packets, dtype=np.uint8)
+        self._destinations = destinations
+        self._channel_index = np.concatenate(indices)
+        self._sync_packet = np.array(
+            SyncPacket(cid=cid, syncAddr=SYNC_UNIVERSE).getBytes(),
+            dtype=np.uint8,
+        )
+        self._sync_destination = (
+            calculate_multicast_addr(SYNC_UNIVERSE),
+            DEFAULT_PORT,
+        )
+        self._discovery_packets = [
+            bytes(packet.getBytes())
+            for packet in UniverseDiscoveryPacket.make_multiple_uni_disc_packets(
+                cid=cid, sourceName=self.name, universes=list(universes)
+            )
+        ]
+        self._last_discovery = None
+        self._sequence = 0
+
     def flush(self, data):
         """Flush the data to all the E1.31 channels account for spanning universes"""
 
         with self.device_lock:
-            if self._sacn is not None:
+            if self._sock is not None:
                 if data.size != self._config["channel_count"]:
                     raise Exception(
                         f"Invalid buffer size. {data.size} != {self._config['channel_count']}"
                     )
 
-                data = data.flatten()
-                current_index = 0
-                for universe in range(
-                    self._config["universe"], self._config["universe_end"] + 1
-                ):
-                    # Calculate offset into the provide input buffer for the channel. There are some
-                    # cleaner ways this can be done... This is just the quick and dirty
-                    universe_start = (
-                        universe - self._config["universe"]
-                    ) * self._config["universe_size"]
-                    universe_end = (
-                        universe - self._config["universe"] + 1
-                    ) * self._config["universe_size"]
-
-                    dmx_start = (
-                        max(universe_start, self._config["channel_offset"])
-                        % self._config["universe_size"]
-                    )
-                    dmx_end = (
-                        min(
-                            universe_end,
-                            self._config["channel_offset"]
-                            + self._config["channel_count"],
-                        )
-                        % self._config["universe_size"]
-                    )
-                    if dmx_end == 0:
-                        dmx_end = self._config["universe_size"]
-
-                    input_start = current_index
-                    input_end = current_index + dmx_end - dmx_start
-                    current_index = input_end
+                packets = self._packets
+                packets.reshape(-1)[self._channel_index] = data.reshape(-1)
+                packets[:, DATA_SEQUENCE_OFFSET] = self._sequence
+                self._sync_packet[SYNC_SEQUENCE_OFFSET] = self._sequence
+                self._sequence = (self._sequence + 1) & 0xFF
 
-                    dmx_data = np.array(self._sacn[universe].dmx_data)
-                    dmx_data[dmx_start:dmx_end] = data[input_start:input_end]
+                sendto = self._sock.sendto
+                for packet, destination in zip(packets, self._destinations):
+                    sendto(packet, destination)
+                # the packets all carry the sync address, so receivers that
+                # support it will output every universe at once on this
+                sendto(self._sync_packet, self._sync_destination)
 
-                    # Because the sACN library checks for data to be of int type, we have to
-                    # convert the numpy array into a python list of ints using tolist()
-                    self._sacn[universe].dmx_data = dmx_data.tolist()
-
-                self._sacn.flush()
+                now = timeit.default_timer()
+                if (
+                    self._last_discovery is None
+                    or now - self._last_discovery
+                    >= UNIVERSE_DISCOVERY_INTERVAL
+                ):
+                    self._last_discovery = now
+                    try:
+                        for packet in self._discovery_packets:
+                            sendto(packet, ("<broadcast>", DEFAULT_PORT))
+                    except OSError as e:
+                        _LOGGER.debug(
+                            f"sACN universe discovery for {self.id} failed: {e}"
+                        )
@@ -120,10 +120,10 @@ class Govee(NetworkedDevice):
 
     def deactivate(self):
         _LOGGER.info(f"Govee {self.name} deactivate")
+        super().deactivate()
         if self.udp_server is not None:
             self.send_deactivate()
             self.udp_server.close()
-        super().deactivate()
 
     def activate(self):
         _LOGGER.info(f"Govee {self.name} Activating UDP stream mode...")
@@ -174,7 +174,7 @@ class Govee(NetworkedDevice):
         return np.bitwise_xor.reduce(packet)
 
     def flush(self, data):
-        rgb_data = data.flatten().astype(np.uint8)
+        rgb_data = data.astype(np.uint8, copy=False).ravel()
         packet = self.create_razer_packet(rgb_data)
         self.send_encoded_packet(packet)
 
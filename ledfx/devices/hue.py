@@ -15,7 +15,7 @@ try:
 except ImportError:
     MBEDTLS_AVAILABLE = False
 
-from ledfx.devices import NetworkedDevice
+from ledfx.devices import NetworkedDevice, packets
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -214,6 +214,7 @@ class HueDevice(NetworkedDevice):
         super().activate()
 
     def deactivate(self):
+        super().deactivate()
         if self._sock is not None:
             self._sock.close()
             self._sock = None
@@ -226,29 +227,12 @@ class HueDevice(NetworkedDevice):
             ssl=True,
         )
 
-        super().deactivate()
-
     def flush(self, data):
         # TODO: maybe use the position of the channel to make more sense of the effect
 
-        pixels = [[int(r), int(g), int(b)] for r, g, b in data]
-        send_data = bytearray(b"HueStream")
-        send_data.append(2)  # Major version
-        send_data.append(0)  # Minor version
-        send_data.append(0)  # Sequence ID
-        send_data.append(0)  # Reserved
-        send_data.append(0)  # Reserved
-        send_data.append(0)  # Color Mode (0=RGB, 1=XY)
-        send_data.append(0)  # Reserved
-        send_data.extend(self._config["entertainment_id"].encode("utf-8"))
-        for i in range(len(pixels)):
-            send_data.append(i)  # channel ID
-            send_data.append(pixels[i][0])  # Red
-            send_data.append(pixels[i][0])  # Red
-            send_data.append(pixels[i][1])  # Green
-            send_data.append(pixels[i][1])  # Green
-            send_data.append(pixels[i][2])  # Blue
-            send_data.append(pixels[i][2])  # Blue
+        send_data = packets.build_hue_entertainment_packet(
+            data, self._config["entertainment_id"]
+        )
 
         try:
             self._sock.send(send_data)
@@ -171,6 +171,7 @@ class LaunchpadDevice(MidiDevice):
 
     def deactivate(self):
         _LOGGER.info("Deactivating Launchpad")
+        super().deactivate()
         if self.lp is not None:
             self.lp.flush(
                 zeros((self.pixel_count, 3)),
@@ -180,7 +181,6 @@ class LaunchpadDevice(MidiDevice):
             _LOGGER.info("Closing Launchpad")
             self.lp.Close()
             self.lp = None
-        super().deactivate()
 
     async def add_postamble(self):
         _LOGGER.info("Doing post creation things")
@@ -68,7 +68,7 @@ class LifxDevice(NetworkedDevice):
 
     def flush(self, data):
         try:
-            byteData = data.astype(np.dtype("B")).reshape(-1, 3)
+            byteData = data.astype(np.dtype("B"), copy=False).reshape(-1, 3)
             zone_colors = []
 
             for pixel in byteData:
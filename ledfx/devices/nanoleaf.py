@@ -106,12 +106,11 @@ class NanoleafDevice(NetworkedDevice):
 
     def deactivate(self):
         _LOGGER.debug("deactivate")
+        super().deactivate()
         if self._sock is not None:
             self._sock.close()
             self._sock = None
 
-        super().deactivate()
-
     def write_udp(self):
         if self._config["model"] == LightPanelModel:
             send_data = struct.pack(">B", len(self.status.items()))
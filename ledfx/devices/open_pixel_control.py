@@ -1,10 +1,9 @@
 import logging
 import socket
-import struct
 
 import voluptuous as vol
 
-from ledfx.devices import NetworkedDevice
+from ledfx.devices import NetworkedDevice, packets
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,20 +60,8 @@ class OpenPixelControl(NetworkedDevice):
         port,
         data,
     ):
-        header = struct.pack(
-            ">BBH", self.config["channel"], 0, self.config["pixel_count"] * 3
-        )
-        pieces = [
-            struct.pack(
-                "BBB",
-                min(255, max(0, int(r))),
-                min(255, max(0, int(g))),
-                min(255, max(0, int(b))),
-            )
-            for r, g, b in data
-        ]
-        message = header + b"".join(pieces)
+        message = packets.build_opc_packet(data, self.config["channel"])
         sock.sendto(
-            bytes(message),
+            message,
             (dest, port),
         )
@@ -0,0 +1,107 @@
+import logging
+import threading
+
+import numpy as np
+
+from ledfx.perf import perf_counter
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for the sender to finish its last send when stopping
+STOP_TIMEOUT = 1.0
+
+
+class DeviceOutput:
+    """
+    Output stage of a device.
+
+    Frames are handed over through a single slot mailbox and sent to the
+    device by a dedicated sender thread, so a slow serial port or a stalled
+    socket only holds up its own device rather than the virtual rendering
+    it. The latest frame always wins: a frame that is still waiting when a
+    newer one arrives is dropped instead of queued.
+    """
+
+    def __init__(self, device):
+        self._device = device
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = None
+        self._pending_time = 0.0
+        # buffers handed back by the sender, reused for the next frames
+        self._spare = []
+        self._failing = False
+        self.running = True
+        self._thread = threading.Thread(
+            name=f"Device Output {device.id}", target=self._run, daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, frame):
+        """
+        Puts a frame in the mailbox, replacing any frame that has not been
+        sent yet.
+
+        Args:
+            frame (np.ndarray): The assembled frame, copied so the caller
+                can carry on writing into it.
+        """
+        with self._lock:
+            buffer = self._pending
+            if buffer is not None:
+                self._device.perf.dropped += 1
+            elif self._spare:
+                buffer = self._spare.pop()
+            if buffer is None or buffer.shape != frame.shape:
+                buffer = np.empty_like(frame)
+            np.copyto(buffer, frame)
+            self._pending = buffer
+            self._pending_time = perf_counter()
+        self._wake.set()
+
+    def stop(self):
+        """
+        Stops the sender once it has sent the frame it is working on. The
+        pending frame, if any, is discarded.
+        """
+        self.running = False
+        self._wake.set()
+        # devices take themselves offline from within flush, which runs on
+        # the sender thread and must not wait for itself
+        if threading.current_thread() is not self._thread:
+            self._thread.join(STOP_TIMEOUT)
+
+    def _take(self):
+        with self._lock:
+            self._wake.clear()
+            frame, self._pending = self._pending, None
+            return frame, self._pending_time
+
+    def _run(self):
+        device = self._device
+        perf = device.perf
+        while True:
+            self._wake.wait()
+            if not self.running:
+                return
+            frame, queued = self._take()
+            if frame is None:
+                continue
+
+            send_start = perf_counter()
+            perf.record("queue", send_start - queued)
+            try:
+                device.flush(frame)
+            except Exception as e:
+                if not self._failing:
+                    _LOGGER.exception(
+                        f"Device {device.name}: failed to send frame: {e}"
+                    )
+                self._failing = True
+            else:
+                self._failing = False
+                perf.sent += 1
+            perf.record("flush", perf_counter() - send_start)
+
+            with self._lock:
+                self._spare.append(frame)
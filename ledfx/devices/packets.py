@@ -17,7 +17,7 @@ def build_warls_packet(data: np.ndarray, timeout: int, last_frame: np.array):
     """
     packet = bytearray([1, (timeout or 1)])
 
-    byteData = data.astype(np.dtype("B"))
+    byteData = data.astype(np.dtype("B"), copy=False)
 
     if last_frame is None or data.shape != last_frame.shape:
         last_frame = np.full(data.shape, np.nan)
@@ -54,7 +54,7 @@ def build_drgb_packet(data: np.ndarray, timeout: int):
     """
     packet = bytearray([2, (timeout or 1)])
 
-    byteData = data.astype(np.dtype("B"))
+    byteData = data.astype(np.dtype("B"), copy=False)
     packet.extend(byteData.flatten().tobytes())
     return packet
 
@@ -71,7 +71,7 @@ def build_rgb_packet(data: np.ndarray):
     2 + n*3 	Blue Value
 
     """
-    byteData = data.astype(np.dtype("B"))
+    byteData = data.astype(np.dtype("B"), copy=False)
     packet = byteData.flatten().tobytes()
     return packet
 
@@ -90,7 +90,7 @@ def build_drgbw_packet(data: np.ndarray, timeout: int):
     """
     packet = bytearray([3, (timeout or 1)])
 
-    byteData = data.astype(np.dtype("B"))
+    byteData = data.astype(np.dtype("B"), copy=False)
     out = np.zeros((len(byteData), 4), dtype="B")
     out[:, :3] = byteData
     # 4th column is unusued white channel -> 0
@@ -119,7 +119,7 @@ def build_dnrgb_packet(
         [4, (timeout or 1), (led_start_index >> 8), (led_start_index & 0x00FF)]
     )  # high byte, then low byte
 
-    byteData = data.astype(np.dtype("B"))
+    byteData = data.astype(np.dtype("B"), copy=False)
     packet.extend(byteData.flatten().tobytes())
     return packet
 
@@ -146,6 +146,7 @@ def build_adalight_packet(data: np.ndarray, color_order: str):
     )  # high byte, then low byte
     packet.extend([packet[3] ^ packet[4] ^ 0x55])  # checksum
 
+    # the columns are swapped in place, so this must be a copy
     byteData = data.astype(np.dtype("B"))
     # if color_order == "RGB": pass
     if color_order == "GRB":
@@ -199,6 +200,58 @@ def build_openrgb_packet(
 
     # body
     out = np.zeros((frame_size, 4), dtype="B")
-    out[:, 0:3] = data.astype(np.dtype("B"))
+    out[:, 0:3] = data
     packet.extend(out.flatten().tobytes())
     return packet
+
+
+def build_opc_packet(data: np.ndarray, channel: int):
+    """
+    Open Pixel Control "set pixel colours" packet encoding
+
+    Header: [channel, command (0), data length high byte, data length low byte]
+    Byte 	Description
+    4 + n*3 	Red Value
+    5 + n*3 	Green Value
+    6 + n*3 	Blue Value
+    """
+    packet = bytearray(struct.pack(">BBH", channel, 0, len(data) * 3))
+
+    if data.dtype != np.uint8:
+        data = np.clip(data, 0, 255)
+    byteData = data.astype(np.dtype("B"), copy=False)
+    packet.extend(byteData.tobytes())
+    return packet
+
+
+def build_hue_entertainment_packet(data: np.ndarray, entertainment_id: str):
+    """
+    Hue Entertainment API v2 packet encoding
+    Max channels: 20
+
+    Header: [HueStream, major version (2), minor version (0), sequence id,
+             2 reserved, color mode (0 = RGB), reserved, entertainment id]
+    Byte 	Description
+    52 + n*7 	Channel ID
+    53 + n*7 	Red Value (high byte)
+    54 + n*7 	Red Value (low byte)
+    55 + n*7 	Green Value (high byte)
+    56 + n*7 	Green Value (low byte)
+    57 + n*7 	Blue Value (high byte)
+    58 + n*7 	Blue Value (low byte)
+
+    The 8 bit colour values are used for both bytes of the 16 bit values.
+    """
+    packet = bytearray(b"HueStream")
+    packet.extend([2, 0, 0, 0, 0, 0, 0])
+    packet.extend(entertainment_id.encode("utf-8"))
+
+    if data.dtype != np.uint8:
+        data = np.clip(data, 0, 255)
+    byteData = data.astype(np.dtype("B"), copy=False)
+    out = np.empty((len(byteData), 7), dtype="B")
+    out[:, 0] = np.arange(len(byteData))
+    out[:, 1::2] = byteData
+    out[:, 2::2] = byteData
+    packet.extend(out.tobytes())
+    return packet
@@ -5,6 +5,7 @@ import numpy as np
 import voluptuous as vol
 
 from ledfx.devices import UDPDevice, packets
+from ledfx.devices.delta import ChunkDelta
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +18,8 @@ SUPPORTED_PACKETS = [
     "adaptive_smallest",
     RGB_HYPERHDR_PACKET,
 ]
+# Pixels per DNRGB packet
+DNRGB_PIXELS = 489
 
 
 class UDPRealtimeDevice(UDPDevice):
@@ -49,6 +52,11 @@ class UDPRealtimeDevice(UDPDevice):
                 description="Won't send updates if nothing has changed on the LED device",
                 default=True,
             ): bool,
+            vol.Optional(
+                "delta_chunks",
+                description="DNRGB only: resend just the packets of a frame whose pixels changed",
+                default=False,
+            ): bool,
         }
     )
 
@@ -57,6 +65,17 @@ class UDPRealtimeDevice(UDPDevice):
         self._device_type = "UDP Realtime"
         self.last_frame = np.full((config["pixel_count"], 3), -1)
         self.last_frame_sent_time = 0
+        self._delta = None
+
+    def activate(self):
+        if self._config.get("delta_chunks", False):
+            self._delta = ChunkDelta(
+                DNRGB_PIXELS * 3, self.keepalive_interval()
+            )
+        else:
+            self._delta = None
+        self.perf.delta = self._delta
+        super().activate()
 
     def flush(self, data):
         try:
@@ -94,14 +113,7 @@ class UDPRealtimeDevice(UDPDevice):
             self.transmit_packet(udpData, frame_is_equal_to_last)
 
         elif self._config["udp_packet_type"] == "DNRGB":
-            number_of_packets = int(np.ceil(frame_size / 489))
-            for i in range(number_of_packets):
-                start_index = i * 489
-                end_index = start_index + 489
-                udpData = packets.build_dnrgb_packet(
-                    data[start_index:end_index], timeout, start_index
-                )
-                self.transmit_packet(udpData, frame_is_equal_to_last)
+            self.send_dnrgb(data, timeout, frame_is_equal_to_last)
 
         elif (
             self._config["udp_packet_type"] == "adaptive_smallest"
@@ -135,22 +147,40 @@ class UDPRealtimeDevice(UDPDevice):
                 udpData = packets.build_drgb_packet(data, timeout)
                 self.transmit_packet(udpData, frame_is_equal_to_last)
             else:  # DNRGB
-                number_of_packets = int(np.ceil(frame_size / 489))
-                for i in range(number_of_packets):
-                    start_index = i * 489
-                    end_index = start_index + 489
-                    udpData = packets.build_dnrgb_packet(
-                        data[start_index:end_index], timeout, start_index
-                    )
-                    self.transmit_packet(udpData, frame_is_equal_to_last)
+                self.send_dnrgb(data, timeout, frame_is_equal_to_last)
+
+    def send_dnrgb(self, data, timeout, frame_is_equal_to_last: bool):
+        if self._delta is not None:
+            changed = self._delta.changed(
+                data.astype(np.uint8, copy=False).ravel()
+            )
+        number_of_packets = int(np.ceil(len(data) / DNRGB_PIXELS))
+        for i in range(number_of_packets):
+            if self._delta is not None:
+                if not changed[i]:
+                    continue
+                # the delta's periodic full frames act as the keepalive
+                frame_is_equal_to_last = False
+            start_index = i * DNRGB_PIXELS
+            end_index = start_index + DNRGB_PIXELS
+            udpData = packets.build_dnrgb_packet(
+                data[start_index:end_index], timeout, start_index
+            )
+            self.transmit_packet(udpData, frame_is_equal_to_last)
+
+    def keepalive_interval(self):
+        """
+        Seconds after which an unchanged frame is sent again, half of the
+        device timeout rounded down to a whole frame
+        """
+        return (
+            ((self._config["timeout"] * self._config["refresh_rate"]) - 1) // 2
+        ) / self._config["refresh_rate"]
 
     def transmit_packet(self, packet, frame_is_equal_to_last: bool):
         timestamp = time.time()
         if frame_is_equal_to_last:
-            half_of_timeout = (
-                ((self._config["timeout"] * self._config["refresh_rate"]) - 1)
-                // 2
-            ) / self._config["refresh_rate"]
+            half_of_timeout = self.keepalive_interval()
             if timestamp > self.last_frame_sent_time + half_of_timeout:
                 if self._destination is not None:
                     self._sock.sendto(
@@ -30,6 +30,11 @@ class WLEDDevice(NetworkedDevice):
                 description="Time between LedFx effect off and WLED effect activate",
                 default=1,
             ): vol.All(int, vol.Range(0, 255)),
+            vol.Optional(
+                "delta_chunks",
+                description="DDP and UDP (DNRGB) only: resend just the packets of a frame whose pixels changed, for large mostly static matrices",
+                default=False,
+            ): bool,
             vol.Optional(
                 "create_segments",
                 description="Import WLED segments into LedFx",
@@ -64,12 +69,14 @@ class WLEDDevice(NetworkedDevice):
                 "udp_packet_type": "DNRGB",
                 "timeout": 1,
                 "minimise_traffic": True,
+                "delta_chunks": False,
             },
             "DDP": {
                 "name": None,
                 "port": 4048,
                 "ip_address": None,
                 "pixel_count": None,
+                "delta_chunks": False,
             },
             "E131": {
                 "name": None,
@@ -87,10 +94,18 @@ class WLEDDevice(NetworkedDevice):
             self.subdevice, self.SYNC_MODES[self._config["sync_mode"]]
         ):
             self.setup_subdevice()
+        else:
+            # only the DDP and UDP subdevices have a delta mode
+            delta_chunks = config["delta_chunks"]
+            if self.subdevice._config.get("delta_chunks", delta_chunks) != (
+                delta_chunks
+            ):
+                self.setup_subdevice()
 
     def setup_subdevice(self):
         if self.subdevice is not None:
             self.subdevice.deactivate()
+            self.perf.delta = None
 
         device = self.SYNC_MODES[self._config["sync_mode"]]
         config = self.device_configs[self._config["sync_mode"]]
@@ -98,9 +113,16 @@ class WLEDDevice(NetworkedDevice):
         config["ip_address"] = self._config["ip_address"]
         config["pixel_count"] = self._config["pixel_count"]
         config["refresh_rate"] = self._config["refresh_rate"]
+        if "delta_chunks" in config:
+            config["delta_chunks"] = self._config["delta_chunks"]
 
         self.subdevice = device(self._ledfx, config)
         self.subdevice._destination = self._destination
+        # frames reach the subdevice through this device's output stage,
+        # so it has none of its own and reports its packet counters as this
+        # device's
+        self.subdevice._own_output = False
+        self.subdevice.perf = self.perf
 
     def activate(self):
         if self.subdevice is None:
@@ -109,9 +131,9 @@ class WLEDDevice(NetworkedDevice):
         super().activate()
 
     def deactivate(self):
+        super().deactivate()
         if self.subdevice is not None:
             self.subdevice.deactivate()
-        super().deactivate()
 
     async def resolve_address(self, success_callback=None):
         await super().resolve_address(success_callback)
@@ -41,7 +41,7 @@ class ZenggeDevice(NetworkedDevice):
 
     def flush(self, data):
         try:
-            byteData = data.astype(np.dtype("B"))
+            byteData = data.astype(np.dtype("B"), copy=False)
             rgb = byteData.flatten().tolist()
             self.bulb.setRgb(rgb[0], rgb[1], rgb[2])
 
@@ -37,6 +37,9 @@ class DummyEffect:
     def get_pixels(self):
         return self.pixels
 
+    def static_frame(self):
+        return None
+
     def activate(self):
         pass
 
@@ -167,6 +170,29 @@ def _gaussian_kernel1d(sigma: float, order: int, array_len: int) -> NDArray:
     return phi_x
 
 
+@lru_cache(maxsize=64)
+def _mirror_indices(pixel_count: int, flip: bool) -> tuple:
+    """
+    Produces the index maps used to mirror (and optionally flip) a strip.
+
+    Mirroring concatenates the reversed strip with the strip and takes the
+    max of each pair of adjacent pixels. Pixel i of the output is therefore
+    the max of the source pixels at first[i] and second[i].
+
+    Args:
+        pixel_count (int): The number of pixels in the strip.
+        flip (bool): Whether the strip is flipped before being mirrored.
+
+    Returns:
+        tuple: The (first, second) index arrays.
+    """
+    indices = np.arange(pixel_count)
+    if flip:
+        indices = indices[::-1]
+    mirrored = np.concatenate((indices[::-1], indices))
+    return mirrored[::2].copy(), mirrored[1::2].copy()
+
+
 def fast_blur_pixels(pixels: NDArray, sigma: float) -> NDArray:
     """
     Applies a fast blur effect to the given pixels using a Gaussian kernel.
@@ -278,6 +304,9 @@ class Effect(BaseRegistry):
     ADVANCED_KEYS = None
     # over ride in effect children to allow edit and show others
     PERMITTED_KEYS = None
+    # over ride in effect children that reach into other parts of LedFx
+    # while rendering, so they are never moved to a render worker process
+    SHARDABLE = True
     _config = None
     _active = False
     _virtual = None
@@ -316,6 +345,17 @@ class Effect(BaseRegistry):
         }
     )
 
+    # double buffered output of get_pixels, allocated on first use
+    _output_buffers = None
+    _output_scratch = None
+    _output_background = None
+    _output_index = 0
+
+    # bumped whenever the effect's output has to be produced again
+    _config_version = 0
+    # the config version a static effect last produced its output for
+    _static_version = None
+
     def __init__(self, ledfx, config):
         self._ledfx = ledfx
         self._config = {}
@@ -330,7 +370,10 @@ class Effect(BaseRegistry):
         """Attaches an output channel to the effect"""
         with self.lock:
             self._virtual = virtual
-            self.pixels = np.zeros((virtual.effective_pixel_count, 3))
+            self.pixels = np.zeros(
+                (virtual.effective_pixel_count, 3), dtype=virtual.pixel_dtype
+            )
+            self._config_version += 1
             # Iterate all the base classes and check to see if the base
             # class has an on_activate method. If so, call it
             valid_classes = list(type(self).__bases__)
@@ -350,6 +393,9 @@ class Effect(BaseRegistry):
     def deactivate(self):
         """Detaches an output channel from the effect"""
         self.pixels = None
+        self._output_buffers = None
+        self._output_scratch = None
+        self._output_background = None
         self._active = False
         _LOGGER.info(f"Effect {self.NAME} deactivated.")
 
@@ -399,6 +445,9 @@ class Effect(BaseRegistry):
             self.mirror = self._config["mirror"]
             self.brightness = self._config["brightness"]
 
+            # rebuilt by get_pixels using the new color and brightness
+            self._output_background = None
+
             def inherited(cls, method):
                 if hasattr(cls, method) and hasattr(super(cls, cls), method):
                     return cls.foo == super(cls).foo
@@ -411,6 +460,8 @@ class Effect(BaseRegistry):
             for base in valid_classes:
                 if base.config_updated != super(base, base).config_updated:
                     base.config_updated(self, self._config)
+            # only once the subclasses have caught up with the new config
+            self._config_version += 1
 
             _LOGGER.debug(
                 f"Effect {self.NAME} config updated to {validated_config}."
@@ -425,6 +476,29 @@ class Effect(BaseRegistry):
         """
         pass
 
+    def static_frame(self):
+        """
+        Returns an id of the effect's current output while that output
+        can't change by itself, otherwise None.
+
+        Virtuals hold on to their last frame for as long as the id stays
+        the same, skipping the render, post-processing and flush of the
+        effect until its config changes.
+        """
+        if self._static_version == self._config_version:
+            return self._static_version
+        return None
+
+    def mark_static(self, config_version):
+        """
+        Marks the output produced for config_version as the effect's
+        output until its config changes. Effects that only depend on their
+        config call this once they have written their pixels, passing the
+        config version they started from, so a config change that raced
+        the render isn't marked as done.
+        """
+        self._static_version = config_version
+
     def _render(self):
         with self.lock:
             # its possible we were waiting on the effect being deactivated
@@ -444,6 +518,12 @@ class Effect(BaseRegistry):
         """
         Get the current pixels for the effect and apply flip, mirror, blur, brightness and background color transformations
 
+        The transformations are written into one of two preallocated output
+        buffers which are alternated between frames, so the frame returned
+        previously stays intact while the next one is assembled. A returned
+        frame is only valid until the call after next, anything keeping it
+        longer or handing it to another thread must copy it.
+
         Returns:
             numpy.ndarray: The modified pixel array.
         """
@@ -451,34 +531,40 @@ class Effect(BaseRegistry):
             pixels = None
             if hasattr(self, "pixels"):
                 if self.pixels is not None:
-                    pixels = np.copy(self.pixels)
+                    pixels = self._next_output_buffer()
                     # Grab the config and store it here for use in the function - we use it a lot
                     config = self._config
 
                     # Apply some of the base output filters if necessary
-                    if self.flip:
-                        pixels = np.flipud(pixels)
-
+                    source = self.pixels
                     if self.mirror:
-                        # concatenate the pixels for mirror, then take the max of adjacent pixels
+                        # take the max of adjacent pixels of the (flipped) mirrored strip
                         # prevents average dimming and is best compromise, removes flicker
                         # inherently symetrical
-                        mirrored_pixels = np.concatenate(
-                            (pixels[::-1], pixels)
-                        )
-                        pixels = np.maximum(
-                            mirrored_pixels[::2], mirrored_pixels[1::2]
+                        first, second = _mirror_indices(len(source), self.flip)
+                        np.take(source, first, axis=0, out=pixels)
+                        np.take(
+                            source, second, axis=0, out=self._output_scratch
                         )
+                        np.maximum(pixels, self._output_scratch, out=pixels)
+                        source = pixels
+                    elif self.flip:
+                        source = source[::-1]
 
-                    if self.bg_color_use:
-                        pixels += self._bg_color
+                    # brightness is applied while copying the frame into the
+                    # output buffer, so the background color is scaled to match
                     if self.brightness is not None:
                         np.multiply(
-                            pixels,
+                            source,
                             self.brightness,
                             out=pixels,
                             casting="unsafe",
                         )
+                    elif source is not pixels:
+                        np.copyto(pixels, source)
+
+                    if self.bg_color_use:
+                        pixels += self._background_frame()
 
                     # If the configured blur is greater than 0 and pixel_count > 3, apply blur
                     # The matrix math requires > 3 pixels to work properly
@@ -506,6 +592,40 @@ class Effect(BaseRegistry):
                         # pixels[:, 3] = np.convolve(pixels[:, 3], kernel, mode="same") # W
                 return pixels
 
+    def _next_output_buffer(self):
+        """
+        Returns the output buffer for the next frame, (re)allocating the
+        buffers whenever the shape or type of self.pixels changes.
+        """
+        buffers = self._output_buffers
+        if (
+            buffers is None
+            or buffers[0].shape != self.pixels.shape
+            or buffers[0].dtype != self.pixels.dtype
+        ):
+            buffers = self._output_buffers = (
+                np.empty_like(self.pixels),
+                np.empty_like(self.pixels),
+            )
+            self._output_scratch = np.empty_like(self.pixels)
+        self._output_index ^= 1
+        return buffers[self._output_index]
+
+    def _background_frame(self):
+        """
+        Returns the background color, scaled by the brightness, spread over
+        a whole frame. Adding a full frame is much faster than broadcasting a
+        single color across every pixel.
+        """
+        background = self._output_background
+        if background is None or background.shape != self.pixels.shape:
+            color = self._bg_color
+            if self.brightness is not None:
+                color = color * self.brightness
+            background = self._output_background = np.empty_like(self.pixels)
+            background[:] = color
+        return background
+
     @property
     def is_active(self):
         """Return if the effect is currently active"""
@@ -525,6 +645,7 @@ class Effects(RegistryLoader):
     """Thin wrapper around the effect registry that manages effects"""
 
     PACKAGE_NAME = "ledfx.effects"
+    MANIFEST_FILE = "manifest.json"
 
     def __init__(self, ledfx):
         super().__init__(ledfx=ledfx, cls=Effect, package=self.PACKAGE_NAME)
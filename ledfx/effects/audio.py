@@ -3,7 +3,7 @@ import queue
 import threading
 import time
 from collections import deque
-from functools import cached_property, lru_cache
+from functools import cached_property, lru_cache, wraps
 
 import aubio
 import numpy as np
@@ -26,6 +26,159 @@ _LOGGER = logging.getLogger(__name__)
 MIN_MIDI = 21
 MAX_MIDI = 108
 
+# Seconds an analysis keeps running on the audio thread after it was last read
+ANALYSIS_DEMAND_TIMEOUT = 2.0
+# weight of the newest sample in the analysis cost moving averages
+ANALYSIS_COST_SMOOTHING = 0.05
+
+
+def audio_analysis(*dependencies):
+    """
+    Declares a method of AudioAnalysisSource as an audio analysis.
+
+    The result is computed at most once per audio block, either by the audio
+    thread or by whichever reader asks for it first, and cached until the
+    next block invalidates it. An effect that reads the analysis from its
+    audio callback holds a reference on it until it unsubscribes, any other
+    read keeps it in demand for ANALYSIS_DEMAND_TIMEOUT seconds. Only
+    analyses in demand (and the analyses they depend on) are run ahead of
+    time for each block.
+
+    Args:
+        *dependencies (str): Names of the analyses this analysis reads.
+    """
+
+    def decorator(func):
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(self):
+            self._record_demand(name)
+            results = self._analysis_results
+            if name in results:
+                return results[name]
+            with self._analysis_lock:
+                results = self._analysis_results
+                if name not in results:
+                    # dependencies computed along the way record their own
+                    # cost, which is taken off this analysis' cost
+                    outer = self._analysis_nested_time
+                    self._analysis_nested_time = 0.0
+                    start_time = time.perf_counter()
+                    results[name] = func(self)
+                    duration = time.perf_counter() - start_time
+                    self._record_cost(
+                        name, duration - self._analysis_nested_time
+                    )
+                    self._analysis_nested_time = outer + duration
+                return results[name]
+
+        wrapper.dependencies = dependencies
+        return wrapper
+
+    return decorator
+
+
+def resolve_analyses(cls):
+    """
+    Orders the audio analyses of a class so each runs after its dependencies.
+
+    Args:
+        cls (type): The AudioAnalysisSource class to inspect.
+
+    Returns:
+        list: (name, dependants) tuples in dependency order, where dependants
+        is the set of analyses that need name to have been run, itself included.
+    """
+    dependencies = {}
+    for name in dir(cls):
+        attr = getattr(cls, name, None)
+        if callable(attr) and hasattr(attr, "dependencies"):
+            dependencies[name] = attr.dependencies
+
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Circular audio analysis dependency on {name}")
+        visiting.add(name)
+        for dependency in dependencies[name]:
+            if dependency in dependencies:
+                visit(dependency)
+            elif dependency not in cls.ALWAYS_ANALYSED:
+                raise ValueError(
+                    f"Audio analysis {name} depends on unknown {dependency}"
+                )
+        visiting.discard(name)
+        order.append(name)
+
+    for name in sorted(dependencies):
+        visit(name)
+
+    dependants = {name: {name} for name in order}
+    # dependencies come first, so walking backwards sees every dependant of
+    # an analysis before the analysis itself
+    for name in reversed(order):
+        for dependency in dependencies[name]:
+            if dependency in dependants:
+                dependants[dependency] |= dependants[name]
+
+    return [(name, frozenset(dependants[name])) for name in order]
+
+
+class AudioCallbackWorker:
+    """
+    Runs the subscribed callbacks of an audio source on their own thread.
+
+    The audio thread only signals that a new block is ready. If the callbacks
+    are still busy with an earlier block when the next one arrives the blocks
+    are coalesced, so the callbacks always see the latest block and slow
+    effects can never hold up audio capture.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self._pending = threading.Event()
+        self._running = True
+        self.skipped_blocks = 0
+        # the callback currently being run, if any
+        self.current = None
+        self._thread = threading.Thread(
+            name="Audio Callbacks", target=self._thread_function, daemon=True
+        )
+        self._thread.start()
+
+    def notify(self):
+        """Signals that a new audio block is ready"""
+        if self._pending.is_set():
+            self.skipped_blocks += 1
+        self._pending.set()
+
+    @property
+    def ident(self):
+        return self._thread.ident
+
+    def stop(self):
+        self._running = False
+        self._pending.set()
+
+    def _thread_function(self):
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            if not self._running:
+                break
+            for callback in list(self._source._callbacks):
+                self.current = callback
+                try:
+                    callback()
+                except Exception as e:
+                    _LOGGER.exception(f"Error in audio callback: {e}")
+            self.current = None
+
 
 class AudioInputSource:
     _audio_stream_active = False
@@ -38,6 +191,7 @@ class AudioInputSource:
     _volume_filter = ExpFilter(-90, alpha_decay=0.99, alpha_rise=0.99)
     _subscriber_threshold = 0
     _timer = None
+    _callback_worker = None
 
     @staticmethod
     def device_index_validator(val):
@@ -188,6 +342,9 @@ class AudioInputSource:
     def __init__(self, ledfx, config):
         self._ledfx = ledfx
         self.lock = threading.Lock()
+        # held while a block is processed so lazily computed analyses never
+        # see a half updated block
+        self._analysis_lock = threading.RLock()
         # We must not inherit legacy _callbacks from prior instances
         self._callbacks = []
         self.update_config(config)
@@ -402,6 +559,9 @@ class AudioInputSource:
                 self._stream.close()
                 self._stream = None
             self._audio_stream_active = False
+        if self._callback_worker is not None:
+            self._callback_worker.stop()
+            self._callback_worker = None
         _LOGGER.info("Audio source closed.")
 
     def subscribe(self, callback):
@@ -473,29 +633,38 @@ class AudioInputSource:
             try:
                 self.delay_queue.put_nowait(processed_audio_sample)
             except queue.Full:
-                self._raw_audio_sample = self.delay_queue.get_nowait()
+                delayed_audio_sample = self.delay_queue.get_nowait()
                 self.delay_queue.put_nowait(processed_audio_sample)
-                self.pre_process_audio()
-                self._invalidate_caches()
-                self._invoke_callbacks()
+                self._process_audio_sample(delayed_audio_sample)
         else:
-            self._raw_audio_sample = processed_audio_sample
-            self.pre_process_audio()
-            self._invalidate_caches()
-            self._invoke_callbacks()
+            self._process_audio_sample(processed_audio_sample)
 
         # print(f"Core Audio Processing Latency {round(time.time()-time_start, 3)} s")
         # return self._raw_audio_sample
 
+    def _process_audio_sample(self, audio_sample):
+        """Runs the audio thread's share of the work for a new block"""
+        with self._analysis_lock:
+            self._raw_audio_sample = audio_sample
+            self.pre_process_audio()
+            self._invalidate_caches()
+            self._run_analyses()
+        self._invoke_callbacks()
+
     def _invoke_callbacks(self):
         """Notifies all clients of the new data"""
-        for callback in self._callbacks:
-            callback()
+        if self._callback_worker is None:
+            self._callback_worker = AudioCallbackWorker(self)
+        self._callback_worker.notify()
 
     def _invalidate_caches(self):
         """Invalidates the necessary cache"""
         pass
 
+    def _run_analyses(self):
+        """Runs the analyses that are needed for every block"""
+        pass
+
     def pre_process_audio(self):
         """
         Pre-processing stage that will run on every sample, only
@@ -600,22 +769,27 @@ class AudioAnalysisSource(AudioInputSource):
         10000,
     ]
 
+    # analyses run for every block regardless of demand, the melbanks feed
+    # the frontend graphs as well as nearly every audio reactive effect
+    ALWAYS_ANALYSED = ("melbanks",)
+
     def __init__(self, ledfx, config):
         config = self.CONFIG_SCHEMA(config)
+        # analysis state must exist before the stream can deliver a block
+        self._analyses = resolve_analyses(type(self))
+        self._analysis_results = {}
+        self._analysis_demand = {}
+        self._analysis_consumers = {name: set() for name, _ in self._analyses}
+        # guards the consumer sets, which the callback worker adds to
+        self._consumers_lock = threading.Lock()
+        self._analysis_costs = {}
+        self._analysis_nested_time = 0.0
+        self._live_analyses = ()
+        self._analysis_thread = None
+        self._block_index = 0
         super().__init__(ledfx, config)
         self.initialise_analysis()
 
-        # Subscribe functions to be run on every frame of audio
-        self.subscribe(self.melbanks)
-        self.subscribe(self.pitch)
-        self.subscribe(self.onset)
-        self.subscribe(self.bar_oscillator)
-        self.subscribe(self.volume_beat_now)
-        self.subscribe(self.freq_power)
-
-        # ensure any new analysis callbacks are above this line
-        self._subscriber_threshold = len(self._callbacks)
-
     def initialise_analysis(self):
         # melbanks
         if not hasattr(self, "melbanks"):
@@ -698,14 +872,126 @@ class AudioAnalysisSource(AudioInputSource):
     def _invalidate_caches(self):
         """Invalidates the cache for all melbank related data"""
         super()._invalidate_caches()
+        self._analysis_results = {}
 
-        self.pitch.cache_clear()
-        self.onset.cache_clear()
-        self.bpm_beat_now.cache_clear()
-        self.volume_beat_now.cache_clear()
-        self.bar_oscillator.cache_clear()
+    def unsubscribe(self, callback):
+        """Unregisters a callback and releases the analyses it was reading"""
+        with self._consumers_lock:
+            for consumers in self._analysis_consumers.values():
+                consumers.discard(callback)
+        super().unsubscribe(callback)
+
+    def _record_demand(self, name):
+        """Attributes a read of an analysis to whoever is reading it"""
+        thread = threading.get_ident()
+        if thread == self._analysis_thread:
+            return
+        worker = self._callback_worker
+        if (
+            worker is not None
+            and worker.current is not None
+            and thread == worker.ident
+        ):
+            consumers = self._analysis_consumers[name]
+            # only take a reference for callbacks that are still subscribed,
+            # so a late block can't keep the analysis alive after unsubscribe
+            if (
+                worker.current not in consumers
+                and worker.current in self._callbacks
+            ):
+                with self._consumers_lock:
+                    consumers.add(worker.current)
+        else:
+            self._analysis_demand[name] = self._block_index
 
-    @lru_cache(maxsize=None)
+    def _record_cost(self, name, duration):
+        cost = self._analysis_costs.get(name)
+        if cost is None:
+            self._analysis_costs[name] = duration
+        else:
+            self._analysis_costs[name] = (
+                cost + (duration - cost) * ANALYSIS_COST_SMOOTHING
+            )
+
+    def _run_analyses(self):
+        """
+        Runs the melbanks and every analysis that an active effect consumes
+        or that was read within the last ANALYSIS_DEMAND_TIMEOUT seconds,
+        dependencies first. Analyses nobody reads are skipped entirely rather
+        than run for every block.
+        """
+        self._analysis_thread = threading.get_ident()
+        self._block_index += 1
+        cutoff = self._block_index - int(
+            self._config["sample_rate"] * ANALYSIS_DEMAND_TIMEOUT
+        )
+        # render threads add to the demand while this runs, so work from a
+        # snapshot, copying it is atomic
+        in_demand = {
+            name
+            for name, block in list(self._analysis_demand.items())
+            if block >= cutoff
+        }
+        in_demand.update(
+            name
+            for name, consumers in self._analysis_consumers.items()
+            if consumers
+        )
+
+        start_time = time.perf_counter()
+        self.melbanks()
+        self._record_cost("melbanks", time.perf_counter() - start_time)
+
+        live = []
+        for name, dependants in self._analyses:
+            if not in_demand.isdisjoint(dependants):
+                getattr(self, name)()
+                live.append(name)
+        self._live_analyses = tuple(live)
+
+    def get_analysis_stats(self):
+        """
+        Returns which analyses are live, how many active effects hold a
+        reference on each and the average time each takes to compute in
+        microseconds per block. An analysis' cost doesn't include the
+        analyses it depends on.
+        """
+        with self._consumers_lock:
+            consumers = {
+                name: set(callbacks)
+                for name, callbacks in self._analysis_consumers.items()
+            }
+        analyses = {}
+        for name in self.ALWAYS_ANALYSED:
+            analyses[name] = {
+                "live": True,
+                "consumers": len(self._callbacks),
+                "depends_on": [],
+            }
+        for name, dependants in self._analyses:
+            analyses[name] = {
+                "live": name in self._live_analyses,
+                "consumers": len(
+                    set().union(*(consumers[d] for d in dependants))
+                ),
+                "depends_on": list(getattr(type(self), name).dependencies),
+            }
+        for name, stats in analyses.items():
+            cost = self._analysis_costs.get(name)
+            stats["cost_us"] = round(cost * 1e6, 1) if cost is not None else 0
+
+        return {
+            "active": self._audio_stream_active,
+            "block_rate": self._config["sample_rate"],
+            "skipped_blocks": (
+                self._callback_worker.skipped_blocks
+                if self._callback_worker is not None
+                else 0
+            ),
+            "analyses": analyses,
+        }
+
+    @audio_analysis()
     def pitch(self):
         # If our audio handler is returning null, then we just return 0 for midi_value and wait for the device starts sending audio.
         try:
@@ -714,7 +1000,7 @@ class AudioAnalysisSource(AudioInputSource):
             _LOGGER.warning(e)
             return 0
 
-    @lru_cache(maxsize=None)
+    @audio_analysis()
     def onset(self):
         try:
             return bool(self._onset(self.audio_sample(raw=True))[0])
@@ -722,7 +1008,7 @@ class AudioAnalysisSource(AudioInputSource):
             _LOGGER.warning(e)
             return 0
 
-    @lru_cache(maxsize=None)
+    @audio_analysis()
     def bpm_beat_now(self):
         """
         Returns True if a beat is expected now based on BPM data
@@ -733,7 +1019,7 @@ class AudioAnalysisSource(AudioInputSource):
             _LOGGER.warning(e)
             return False
 
-    @lru_cache(maxsize=None)
+    @audio_analysis("melbanks")
     def volume_beat_now(self):
         """
         Returns True if a beat is expected now based on volume of the beat freq region
@@ -770,6 +1056,7 @@ class AudioAnalysisSource(AudioInputSource):
         else:
             return False
 
+    @audio_analysis("melbanks")
     def freq_power(self):
         # hard coded this bc i'm tired and it'll run faster
 
@@ -791,6 +1078,7 @@ class AudioAnalysisSource(AudioInputSource):
         self.freq_power_filter.update(self.freq_power_raw)
 
     def get_freq_power(self, i, filtered=True):
+        self.freq_power()
         if filtered:
             value = self.freq_power_filter.value[i]
         else:
@@ -831,7 +1119,7 @@ class AudioAnalysisSource(AudioInputSource):
         """
         return self.get_freq_power(3, filtered)
 
-    @lru_cache(maxsize=None)
+    @audio_analysis("bpm_beat_now")
     def bar_oscillator(self):
         """
         Returns a float (0<=x<4) corresponding to the position of the beat
@@ -909,9 +1197,7 @@ class AudioReactiveEffect(Effect):
         _LOGGER.info("Activating AudioReactiveEffect.")
         super().activate(channel)
 
-        if not self._ledfx.audio or id(AudioAnalysisSource) != id(
-            self._ledfx.audio.__class__
-        ):
+        if not isinstance(self._ledfx.audio, AudioAnalysisSource):
             self._ledfx.audio = AudioAnalysisSource(
                 self._ledfx, self._ledfx.config.get("audio", {})
             )
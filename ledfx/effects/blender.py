@@ -97,6 +97,8 @@ class Blender(AudioReactiveEffect, LogSec):
     CATEGORY = "Matrix"
     HIDDEN_KEYS = ["background_color", "background_brightness", "blur"]
     ADVANCED_KEYS = LogSec.ADVANCED_KEYS + []
+    # blends the frames of other virtuals, which only exist in the main process
+    SHARDABLE = False
 
     CONFIG_SCHEMA = vol.Schema(
         {
@@ -1,6 +1,5 @@
 import logging
 
-import mss
 import voluptuous as vol
 from PIL import Image
 
@@ -13,6 +12,8 @@ class Clone(Twod):
     NAME = "Clone"
     CATEGORY = "Matrix"
     HIDDEN_KEYS = Twod.HIDDEN_KEYS + ["test"]
+    # reads from the screen capture service in the main process
+    SHARDABLE = False
 
     CONFIG_SCHEMA = vol.Schema(
         {
@@ -45,9 +46,9 @@ class Clone(Twod):
     )
 
     def __init__(self, ledfx, config):
+        # config_updated releases the region, and runs from Effect.__init__
+        self.region = None
         super().__init__(ledfx, config)
-        self.grab = None
-        self.sct = None
 
     def config_updated(self, config):
         super().config_updated(config)
@@ -57,55 +58,27 @@ class Clone(Twod):
         self.y = self._config["across"]
         self.width = self._config["width"]
         self.height = self._config["height"]
-        self.grab = None
-        self.sct = None
-        self.fails = 0
-        self.giveup = False
+        self.remove_region()
 
-    def draw(self):
-        # if we hit 5 in a row, lets just give up and stop impacting the system
-        if self.fails >= 5:
-            self.giveup = True
-            _LOGGER.warning(f"Clone giving up after {self.fails} failures")
-            self.fails = 0
-
-        if self.giveup:
-            return
+    def deactivate(self):
+        self.remove_region()
+        super().deactivate()
 
-        if self.sct is None:
-            try:
-                self.sct = mss.mss()
-                # set up a grab dict to be used in the grab call
-                mon = self.sct.monitors[self.screen]
-                self.grab = {
-                    "top": mon["top"] + self.x,
-                    "left": mon["left"] + self.y,
-                    "width": self.width,
-                    "height": self.height,
-                    "mon": self.screen,
-                }
-            except Exception as e:
-                self.fails += 1
-                _LOGGER.warning(
-                    f"Clone Error setting up grab: {self.fails} {e}"
-                )
-                self.sct = None
-                return
+    def remove_region(self):
+        if self.region is not None:
+            self._ledfx.screen_capture.remove_region(self.region)
+            self.region = None
 
-        try:
-            frame = self.sct.grab(self.grab)
-        except Exception as e:
-            self.fails += 1
-            _LOGGER.warning(f"Clone Error grabbing frame :{self.fails}: {e}")
-            self.sct = None
-            return
-
-        rgb_image = Image.frombytes(
-            "RGB", frame.size, frame.bgra, "raw", "BGRX"
-        )
-
-        self.matrix = rgb_image.resize(
-            (self.r_width, self.r_height), Image.BILINEAR
+    def draw(self):
+        # screens are grabbed by the shared capture service, which serves
+        # every Clone from the latest grab at its own frame rate
+        if self.region is None:
+            self.region = self._ledfx.screen_capture.add_region(
+                self.screen, self.x, self.y, self.width, self.height
+            )
+
+        rgb = self._ledfx.screen_capture.read(
+            self.region, self.r_width, self.r_height
         )
-
-        self.fails = 0
+        if rgb is not None:
+            self.matrix = Image.fromarray(rgb, "RGB")
@@ -36,6 +36,8 @@ class Fire(AudioReactiveEffect, HSVEffect):
         self.h = np.zeros(self.pixel_count)
         self.s = np.zeros(self.pixel_count)
         self.v = np.zeros(self.pixel_count)
+        # one past the end, where trails reaching the top end
+        self._trails = np.zeros(self.pixel_count + 1)
         self.delta_last = time.time()
 
     def config_updated(self, config):
@@ -69,30 +71,34 @@ class Fire(AudioReactiveEffect, HSVEffect):
 
         np.multiply(pixels, self.cooling, out=pixels)
 
-        for k in range(self.pixel_count - 1, 4, -1):
-            h1 = pixels[k - 1]
-            h2 = pixels[k - 2]
-            h3 = pixels[k - 3]
-            h4 = pixels[k - 4]
-            pixels[k] = (h1 + h2 + h3 * 2 + h4 * 3) / 7
-
-        for i in range(self.spark_count):
-            if self.sparks[i] <= 0:
-                self.sparks[i] = np.random.random(1)
-
-            self.sparks[i] += self.accel * delta
-            ox = self.sparkX[i]
-            self.sparkX[i] += self.sparks[i] * self.sparks[i] * delta
-
-            if self.sparkX[i] > self.pixel_count:
-                self.sparkX[i] = 0
-                self.sparks[i] = 0
-                continue
-
-            j = int(ox)
-            while j < self.sparkX[i]:
-                pixels[j] += np.clip(1 - self.sparks[i] * 0.4, 0, 1) * 0.5
-                j += 1
+        # Heat drifts up from the four pixels below. The update runs from
+        # the top down, so it only ever reads heat from the last frame.
+        pixels[5:] = (
+            pixels[4:-1] + pixels[3:-2] + pixels[2:-3] * 2 + pixels[1:-4] * 3
+        ) / 7
+
+        # Relight the sparks that burnt out
+        burnt_out = self.sparks <= 0
+        self.sparks[burnt_out] = np.random.random(np.count_nonzero(burnt_out))
+
+        self.sparks += self.accel * delta
+        start = self.sparkX.astype(int)
+        self.sparkX += self.sparks * self.sparks * delta
+
+        gone = self.sparkX > self.pixel_count
+        self.sparkX[gone] = 0
+        self.sparks[gone] = 0
+
+        # Each spark heats the pixels it passed through this frame, summed
+        # as a difference array so overlapping trails add up
+        end = np.maximum(np.ceil(self.sparkX).astype(int), start)
+        heat = np.clip(1 - self.sparks * 0.4, 0, 1) * 0.5
+        heat[gone] = 0
+        trails = self._trails
+        trails[:] = 0
+        np.add.at(trails, start, heat)
+        np.subtract.at(trails, end, heat)
+        pixels += np.cumsum(trails[:-1])
 
         np.power(pixels, 2, out=self.h)
         np.clip(self.h, 0, 1, out=self.h)
@@ -1,6 +1,7 @@
 import logging
 import os
 
+import numpy as np
 import voluptuous as vol
 from PIL import Image
 
@@ -59,21 +60,52 @@ class GifPlayer(Twod, GifBase):
         # If for some unknown reason the url_path is blank (someone saved a preset with no string)/
         if gif_path == "":
             # Show animated LedFx logo
-            self.gif = open_gif(self.DEFAULT_GIF_PATH)
-        else:
-            # Try to open the url
-            self.gif = open_gif(gif_path)
+            gif_path = self.DEFAULT_GIF_PATH
+        self.frames = self.load_frames(gif_path)
         # If the URL doesn't work
-        if self.gif is None:
+        if self.frames is None:
             # Show the animated LedFx logo
-            self.gif = open_gif(self.DEFAULT_GIF_PATH)
+            self.frames = self.load_frames(self.DEFAULT_GIF_PATH)
 
-        self.process_gif()
         # Seed the frame data with the first frame
-        self.frame_data = self.frames[0]
+        self.frame_data = self.frame_image(0)
         self.gif_frame_duration = 1 / self.gif_fps
         self.last_frame_time = self.current_time
 
+    def load_frames(self, gif_path):
+        """
+        Load the GIF frames resized to the matrix, from the GIF cache if
+        they have been decoded before.
+
+        Returns:
+            np.ndarray: (frames, height, width, 3) uint8 frames, or None if
+            the GIF failed to open
+        """
+        gif_cache = self._ledfx.gif_cache
+        try:
+            key = gif_cache.frames_key(
+                gif_path,
+                (self.r_width, self.r_height),
+                self._config["resize_method"],
+            )
+            frames = gif_cache.load(key)
+            if frames is not None:
+                return frames
+            self.gif = open_gif(gif_cache.fetch(gif_path))
+        except Exception as e:
+            _LOGGER.warning(f"Failed to open gif : {gif_path} : {e}")
+            return None
+        if self.gif is None:
+            return None
+        return gif_cache.store(key, self.process_gif())
+
+    def frame_image(self, frame_index):
+        """Wrap a frame in an image without copying it out of the cache"""
+        frame = self.frames[frame_index]
+        return Image.frombuffer(
+            "RGB", (frame.shape[1], frame.shape[0]), frame, "raw", "RGB", 0, 1
+        )
+
     def draw(self):
         self.step_gif_if_time_elapsed()
         self.matrix.paste(self.frame_data)
@@ -97,19 +129,19 @@ class GifPlayer(Twod, GifBase):
                     self.current_frame = 0
                 else:
                     self.current_frame += 1
-            self.frame_data = self.frames[self.current_frame]
+            self.frame_data = self.frame_image(self.current_frame)
             self.last_frame_time = self.current_time
 
     def process_gif(self):
         """
-        Process the GIF frames and store them in the frames object.
-
-        This method iterates over each frame of the GIF, applies necessary transformations,
-        and stores the processed frames.
+        Decode the GIF frames and resize them to the matrix.
 
         Returns:
-            None
+            np.ndarray: (frames, height, width, 3) uint8 frames
         """
+        frames = np.empty(
+            (self.gif.n_frames, self.r_height, self.r_width, 3), dtype=np.uint8
+        )
         black_background = Image.new("RGBA", self.gif.size, (0, 0, 0))
         # For every frame
         for frame_index in range(self.gif.n_frames):
@@ -125,6 +157,7 @@ class GifPlayer(Twod, GifBase):
                 (self.r_width, self.r_height), resample=self.resize_method
             )
             # Add the frame to our frames object
-            self.frames.append(final_frame_data)
+            frames[frame_index] = final_frame_data.convert("RGB")
         # Close image
         self.gif.close()
+        return frames
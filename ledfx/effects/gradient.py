@@ -225,5 +225,10 @@ class TemporalGradientEffect(TemporalEffect, GradientEffect, ModulateEffect):
         # TODO: Could add some cool effects like twinkle or sin modulation
         # of the gradient.
         # kinda done
+        if self.static_frame() is not None:
+            return
+        config_version = self._config_version
         pixels = self.apply_gradient(1)
         self.pixels = self.modulate(pixels)
+        if self._config["gradient_roll"] == 0 and not self._config["modulate"]:
+            self.mark_static(config_version)
@@ -515,14 +515,80 @@ class Melbanks:
         self.mel_count = len(self.melbanks_config["max_frequencies"])
         self.mel_len = self.melbanks_config["samples"]
         # set up melbank data buffers.
-        # these are stored as numpy arrays in a tuple to allow direct access to the buffers
-        self.melbanks = tuple(
-            np.zeros(self.mel_len) for _ in range(self.mel_count)
+        # each melbank is a row of a single (mel_count, samples) array so the
+        # whole set can be processed at once, the rows are exposed as a tuple
+        # to allow direct access to the buffers
+        self._melbank_data = np.zeros((self.mel_count, self.mel_len))
+        self._melbank_filtered_data = np.zeros((self.mel_count, self.mel_len))
+        self.melbanks = tuple(self._melbank_data)
+        self.melbanks_filtered = tuple(self._melbank_filtered_data)
+        self.minimum_volume = self._audio._config["min_volume"]
+        self._batched = self._build_batch()
+
+    def _build_batch(self):
+        """
+        Stacks the filterbank coefficients of every melbank processor into a
+        single matrix so all the melbanks can be computed with one matrix
+        multiply, and sets up filters that run over all of them at once.
+
+        Returns:
+            bool: False if the melbanks can't be batched because they are not
+            all the same length, in which case each processor runs on its own.
+        """
+        coeffs = [
+            proc.filterbank.get_coeffs() for proc in self.melbank_processors
+        ]
+        if not coeffs or any(c.shape[0] != self.mel_len for c in coeffs):
+            return False
+
+        coeffs = np.concatenate(coeffs)
+        # the low melbanks only cover the first few FFT bins, drop the bins
+        # above the highest frequency any of the melbanks respond to
+        self._fft_bins = int(np.flatnonzero(np.any(coeffs, axis=0))[-1]) + 1
+        self._coeffs = np.ascontiguousarray(coeffs[:, : self._fft_bins])
+        self._filterbank_out = np.zeros(len(self._coeffs), dtype=np.float32)
+        self._power_factor = np.array(
+            [[proc.power_factor] for proc in self.melbank_processors]
         )
-        self.melbanks_filtered = tuple(
-            np.zeros(self.mel_len) for _ in range(self.mel_count)
+        # a row of this matrix is fast_blur_array() applied to a unit impulse,
+        # so blurring every melbank is a single matrix multiply
+        self._blur_matrix = np.array(
+            [
+                fast_blur_array(impulse, sigma=1.0)
+                for impulse in np.eye(self.mel_len)
+            ]
+        )
+
+        # same filters as each Melbank, stacked across the melbanks
+        self.mel_gain = ExpFilter(alpha_decay=0.01, alpha_rise=0.99)
+        self.mel_smoothing = ExpFilter(alpha_decay=0.7, alpha_rise=0.99)
+        self.common_filter = ExpFilter(alpha_decay=0.99, alpha_rise=0.01)
+        self.diff_filter = ExpFilter(alpha_decay=0.15, alpha_rise=0.99)
+        return True
+
+    def _process_batch(self, frequency_domain):
+        """Computes every melbank in one pass, mirroring Melbank.__call__"""
+        filter_banks = self._melbank_data
+
+        np.dot(
+            self._coeffs,
+            frequency_domain.norm[: self._fft_bins],
+            out=self._filterbank_out,
+        )
+        filter_banks.reshape(-1)[:] = self._filterbank_out
+
+        np.power(filter_banks, self._power_factor, out=filter_banks)
+
+        self.mel_gain.update(
+            np.max(np.dot(filter_banks, self._blur_matrix), axis=1)
+        )
+        filter_banks /= self.mel_gain.value[:, None]
+        filter_banks[:] = self.mel_smoothing.update(filter_banks)
+
+        self.common_filter.update(filter_banks)
+        self._melbank_filtered_data[:] = self.diff_filter.update(
+            filter_banks - self.common_filter.value
         )
-        self.minimum_volume = self._audio._config["min_volume"]
 
     def __call__(self):
         # fastest way i could think of.
@@ -536,17 +602,18 @@ class Melbanks:
         )
 
         if volume_threshold:
-            for i, proc in enumerate(self.melbank_processors):
-                proc(
-                    frequency_domain,
-                    self.melbanks[i],
-                    self.melbanks_filtered[i],
-                )
+            if self._batched:
+                self._process_batch(frequency_domain)
+            else:
+                for i, proc in enumerate(self.melbank_processors):
+                    proc(
+                        frequency_domain,
+                        self.melbanks[i],
+                        self.melbanks_filtered[i],
+                    )
         else:
-            for melbank in self.melbanks:
-                melbank[:] = 0
-            for melbank_filtered in self.melbanks_filtered:
-                melbank_filtered[:] = 0
+            self._melbank_data[:] = 0
+            self._melbank_filtered_data[:] = 0
 
         if self.dev_enabled:
             for i in range(len(self.melbank_processors)):
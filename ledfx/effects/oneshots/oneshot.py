@@ -25,6 +25,10 @@ class Oneshot(ABC):
 
     @abstractmethod
     def apply(self, seg, start, stop):
+        """
+        Applies the oneshot in place to seg[start:stop], where seg holds
+        the uint8 pixels a virtual is sending to its devices
+        """
         raise NotImplementedError("Please implement this method")
 
     @property
@@ -87,5 +91,5 @@ class Flash(Oneshot):
 
     def apply(self, seg, start, stop):
         blend = np.multiply(self._color, self._weight)
-        np.multiply(seg, 1 - self._weight, seg)
-        np.add(seg, blend, seg)
+        # blended in floating point, then truncated back into seg
+        seg[:] = seg * (1 - self._weight) + blend
@@ -74,6 +74,10 @@ class RainAudioEffect(AudioReactiveEffect):
         self.drop_animation = load_droplet(config["raindrop_animation"])
 
         self.n_frames, self.frame_width = np.shape(self.drop_animation)
+        # offsets of a drop's pixels from its location, and of the color
+        # channels in the flattened overlay
+        self._frame_offsets = np.arange(self.frame_width)
+        self._channel_offsets = np.arange(3)[:, None, None]
         self.frame_centre_index = self.frame_width // 2
         self.frame_side_lengths = self.frame_centre_index - 1
 
@@ -103,22 +107,29 @@ class RainAudioEffect(AudioReactiveEffect):
         """
         Get colored pixel data of all drops overlaid
         """
-        # 2d array containing color intensity data
-        overlaid_frames = np.zeros((3, self.pixel_count + self.frame_width))
+        width = self.pixel_count + self.frame_width
         # Indexes of active drop animations
-        drop_indices = np.flatnonzero(self.drop_frames)
-        # TODO vectorize this to remove for loop
-        for index in drop_indices:
-            if self.drop_frames[index] >= len(self.drop_animation):
-                continue
-            colored_frame = [
-                self.drop_animation[self.drop_frames[index]]
-                * self.drop_colors[color, index]
-                for color in range(3)
-            ]
-            overlaid_frames[
-                :, index : index + self.frame_width
-            ] += colored_frame
+        drop_indices = np.flatnonzero(
+            (self.drop_frames > 0) & (self.drop_frames < self.n_frames)
+        )
+        # Color intensity of every pixel of every drop's current frame
+        colored_frames = (
+            self.drop_animation[self.drop_frames[drop_indices]]
+            * self.drop_colors[:, drop_indices, None]
+        )
+        # Where each of those lands in the flattened (3, width) overlay
+        targets = (
+            drop_indices[:, None]
+            + self._frame_offsets
+            + self._channel_offsets * width
+        )
+        # 2d array containing color intensity data, with overlapping drops
+        # summed
+        overlaid_frames = np.bincount(
+            targets.ravel(),
+            weights=colored_frames.ravel(),
+            minlength=3 * width,
+        ).reshape(3, width)
 
         self.pixels = overlaid_frames[
             :,
@@ -25,5 +25,10 @@ class SingleColorEffect(TemporalEffect, ModulateEffect):
         pass
 
     def effect_loop(self):
+        if self.static_frame() is not None:
+            return
+        config_version = self._config_version
         color_array = np.tile(self.color, (self.pixel_count, 1))
         self.pixels = self.modulate(color_array)
+        if not self._config["modulate"]:
+            self.mark_static(config_version)
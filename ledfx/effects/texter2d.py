@@ -51,6 +51,8 @@ class Texter2d(Twod, GradientEffect):
     # add keys you want hidden or in advanced here
     HIDDEN_KEYS = Twod.HIDDEN_KEYS + []
     ADVANCED_KEYS = Twod.ADVANCED_KEYS + ["resize_method", "deep_diag"]
+    # fires its virtual's fallback when the text is done
+    SHARDABLE = False
 
     CONFIG_SCHEMA = vol.Schema(
         {
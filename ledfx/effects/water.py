@@ -186,15 +186,13 @@ class Water(AudioReactiveEffect, HSVEffect):
         # The 2D version of this algorithm uses the north and south neighbors.
         # Since we don't have that here, I dropped in the value at the current
         # position.  This slows down the waves somewhat and still looks nice.
-        for pixel in range(1, self.pixel_count - 1):
-            buf[dest][pixel] = (
-                (
-                    buf[src][pixel - 1]
-                    + buf[src][pixel + 1]
-                    + buf[src][pixel] * 2
-                )
-                / 2
-            ) - buf[dest][pixel]
+        # Every pixel only reads the source buffer and its own destination
+        # value, so the whole span is updated at once.
+        src_buf = buf[src]
+        dest_buf = buf[dest]
+        dest_buf[1:-1] = (
+            (src_buf[:-2] + src_buf[2:] + src_buf[1:-1] * 2) / 2
+        ) - dest_buf[1:-1]
 
         buf[dest] = smooth(buf[dest], 1.0)
         buf[dest] -= buf[dest] / damp_factor
@@ -26,6 +26,8 @@ class Event:
     GLOBAL_PAUSE = "global_pause"
     VIRTUAL_PAUSE = "virtual_pause"
     AUDIO_INPUT_DEVICE_CHANGED = "audio_input_device_changed"
+    PERF_UPDATE = "perf_update"
+    GOVERNOR_UPDATE = "governor_update"
 
     def __init__(self, type: str):
         self.event_type = type
@@ -119,12 +121,45 @@ class VisualisationUpdateEvent(Event):
         vis_id: str,  # id of device/virtual
         pixels: np.ndarray,
         shape: tuple,
+        rgb: bytes = None,  # raw frame for binary websocket clients
     ):
         super().__init__(Event.VISUALISATION_UPDATE)
         self.is_device = is_device
         self.vis_id = vis_id
         self.pixels = pixels
         self.shape = shape
+        self.rgb = rgb
+
+    def to_dict(self):
+        event_dict = dict(self.__dict__)
+        del event_dict["rgb"]
+        return event_dict
+
+
+class PerfUpdateEvent(Event):
+    """Event emitted periodically with the per-stage frame timings"""
+
+    def __init__(self, virtuals: dict, devices: dict):
+        super().__init__(Event.PERF_UPDATE)
+        self.virtuals = virtuals
+        self.devices = devices
+
+
+class GovernorUpdateEvent(Event):
+    """Event emitted when the frame rate governor changes a virtual's rate"""
+
+    def __init__(
+        self,
+        virtual_id: str,
+        refresh_rate: int,
+        max_refresh_rate: int,
+        reason: str,
+    ):
+        super().__init__(Event.GOVERNOR_UPDATE)
+        self.virtual_id = virtual_id
+        self.refresh_rate = refresh_rate
+        self.max_refresh_rate = max_refresh_rate
+        self.reason = reason
 
 
 class EffectSetEvent(Event):
@@ -215,6 +250,9 @@ class Events:
             if not listener.filter_event(event):
                 self._ledfx.loop.call_soon_threadsafe(listener.callback, event)
 
+    def has_listeners(self, event_type: str) -> bool:
+        return event_type in self._listeners
+
     def add_listener(
         self,
         callback: Callable,
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import urllib.request
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# Directory under the config directory holding the cached frames
+GIF_CACHE_DIR = "gif_cache"
+# Total size of the cached files, the least recently used are evicted
+GIF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+FRAMES_SUFFIX = ".npy"
+SOURCE_SUFFIX = ".src"
+
+
+def is_remote(source):
+    return source.startswith("http://") or source.startswith("https://")
+
+
+class GifFrameCache:
+    """
+    On-disk cache of decoded GIF frames.
+
+    Decoding a GIF and resizing every frame to the matrix takes hundreds
+    of milliseconds for big GIFs, so the resized frames are stored as one
+    uint8 (frames, height, width, 3) array per source, size and resize
+    method. Loading a cached GIF memory maps the file, the frames are only
+    read from disk as they are pasted. Remote GIFs are downloaded once and
+    kept alongside, so a new matrix size doesn't download them again.
+
+    Files are replaced atomically, so LedFx and its render workers can
+    share a cache directory. Each use touches the file's modification time,
+    which orders the eviction of the least recently used files once the
+    cache grows over max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=GIF_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def frames_key(self, source, size, resize_method):
+        """
+        Returns the cache key of a source's frames resized to size.
+
+        Local files are identified by their path, size and modification
+        time, so an edited file is decoded again. Remote sources are
+        identified by their URL.
+        """
+        if is_remote(source):
+            identity = source
+        else:
+            path = os.path.abspath(source)
+            stat = os.stat(path)
+            identity = f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+        width, height = size
+        return self._hash(f"{identity}:{width}x{height}:{resize_method}")
+
+    def load(self, key):
+        """Returns the memory mapped frames of key, or None if not cached"""
+        path = self._file(key, FRAMES_SUFFIX)
+        try:
+            frames = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self._touch(path)
+        self.hits += 1
+        return frames
+
+    def store(self, key, frames):
+        """
+        Stores frames under key and returns them memory mapped from the
+        cache, or as they are if they couldn't be written.
+        """
+        frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        path = self._file(key, FRAMES_SUFFIX)
+        try:
+            self._write(path, lambda file: np.save(file, frames))
+            self.evict()
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"Failed to cache GIF frames: {e}")
+            return frames
+
+    def fetch(self, source):
+        """
+        Returns a local path for source, downloading remote sources into
+        the cache the first time they are used.
+        """
+        if not is_remote(source):
+            return source
+        path = self._file(self._hash(source), SOURCE_SUFFIX)
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+
+        _LOGGER.debug(f"Downloading {source} into the GIF cache")
+
+        def download(file):
+            with urllib.request.urlopen(source) as url:
+                shutil.copyfileobj(url, file)
+
+        self._write(path, download)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Removes the least recently used files over max_bytes"""
+        if not os.path.isdir(self.path):
+            return
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.path):
+                if entry.name.endswith((FRAMES_SUFFIX, SOURCE_SUFFIX)):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    # still mapped by an effect on Windows
+                    continue
+                total -= size
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def _file(self, key, suffix):
+        return os.path.join(self.path, key + suffix)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path, write):
+        os.makedirs(self.path, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                write(file)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import psutil
+
+from ledfx.events import GovernorUpdateEvent
+from ledfx.utils import AVAILABLE_FPS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between governor decisions
+GOVERNOR_INTERVAL = 2.0
+# Share of the scheduler thread's time spent on frames above which frame
+# rates are stepped down, and below which they are restored
+LOAD_HIGH = 0.85
+LOAD_LOW = 0.5
+# Share of frames that took longer than their frame interval
+OVERRUNS_HIGH = 0.1
+OVERRUNS_LOW = 0.01
+# System wide CPU usage, in percent
+CPU_HIGH = 95.0
+CPU_LOW = 80.0
+# Each step lowers a rate to at most this share of the current one, the
+# AVAILABLE_FPS keys are too close together to step one at a time
+STEP_FACTOR = 0.75
+# Consecutive calm decisions before a frame rate is stepped back up
+RESTORE_AFTER = 3
+# Number of decisions kept for the API
+DECISION_HISTORY = 50
+
+# Ranks of the virtuals' frame_rate_priority, lowest is stepped down first
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+
+class FrameRateGovernor:
+    """
+    Degrades frame rates in a controlled way when the host can't keep up.
+
+    All virtuals are rendered on the frame scheduler's thread, so the
+    governor adds up the time each one takes per second at its refresh
+    rate and watches the frames overrunning their interval along with the
+    overall CPU usage. Under pressure it steps the refresh rate of one
+    virtual at a time down along AVAILABLE_FPS, lowest frame_rate_priority
+    first, and steps them back up one at a time once there has been
+    headroom for a while.
+    """
+
+    def __init__(self, ledfx):
+        self._ledfx = ledfx
+        self._rates = sorted(AVAILABLE_FPS)
+        self._calm = 0
+        self._frames = {}
+        self._overruns = {}
+        self.load = 0.0
+        self.overrun_ratio = 0.0
+        self.cpu_percent = None
+        self.decisions = deque(maxlen=DECISION_HISTORY)
+        # the first call only starts the measurement
+        psutil.cpu_percent(None)
+
+    @property
+    def enabled(self):
+        return self._ledfx.config.get("fps_governor", True)
+
+    async def run(self):
+        """Evaluates the frame rates every GOVERNOR_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(GOVERNOR_INTERVAL)
+            try:
+                self.evaluate()
+            except Exception as e:
+                _LOGGER.exception(f"Frame rate governor failed: {e}")
+
+    def evaluate(self):
+        """Measures the load and steps one frame rate down or up"""
+        virtuals = self._scheduled_virtuals()
+        # a virtual starts at full rate the next time it is activated
+        for virtual in self._ledfx.virtuals.values():
+            if virtual.fps_cap is not None and virtual not in virtuals:
+                virtual.set_fps_cap(None)
+        # fetched once, the scheduler's lock is held while it is built
+        stats = self._ledfx.scheduler.get_stats()["virtuals"]
+        self._measure(virtuals, stats)
+        if not self.enabled:
+            self.restore_all()
+            return
+
+        if (
+            self.load > LOAD_HIGH
+            or self.overrun_ratio > OVERRUNS_HIGH
+            or self.cpu_percent > CPU_HIGH
+        ):
+            self._calm = 0
+            self._step_down(virtuals, stats)
+        elif (
+            self.load < LOAD_LOW
+            and self.overrun_ratio < OVERRUNS_LOW
+            and self.cpu_percent < CPU_LOW
+        ):
+            self._calm += 1
+            if self._calm >= RESTORE_AFTER:
+                self._calm = 0
+                self._step_up(virtuals)
+        else:
+            self._calm = 0
+
+    def restore_all(self):
+        """Lifts every frame rate cap"""
+        for virtual in self._ledfx.virtuals.values():
+            if virtual.fps_cap is not None:
+                self._set_rate(virtual, None, "governor disabled")
+
+    def get_stats(self):
+        """
+        Returns the load the governor measured, the virtuals it is holding
+        below their devices' refresh rate and its latest decisions.
+        """
+        return {
+            "enabled": self.enabled,
+            "load": round(self.load, 3),
+            "overrun_ratio": round(self.overrun_ratio, 3),
+            "cpu_percent": self.cpu_percent,
+            "capped": {
+                virtual.id: {
+                    "refresh_rate": virtual.refresh_rate,
+                    "max_refresh_rate": virtual.max_refresh_rate,
+                    "priority": virtual.config["frame_rate_priority"],
+                }
+                for virtual in self._ledfx.virtuals.values()
+                if virtual.fps_cap is not None
+            },
+            "decisions": list(self.decisions),
+        }
+
+    def _scheduled_virtuals(self):
+        return [
+            virtual
+            for virtual in self._ledfx.virtuals.values()
+            if virtual.active and virtual.refresh_rate
+        ]
+
+    def _measure(self, virtuals, stats):
+        load = 0.0
+        frames = overruns = 0
+        for virtual in virtuals:
+            virtual_stats = stats.get(virtual.id)
+            if virtual_stats is None:
+                continue
+            load += (
+                virtual_stats["avg_frame_time_ms"]
+                / 1000
+                * virtual.refresh_rate
+            )
+            # the counters restart when the scheduler stats are reset
+            frames += max(
+                0,
+                virtual_stats["frames"] - self._frames.get(virtual.id, 0),
+            )
+            overruns += max(
+                0,
+                virtual_stats["overruns"] - self._overruns.get(virtual.id, 0),
+            )
+            self._frames[virtual.id] = virtual_stats["frames"]
+            self._overruns[virtual.id] = virtual_stats["overruns"]
+        self.load = load
+        self.overrun_ratio = overruns / frames if frames else 0.0
+        self.cpu_percent = psutil.cpu_percent(None)
+
+    def _reason(self):
+        reason = f"scheduler load {self.load:.0%}"
+        if self.overrun_ratio:
+            reason += f", {self.overrun_ratio:.0%} frames overran"
+        reason += f", cpu {self.cpu_percent:.0f}%"
+        return reason
+
+    def _step_down(self, virtuals, stats):
+        candidates = [
+            virtual
+            for virtual in virtuals
+            if self._lower_rate(virtual.refresh_rate) is not None
+        ]
+        if not candidates:
+            return
+        # lowest priority first, then the one costing the most time
+        virtual = min(
+            candidates,
+            key=lambda virtual: (
+                PRIORITIES[virtual.config["frame_rate_priority"]],
+                -self._cost(virtual, stats),
+            ),
+        )
+        self._set_rate(
+            virtual, self._lower_rate(virtual.refresh_rate), self._reason()
+        )
+
+    def _step_up(self, virtuals):
+        capped = [virtual for virtual in virtuals if virtual.fps_cap]
+        if not capped:
+            return
+        # restore in the reverse order they were stepped down
+        virtual = max(
+            capped,
+            key=lambda virtual: (
+                PRIORITIES[virtual.config["frame_rate_priority"]],
+                virtual.refresh_rate,
+            ),
+        )
+        rate = self._higher_rate(virtual.refresh_rate)
+        if rate is None or rate >= virtual.max_refresh_rate:
+            rate = None
+        self._set_rate(virtual, rate, self._reason())
+
+    def _cost(self, virtual, stats):
+        virtual_stats = stats.get(virtual.id)
+        if virtual_stats is None:
+            return 0
+        return virtual_stats["avg_frame_time_ms"] * virtual.refresh_rate
+
+    def _lower_rate(self, rate):
+        lower = [fps for fps in self._rates if fps <= rate * STEP_FACTOR]
+        if lower:
+            return lower[-1]
+        # the last step goes down to the lowest rate
+        return self._rates[0] if self._rates[0] < rate else None
+
+    def _higher_rate(self, rate):
+        higher = [fps for fps in self._rates if fps >= rate / STEP_FACTOR]
+        return higher[0] if higher else None
+
+    def _set_rate(self, virtual, rate, reason):
+        previous = virtual.refresh_rate
+        virtual.set_fps_cap(rate)
+        decision = {
+            "time": time.time(),
+            "virtual_id": virtual.id,
+            "from": previous,
+            "to": virtual.refresh_rate,
+            "reason": reason,
+        }
+        self.decisions.append(decision)
+        _LOGGER.info(
+            f"Frame rate governor: {virtual.id} {previous} -> "
+            f"{virtual.refresh_rate} fps ({reason})"
+        )
+        self._ledfx.events.fire_event(
+            GovernorUpdateEvent(
+                virtual.id,
+                virtual.refresh_rate,
+                virtual.max_refresh_rate,
+                reason,
+            )
+        )
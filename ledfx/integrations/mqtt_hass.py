@@ -406,9 +406,7 @@ class MQTT_HASS(Integration):
                         "icon": icon,
                         "effect": True,
                         # "effect_list": list(COLORS.keys()),
-                        "effect_list": list(
-                            self._ledfx.effects.classes().keys()
-                        ),
+                        "effect_list": self._ledfx.effects.types(),
                         "device": hass_device,
                     }
                 ),
@@ -579,12 +577,10 @@ class MQTT_HASS(Integration):
                 selected_effect_or_preset = payload.get("effect")
                 if selected_effect_or_preset:
                     if selected_effect_or_preset == "back":
-                        effect_list = list(
-                            self._ledfx.effects.classes().keys()
-                        )
+                        effect_list = self._ledfx.effects.types()
                     elif (
                         selected_effect_or_preset
-                        in self._ledfx.effects.classes().keys()
+                        in self._ledfx.effects.types()
                     ):
                         # If an effect is selected, show its presets
                         ledfx_presets = self._ledfx.config.get(
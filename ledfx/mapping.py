@@ -0,0 +1,194 @@
+import numpy as np
+
+
+class FrameGather:
+    """
+    Fills a preallocated buffer from a frame.
+
+    Every pixel of the buffer is either a copy of one pixel of the frame or
+    a linear interpolation between two neighbouring pixels, so filling it
+    is a gather of the low and high neighbours and a lerp between them.
+    The lerp is worked out in floating point whatever type the buffer
+    holds, and truncated into integer buffers.
+    """
+
+    __slots__ = ("buffer", "_low", "_high", "_weights", "_lerp", "_scratch")
+
+    def __init__(
+        self, length, low=None, weights=None, frame_length=None, dtype=float
+    ):
+        """
+        Args:
+            length (int): Number of pixels in the buffer.
+            low (np.ndarray): Frame index of each buffer pixel, or of its
+                low neighbour if it is interpolated. None copies the frame
+                as is.
+            weights (np.ndarray): Weight of the high neighbour of each
+                buffer pixel, None if nothing is interpolated.
+            frame_length (int): Length of the frames, needed to clamp the
+                high neighbours when weights are given.
+            dtype: Type of the buffer.
+        """
+        self.buffer = np.zeros((length, 3), dtype=dtype)
+        self._low = low
+        if weights is not None and np.any(weights):
+            self._high = np.minimum(low + 1, frame_length - 1)
+            self._weights = weights[:, np.newaxis]
+            if np.issubdtype(self.buffer.dtype, np.floating):
+                self._lerp = self.buffer
+            else:
+                self._lerp = np.zeros((length, 3), dtype=np.float32)
+            self._scratch = np.zeros_like(self._lerp)
+        else:
+            self._high = None
+            self._weights = None
+            self._lerp = None
+            self._scratch = None
+
+    def __call__(self, frame):
+        buffer = self.buffer
+        if self._low is None:
+            np.copyto(buffer, frame, casting="unsafe")
+            return
+        if self._weights is None:
+            if frame.dtype != buffer.dtype:
+                frame = frame.astype(buffer.dtype)
+            np.take(frame, self._low, axis=0, out=buffer)
+            return
+        lerp = self._lerp
+        if frame.dtype != lerp.dtype:
+            frame = frame.astype(lerp.dtype)
+        np.take(frame, self._low, axis=0, out=lerp)
+        high = self._scratch
+        np.take(frame, self._high, axis=0, out=high)
+        high -= lerp
+        high *= self._weights
+        lerp += high
+        if lerp is not buffer:
+            np.copyto(buffer, lerp, casting="unsafe")
+
+
+class MappingPlan:
+    """
+    The mapping of a virtual's frame onto all of its device segments,
+    compiled once whenever the segments, grouping or mapping mode change
+    rather than worked out again for every frame.
+
+    The pixels of every segment live in one buffer, which each segment's
+    data is a view of. In span mode it holds the frame expanded by the
+    pixel grouping, in copy mode an interpolated copy of the whole frame
+    per segment. Either way mapping a frame is a single vectorized gather
+    and the segment data handed to the devices is built once along with
+    the plan.
+    """
+
+    def __init__(
+        self,
+        segments_by_device,
+        mapping,
+        frame_length,
+        group_size,
+        pixel_count,
+        dtype=float,
+    ):
+        """
+        Args:
+            segments_by_device (dict): Virtual._segments_by_device.
+            mapping (str): The virtual's mapping mode, "span" or "copy".
+            frame_length (int): Length of the frames that will be mapped.
+            group_size (int): Physical pixels per frame pixel.
+            pixel_count (int): Physical pixel count of the virtual.
+            dtype: Type of the segment data, Virtual passes uint8 frames.
+        """
+        self.frame_length = frame_length
+        self._dtype = dtype
+        # (device_id, data) where data is the list of
+        # (pixels, device_start, device_end) Device.update_pixels expects
+        self.devices = []
+        self._gather = None
+
+        if mapping == "span":
+            self._compile_span(segments_by_device, group_size, pixel_count)
+        else:
+            self._compile_copy(segments_by_device, group_size)
+
+    @property
+    def buffer(self):
+        """The buffer the frames are mapped into"""
+        return self._gather.buffer
+
+    def map(self, frame):
+        """Maps a frame into the buffer of the segment data"""
+        self._gather(frame)
+
+    def _compile_span(self, segments_by_device, group_size, pixel_count):
+        # the segments are consecutive slices of the frame, expanded by the
+        # pixel grouping
+        if group_size <= 1 and self.frame_length == pixel_count:
+            gather = FrameGather(pixel_count, dtype=self._dtype)
+        else:
+            gather = FrameGather(
+                pixel_count,
+                np.arange(pixel_count) // group_size,
+                dtype=self._dtype,
+            )
+        self._gather = gather
+
+        for device_id, segments in segments_by_device.items():
+            data = [
+                (gather.buffer[start:stop:step], device_start, device_end)
+                for start, stop, step, device_start, device_end in segments
+            ]
+            self.devices.append((device_id, data))
+
+    def _compile_copy(self, segments_by_device, group_size):
+        # every segment gets the whole frame interpolated to its effective
+        # length, then expanded by the pixel grouping
+        lows = []
+        weights = []
+        spans = []
+        offset = 0
+        for device_id, segments in segments_by_device.items():
+            device_spans = []
+            for _, _, step, device_start, device_end in segments:
+                length = device_end - device_start + 1
+                low, weight = self._copy_indices(step, length, group_size)
+                lows.append(low)
+                weights.append(weight)
+                device_spans.append(
+                    (offset, offset + length, device_start, device_end)
+                )
+                offset += length
+            spans.append((device_id, device_spans))
+
+        gather = FrameGather(
+            offset,
+            np.concatenate(lows) if lows else np.zeros(0, dtype=int),
+            np.concatenate(weights) if weights else None,
+            self.frame_length,
+            self._dtype,
+        )
+        self._gather = gather
+
+        for device_id, device_spans in spans:
+            data = [
+                (gather.buffer[start:stop], device_start, device_end)
+                for start, stop, device_start, device_end in device_spans
+            ]
+            self.devices.append((device_id, data))
+
+    def _copy_indices(self, step, segment_length, group_size):
+        effective_length = -(-segment_length // group_size)
+        if effective_length == 1:
+            return np.zeros(segment_length, dtype=int), np.zeros(
+                segment_length
+            )
+        effective = np.arange(segment_length) // group_size
+        if step == -1:
+            effective = effective_length - 1 - effective
+        # position of each pixel on the frame, kept as an exact fraction so
+        # pixels that land on a frame pixel are copied unchanged
+        position = effective * (self.frame_length - 1)
+        low = position // (effective_length - 1)
+        weights = (position % (effective_length - 1)) / (effective_length - 1)
+        return low, weights
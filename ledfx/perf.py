@@ -0,0 +1,136 @@
+import logging
+import time
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of frames kept in each stage's rolling window
+PERF_WINDOW = 512
+
+# Pipeline stages timed for each virtual
+VIRTUAL_STAGES = ("render", "get_pixels", "transition", "segment_mapping")
+# Pipeline stages timed for each device, "queue" is the time a frame waits
+# in the device's output mailbox before it is sent
+DEVICE_STAGES = ("assemble_frame", "queue", "flush")
+
+# Alias so the hot paths avoid an attribute lookup per timestamp
+perf_counter = time.perf_counter
+
+
+class StageTimer:
+    """
+    Rolling window of durations for a single pipeline stage.
+
+    Recording a sample is a single store into a preallocated ring buffer,
+    the percentiles are only calculated when a summary is requested.
+    """
+
+    __slots__ = ("_samples", "_index", "_count")
+
+    def __init__(self, size=PERF_WINDOW):
+        self._samples = np.zeros(size)
+        self._index = 0
+        self._count = 0
+
+    def record(self, duration):
+        """
+        Adds a sample to the rolling window.
+
+        Args:
+            duration (float): Time spent in the stage, in seconds.
+        """
+        self._samples[self._index] = duration
+        self._index = (self._index + 1) % len(self._samples)
+        self._count += 1
+
+    def clear(self):
+        self._index = 0
+        self._count = 0
+
+    def summary(self):
+        """
+        Returns the p50/p95/p99/max of the rolling window in milliseconds.
+        """
+        window = self._samples[: min(self._count, len(self._samples))]
+        if len(window) == 0:
+            return {"count": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
+        p50, p95, p99 = np.percentile(window, (50, 95, 99)) * 1000
+        return {
+            "count": self._count,
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(window.max()) * 1000, 4),
+        }
+
+
+class FrameTimings:
+    """Per-stage frame timers for a single virtual or device"""
+
+    def __init__(self, stages):
+        self._timers = {stage: StageTimer() for stage in stages}
+
+    def record(self, stage, duration):
+        self._timers[stage].record(duration)
+
+    def clear(self):
+        for timer in self._timers.values():
+            timer.clear()
+
+    def to_dict(self):
+        return {
+            stage: timer.summary() for stage, timer in self._timers.items()
+        }
+
+
+class DeviceTimings(FrameTimings):
+    """
+    Frame timings of a device, along with how many frames its output stage
+    sent and how many it dropped because a newer frame replaced them.
+    """
+
+    def __init__(self):
+        super().__init__(DEVICE_STAGES)
+        self.sent = 0
+        self.dropped = 0
+        # ChunkDelta of devices that only resend the packets that changed
+        self.delta = None
+
+    def clear(self):
+        super().clear()
+        self.sent = 0
+        self.dropped = 0
+        if self.delta is not None:
+            self.delta.clear()
+
+    def to_dict(self):
+        timings = super().to_dict()
+        timings["output"] = {"sent": self.sent, "dropped": self.dropped}
+        if self.delta is not None:
+            timings["output"].update(self.delta.to_dict())
+        return timings
+
+
+def get_perf_stats(ledfx):
+    """
+    Collects the per-stage frame timings of every virtual and device.
+
+    Args:
+        ledfx (LedFxCore): The LedFx instance.
+
+    Returns:
+        dict: The stage timings keyed by virtual and device id.
+    """
+    return {
+        "virtuals": {
+            virtual.id: virtual.perf.to_dict()
+            for virtual in ledfx.virtuals.values()
+            if virtual.active
+        },
+        "devices": {
+            device.id: device.perf.to_dict()
+            for device in ledfx.devices.values()
+            if device.is_active()
+        },
+    }
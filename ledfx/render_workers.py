@@ -0,0 +1,982 @@
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ledfx.color import LEDFX_COLORS, parse_color, validate_color
+from ledfx.config import CORE_CONFIG_SCHEMA
+from ledfx.effects import Effect, Effects
+from ledfx.effects.audio import AudioAnalysisSource, AudioReactiveEffect
+from ledfx.effects.melbank import FrequencyRange, Melbanks
+from ledfx.events import Event
+from ledfx.gif_cache import GifFrameCache
+from ledfx.utils import UserDefaultCollection
+
+_LOGGER = logging.getLogger(__name__)
+
+# how often a worker with audio reactive effects checks for a new audio
+# block between frames
+AUDIO_POLL_INTERVAL = 0.005
+# how long a worker gets to exit cleanly on shutdown before it is killed
+WORKER_STOP_TIMEOUT = 2.0
+# times a FrameRing read is retried when the writer overwrote the frame
+FRAME_READ_ATTEMPTS = 3
+
+
+class FrameRing:
+    """
+    A small ring of frames in shared memory, written by a render worker
+    and read by the main process.
+
+    The header holds the number of frames published so far, the slot of the
+    latest frame and the slot the reader is currently copying. The writer
+    never touches either of those slots, so with three slots it always has
+    one free to render into and neither side ever waits on the other.
+
+    The claim is a plain store followed by a load on each side, and Python
+    has no memory barriers, so on weakly ordered CPUs the writer can miss
+    a claim and pick the slot being read. Each slot therefore also has a
+    sequence number, odd while the slot is being written, and a read that
+    saw it change is retried.
+    """
+
+    SLOTS = 3
+    _HEADER_ITEMS = 3 + SLOTS
+
+    def __init__(self, pixel_count, dtype=np.float64, name=None):
+        create = name is None
+        header_size = self._HEADER_ITEMS * np.dtype(np.int64).itemsize
+        frame_size = pixel_count * 3 * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(
+            name=name,
+            create=create,
+            size=header_size + self.SLOTS * frame_size,
+        )
+        self._owner = create
+        self.pixel_count = pixel_count
+        self._header = np.ndarray(
+            (self._HEADER_ITEMS,), dtype=np.int64, buffer=self._shm.buf
+        )
+        self._slots = np.ndarray(
+            (self.SLOTS, pixel_count, 3),
+            dtype=dtype,
+            buffer=self._shm.buf,
+            offset=header_size,
+        )
+        self._sequences = self._header[3:]
+        if create:
+            # frames published, published slot, slot being read, and the
+            # sequence numbers of the slots
+            self._header[:] = (0, 0, -1) + (0,) * self.SLOTS
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def write(self, pixels):
+        """Publishes a frame, called from the render worker"""
+        header = self._header
+        published = header[1]
+        reading = header[2]
+        slot = next(
+            s for s in range(self.SLOTS) if s != published and s != reading
+        )
+        sequences = self._sequences
+        sequences[slot] += 1
+        np.copyto(self._slots[slot], pixels)
+        sequences[slot] += 1
+        header[1] = slot
+        header[0] += 1
+
+    def read_into(self, out):
+        """
+        Copies the latest frame into out, called from the main process.
+
+        Returns:
+            bool: False if no frame has been published yet, or if every
+            attempt was overwritten by the writer while being copied.
+        """
+        header = self._header
+        if header[0] == 0:
+            return False
+        sequences = self._sequences
+        for _ in range(FRAME_READ_ATTEMPTS):
+            # claim the latest slot, and claim again if a newer frame was
+            # published before the writer could see the claim
+            slot = header[1]
+            header[2] = slot
+            while header[1] != slot:
+                slot = header[1]
+                header[2] = slot
+            sequence = sequences[slot]
+            if sequence % 2:
+                continue
+            np.copyto(out, self._slots[slot])
+            if sequences[slot] == sequence:
+                return True
+        return False
+
+    def close(self):
+        # the views must go before the mapping can be closed
+        self._header = None
+        self._sequences = None
+        self._slots = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class AudioFeatureBlock:
+    """
+    The audio features of the latest block in shared memory, published by
+    the main process for the effects hosted in render workers.
+
+    Each block is guarded by a sequence number that is odd while the block
+    is being written, so a reader can tell a torn read and try again on its
+    next poll.
+    """
+
+    SCALARS = (
+        "volume",
+        "volume_filtered",
+        "pitch",
+        "onset",
+        "bpm_beat_now",
+        "volume_beat_now",
+        "bar_oscillator",
+        "beat_counter",
+    )
+    FREQ_POWERS = 4
+
+    def __init__(self, shape, name=None):
+        self.shape = tuple(shape)
+        mel_size = self.shape[0] * self.shape[1]
+        self._scalars = slice(1, 1 + len(self.SCALARS))
+        freq_power = self._scalars.stop
+        self._freq_power = slice(freq_power, freq_power + self.FREQ_POWERS)
+        self._freq_power_filtered = slice(
+            self._freq_power.stop, self._freq_power.stop + self.FREQ_POWERS
+        )
+        melbanks = self._freq_power_filtered.stop
+        self._melbanks = slice(melbanks, melbanks + mel_size)
+        self._melbanks_filtered = slice(
+            self._melbanks.stop, self._melbanks.stop + mel_size
+        )
+        self.size = self._melbanks_filtered.stop
+
+        create = name is None
+        self._shm = shared_memory.SharedMemory(
+            name=name,
+            create=create,
+            size=self.size * np.dtype(np.float64).itemsize,
+        )
+        self._owner = create
+        self._data = np.ndarray(
+            (self.size,), dtype=np.float64, buffer=self._shm.buf
+        )
+        if create:
+            self._data[:] = 0
+        self._staging = np.zeros(self.size)
+        self._seen = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def publish(self, audio):
+        """Writes the features of the current block of an audio source"""
+        staging = self._staging
+        audio.freq_power()
+        staging[self._scalars] = (
+            audio.volume(filtered=False),
+            audio.volume(filtered=True),
+            audio.pitch(),
+            audio.onset(),
+            audio.bpm_beat_now(),
+            audio.volume_beat_now(),
+            audio.bar_oscillator(),
+            audio.beat_counter,
+        )
+        staging[self._freq_power] = audio.freq_power_raw
+        staging[self._freq_power_filtered] = audio.freq_power_filter.value
+        staging[self._melbanks] = audio.melbanks._melbank_data.ravel()
+        staging[self._melbanks_filtered] = (
+            audio.melbanks._melbank_filtered_data.ravel()
+        )
+
+        data = self._data
+        data[0] += 1
+        data[1:] = staging[1:]
+        data[0] += 1
+
+    def read(self):
+        """
+        Copies a block that hasn't been read yet out of shared memory.
+
+        Returns:
+            bool: True if a new, complete block was read.
+        """
+        data = self._data
+        sequence = data[0]
+        if sequence == self._seen or sequence % 2:
+            return False
+        np.copyto(self._staging, data)
+        if data[0] != sequence:
+            return False
+        self._seen = sequence
+        return True
+
+    def scalars(self):
+        return dict(zip(self.SCALARS, self._staging[self._scalars]))
+
+    def freq_power(self, filtered=True):
+        if filtered:
+            return self._staging[self._freq_power_filtered]
+        return self._staging[self._freq_power]
+
+    def melbanks(self, filtered=False):
+        if filtered:
+            return self._staging[self._melbanks_filtered].reshape(self.shape)
+        return self._staging[self._melbanks].reshape(self.shape)
+
+    def close(self):
+        self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class ShardedEffect:
+    """
+    Stands in for an effect on its virtual while the effect itself renders
+    in a render worker process.
+
+    The wrapped effect is never activated in the main process, it only holds
+    the validated config so everything that reads the effect's type, name
+    and config keeps working. Frames are copied out of the shard's FrameRing.
+    If the worker can't create the effect, it falls back to rendering the
+    effect in the main process.
+    """
+
+    # these only exist on the effect in the worker, answering them from the
+    # inactive effect here would return stale state
+    _WORKER_ONLY = frozenset(("matrix", "get_matrix"))
+
+    def __init__(self, pool, effect):
+        self._pool = pool
+        self._effect = effect
+        self._virtual = None
+        self._active = False
+        self._output_buffers = None
+        self._output_index = 0
+        # rendering in the main process, after the worker failed to
+        self._local = False
+        self.key = None
+        self.ring = None
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name in self._WORKER_ONLY:
+            raise AttributeError(name)
+        return getattr(self._effect, name)
+
+    @property
+    def effect(self):
+        return self._effect
+
+    @property
+    def virtual(self):
+        return self._virtual
+
+    @property
+    def audio_reactive(self):
+        return isinstance(self._effect, AudioReactiveEffect)
+
+    @property
+    def is_active(self):
+        return self._active
+
+    @property
+    def pixels(self):
+        if not self._active:
+            return None
+        if self._local:
+            return self._effect.pixels
+        return self._output_buffers[self._output_index]
+
+    def activate(self, virtual):
+        with self.lock:
+            self._virtual = virtual
+            shape = (virtual.effective_pixel_count, 3)
+            self._output_buffers = (
+                np.zeros(shape, dtype=virtual.pixel_dtype),
+                np.zeros(shape, dtype=virtual.pixel_dtype),
+            )
+            self._pool.attach(self, virtual)
+            self._active = True
+            _LOGGER.info(f"Effect {self._effect.NAME} activated in worker.")
+
+    def _deactivate(self):
+        with self.lock:
+            self.deactivate()
+
+    def deactivate(self):
+        if self._active:
+            if self._local:
+                self._effect._deactivate()
+            else:
+                self._pool.detach(self)
+        self._active = False
+        self._local = False
+        self._output_buffers = None
+        _LOGGER.info(f"Effect {self._effect.NAME} deactivated in worker.")
+
+    def update_config(self, config):
+        self._effect.update_config(config)
+        with self.lock:
+            if self._active and not self._local:
+                self._pool.send(
+                    self, ("config", self.key, self._effect.config)
+                )
+
+    def _render(self):
+        # the effect renders in its worker at its own pace
+        if self._local:
+            self._effect._render()
+
+    def _fall_back(self, key):
+        """
+        Renders the effect in the main process, called once the worker
+        reports it couldn't create the effect attached as key.
+        """
+        with self.lock:
+            if not self._active or self._local or self.key != key:
+                return
+            self._pool.detach(self)
+            _LOGGER.warning(
+                f"Effect {self._effect.NAME} failed in its render worker, "
+                "rendering it in the main process"
+            )
+            try:
+                self._effect.activate(self._virtual)
+            except Exception:
+                _LOGGER.exception(f"Unable to activate {self._effect.NAME}")
+                self._active = False
+                return
+            self._local = True
+
+    def get_pixels(self):
+        """
+        Returns the latest frame rendered by the worker, or a black frame
+        until the first one arrives. The frame is copied into one of two
+        output buffers, as the virtual adjusts it in place.
+        """
+        with self.lock:
+            if not self._active:
+                return None
+            if self._local:
+                return self._effect.get_pixels()
+            self._output_index ^= 1
+            pixels = self._output_buffers[self._output_index]
+            self.ring.read_into(pixels)
+            return pixels
+
+
+class RenderWorkers:
+    """
+    Shards effect rendering across worker processes.
+
+    With render_workers set, effects set on a virtual are recreated in one of
+    the worker processes, each of which renders its effects at their
+    virtual's refresh rate on its own core. Finished frames come back through
+    a FrameRing per effect and the audio features of every block go out
+    through a single AudioFeatureBlock, so no pixel or audio data is ever
+    pickled. Config changes to the effects and their virtuals are forwarded
+    to the workers.
+
+    Effects that need live access to other parts of LedFx set SHARDABLE to
+    False and keep rendering in the main process. A worker that dies is
+    replaced and the effects it rendered are attached to the new one.
+    """
+
+    def __init__(self, ledfx):
+        self._ledfx = ledfx
+        self._count = self._ledfx.config.get("render_workers", 0)
+        self._workers = []
+        self._shards = {}
+        self._keys = itertools.count(1)
+        self._lock = threading.Lock()
+        self._audio_block = None
+        self._audio_melbanks_config = None
+
+        def on_virtual_config(event):
+            self._update_virtual(event.virtual_id)
+
+        def on_shutdown(event):
+            self.stop()
+
+        if self.enabled:
+            self._ledfx.events.add_listener(
+                on_virtual_config, Event.VIRTUAL_CONFIG_UPDATE
+            )
+            # the governor changes the rate the shard renders at
+            self._ledfx.events.add_listener(
+                on_virtual_config, Event.GOVERNOR_UPDATE
+            )
+            self._ledfx.events.add_listener(on_shutdown, Event.LEDFX_SHUTDOWN)
+
+    @property
+    def enabled(self):
+        return self._count > 0
+
+    def shard(self, effect):
+        """
+        Returns a ShardedEffect standing in for the effect if it can be
+        rendered in a worker, otherwise the effect itself.
+        """
+        if (
+            not self.enabled
+            or not isinstance(effect, Effect)
+            or not effect.SHARDABLE
+        ):
+            return effect
+        return ShardedEffect(self, effect)
+
+    def attach(self, shard, virtual):
+        """Creates the shard's effect in the least loaded worker"""
+        with self._lock:
+            audio = self._audio_spec() if shard.audio_reactive else None
+            shard.key = f"{virtual.id}-{next(self._keys)}"
+            shard.ring = FrameRing(
+                virtual.effective_pixel_count, virtual.pixel_dtype
+            )
+            shard.worker = min(self._running_workers(), key=len)
+            self._shards[shard.key] = shard
+            shard.worker.add(shard.key)
+            self._send_attach(shard, audio)
+
+    def detach(self, shard):
+        """Removes the shard's effect from its worker"""
+        with self._lock:
+            self.send(shard, ("detach", shard.key))
+            shard.worker.discard(shard.key)
+            self._shards.pop(shard.key, None)
+            shard.ring.close()
+            shard.ring = None
+            if self._audio_block is not None and not any(
+                s.audio_reactive for s in self._shards.values()
+            ):
+                self._release_audio()
+
+    def send(self, shard, message):
+        shard.worker.send(message)
+
+    def stop(self):
+        with self._lock:
+            shards = list(self._shards.values())
+        # deactivating releases each shard's ring and the audio block
+        for shard in shards:
+            shard._deactivate()
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+
+    def _send_attach(self, shard, audio):
+        self.send(
+            shard,
+            (
+                "attach",
+                shard.key,
+                shard.effect.type,
+                shard.effect.config,
+                self._virtual_snapshot(shard.virtual),
+                shard.ring.name,
+                audio,
+                {"user_colors": self._ledfx.config["user_colors"]},
+            ),
+        )
+
+    def _running_workers(self):
+        # workers are started on first use, and replaced if one has died
+        orphans = []
+        for worker in list(self._workers):
+            if not worker.is_alive():
+                _LOGGER.error(f"Render worker {worker.pid} died, restarting")
+                self._workers.remove(worker)
+                orphans.extend(
+                    shard
+                    for shard in self._shards.values()
+                    if shard.worker is worker
+                )
+        while len(self._workers) < self._count:
+            self._workers.append(
+                RenderWorkerProcess(
+                    self._ledfx.gif_cache.path,
+                    self._worker_message,
+                    self._worker_exited,
+                )
+            )
+        # the effects of dead workers carry on in the new ones
+        for shard in orphans:
+            shard.worker = min(self._workers, key=len)
+            shard.worker.add(shard.key)
+            audio = self._audio_spec() if shard.audio_reactive else None
+            self._send_attach(shard, audio)
+        return self._workers
+
+    def _worker_message(self, worker, command, *args):
+        """Handles a message from a worker, on its receiving thread"""
+        if command == "failed":
+            (key,) = args
+            with self._lock:
+                shard = self._shards.get(key)
+            if shard is not None:
+                shard._fall_back(key)
+
+    def _worker_exited(self, worker):
+        """Replaces a worker that exited without being stopped"""
+        with self._lock:
+            if worker in self._workers:
+                self._running_workers()
+
+    def _virtual_snapshot(self, virtual):
+        return {
+            "id": virtual.id,
+            "config": dict(virtual.config),
+            "pixel_count": virtual.effective_pixel_count,
+            "pixel_dtype": virtual.pixel_dtype,
+            "refresh_rate": virtual.refresh_rate,
+        }
+
+    def _update_virtual(self, virtual_id):
+        virtual = self._ledfx.virtuals.get(virtual_id)
+        if virtual is None:
+            return
+        with self._lock:
+            for shard in self._shards.values():
+                if shard.virtual is virtual:
+                    self.send(
+                        shard,
+                        (
+                            "virtual",
+                            shard.key,
+                            self._virtual_snapshot(virtual),
+                        ),
+                    )
+
+    def _audio_spec(self):
+        """
+        Starts publishing audio features if nothing is yet, and returns what
+        a worker needs to read them.
+        """
+        audio = self._ledfx.audio
+        if not isinstance(audio, AudioAnalysisSource):
+            audio = self._ledfx.audio = AudioAnalysisSource(
+                self._ledfx, self._ledfx.config.get("audio", {})
+            )
+        if self._audio_block is None:
+            self._audio_block = AudioFeatureBlock(
+                audio.melbanks._melbank_data.shape
+            )
+            self._audio_melbanks_config = audio.melbanks.melbanks_config
+            audio.subscribe(self._publish_audio)
+        return {
+            "name": self._audio_block.name,
+            "shape": self._audio_block.shape,
+            "audio": dict(audio._config),
+            "melbanks": dict(audio.melbanks.melbanks_config),
+            "melbank_collection": audio.melbanks.cleaned_melbank_collection,
+        }
+
+    def _publish_audio(self):
+        with self._lock:
+            if self._audio_block is None:
+                return
+            audio = self._ledfx.audio
+            if (
+                audio.melbanks.melbanks_config
+                is not self._audio_melbanks_config
+            ):
+                # the melbanks were reconfigured, hand the workers a new block
+                self._audio_block.close()
+                self._audio_block = AudioFeatureBlock(
+                    audio.melbanks._melbank_data.shape
+                )
+                self._audio_melbanks_config = audio.melbanks.melbanks_config
+                spec = self._audio_spec()
+                for worker in self._workers:
+                    worker.send(("audio", spec))
+            self._audio_block.publish(audio)
+
+    def _release_audio(self):
+        if isinstance(self._ledfx.audio, AudioAnalysisSource):
+            self._ledfx.audio.unsubscribe(self._publish_audio)
+        self._audio_block.close()
+        self._audio_block = None
+        self._audio_melbanks_config = None
+
+
+class RenderWorkerProcess:
+    """
+    The main process' handle on one render worker.
+
+    A thread receives the worker's messages for on_message, and calls
+    on_exit if the worker exits without being stopped.
+    """
+
+    def __init__(self, gif_cache_path, on_message, on_exit):
+        context = multiprocessing.get_context("spawn")
+        self._connection, worker_connection = context.Pipe()
+        self._process = context.Process(
+            target=run_render_worker,
+            args=(
+                worker_connection,
+                logging.getLogger().level,
+                gif_cache_path,
+            ),
+            name="LedFx Render Worker",
+            daemon=True,
+        )
+        self._process.start()
+        worker_connection.close()
+        self._keys = set()
+        self._send_lock = threading.Lock()
+        self._on_message = on_message
+        self._on_exit = on_exit
+        self._stopping = False
+        self._receiver = threading.Thread(
+            target=self._receive,
+            name="LedFx Render Worker Receiver",
+            daemon=True,
+        )
+        self._receiver.start()
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    def add(self, key):
+        self._keys.add(key)
+
+    def discard(self, key):
+        self._keys.discard(key)
+
+    def is_alive(self):
+        return self._process.is_alive()
+
+    def send(self, message):
+        with self._send_lock:
+            try:
+                self._connection.send(message)
+            except (BrokenPipeError, OSError) as e:
+                _LOGGER.error(f"Render worker {self.pid} unreachable: {e}")
+
+    def stop(self):
+        self._stopping = True
+        self.send(("stop",))
+        self._process.join(WORKER_STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._receiver.join(WORKER_STOP_TIMEOUT)
+        self._connection.close()
+
+    def _receive(self):
+        while True:
+            try:
+                message = self._connection.recv()
+            except (EOFError, OSError):
+                break
+            try:
+                self._on_message(self, *message)
+            except Exception:
+                _LOGGER.exception(
+                    f"Error handling {message[0]} from render worker "
+                    f"{self.pid}"
+                )
+        if not self._stopping:
+            # the worker has closed its end, wait for it to be gone
+            self._process.join(WORKER_STOP_TIMEOUT)
+            self._on_exit(self)
+
+
+class WorkerEvents:
+    """Events are not delivered inside a render worker"""
+
+    def fire_event(self, event):
+        pass
+
+    def add_listener(self, callback, event_type, event_filter={}):
+        return lambda: None
+
+    def has_listeners(self, event_type):
+        return False
+
+
+class WorkerAudioSource(AudioAnalysisSource):
+    """
+    An audio source for the effects in a render worker, serving the audio
+    features the main process publishes to an AudioFeatureBlock instead of
+    analysing audio itself.
+    """
+
+    def __init__(self, ledfx, spec):
+        self._ledfx = ledfx
+        self._callbacks = []
+        self._block = None
+        self.update_spec(spec)
+
+    def update_spec(self, spec):
+        self._config = spec["audio"]
+        self._ledfx.config["audio"] = spec["audio"]
+        self._ledfx.config["melbank_collection"] = spec["melbank_collection"]
+        self.melbanks = Melbanks(self._ledfx, self, spec["melbanks"])
+        if self._block is not None:
+            self._block.close()
+        self._block = AudioFeatureBlock(spec["shape"], name=spec["name"])
+        self._features = dict.fromkeys(AudioFeatureBlock.SCALARS, 0.0)
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def poll(self):
+        """Passes a new block, if there is one, to the effects"""
+        if not self._block.read():
+            return
+        self._features = self._block.scalars()
+        np.copyto(self.melbanks._melbank_data, self._block.melbanks())
+        np.copyto(
+            self.melbanks._melbank_filtered_data,
+            self._block.melbanks(filtered=True),
+        )
+        for callback in self._callbacks:
+            callback()
+
+    def close(self):
+        self._block.close()
+
+    def volume(self, filtered=True):
+        if filtered:
+            return self._features["volume_filtered"]
+        return self._features["volume"]
+
+    def pitch(self):
+        return self._features["pitch"]
+
+    def onset(self):
+        return bool(self._features["onset"])
+
+    def bpm_beat_now(self):
+        return bool(self._features["bpm_beat_now"])
+
+    def volume_beat_now(self):
+        return bool(self._features["volume_beat_now"])
+
+    def bar_oscillator(self):
+        return self._features["bar_oscillator"]
+
+    @property
+    def beat_counter(self):
+        return int(self._features["beat_counter"])
+
+    def freq_power(self):
+        pass
+
+    def get_freq_power(self, i, filtered=True):
+        value = self._block.freq_power(filtered)[i]
+        return value if not np.isnan(value) else 0.0
+
+
+class WorkerVirtual:
+    """The parts of a virtual an effect reads, as seen from a worker"""
+
+    def __init__(self, snapshot):
+        self.update(snapshot)
+
+    def update(self, snapshot):
+        self.id = snapshot["id"]
+        self.config = snapshot["config"]
+        self.effective_pixel_count = snapshot["pixel_count"]
+        self.pixel_dtype = snapshot["pixel_dtype"]
+        self.refresh_rate = snapshot["refresh_rate"]
+        self.frequency_range = FrequencyRange(
+            self.config["frequency_min"], self.config["frequency_max"]
+        )
+
+
+class RenderWorker:
+    """
+    Runs inside a render worker process, standing in for LedFx for the
+    effects it hosts.
+    """
+
+    def __init__(self, connection, gif_cache_path):
+        self._connection = connection
+        self.config = CORE_CONFIG_SCHEMA({})
+        # shared with the main process
+        self.gif_cache = GifFrameCache(gif_cache_path)
+        self.events = WorkerEvents()
+        self.effects = Effects(self)
+        self.colors = UserDefaultCollection(
+            self,
+            "Colors",
+            LEDFX_COLORS,
+            "user_colors",
+            validate_color,
+            parse_color,
+        )
+        # key: (effect, virtual, ring, next frame time)
+        self._shards = {}
+        self._running = True
+
+    def dev_enabled(self):
+        return False
+
+    def run(self):
+        while self._running:
+            timeout = self._render_due()
+            if self.audio is not None:
+                timeout = min(timeout, AUDIO_POLL_INTERVAL)
+            if self._connection.poll(timeout):
+                try:
+                    message = self._connection.recv()
+                except EOFError:
+                    break
+                try:
+                    self._handle(*message)
+                except Exception:
+                    # one bad message mustn't take down every other effect
+                    _LOGGER.exception(f"Error handling {message[0]}")
+            if self.audio is not None:
+                self.audio.poll()
+
+        for key in list(self._shards):
+            self._detach(key)
+        if self.audio is not None:
+            self.audio.close()
+
+    def _render_due(self):
+        """Renders every effect that is due, returns the time to the next"""
+        time_now = time.monotonic()
+        next_frame = time_now + 1
+        for key, (effect, virtual, ring, due) in self._shards.items():
+            if due <= time_now:
+                try:
+                    effect._render()
+                    pixels = effect.get_pixels()
+                    if pixels is not None and len(pixels) == ring.pixel_count:
+                        ring.write(pixels)
+                except Exception:
+                    _LOGGER.exception(f"Error rendering {key}")
+                interval = 1 / virtual.refresh_rate
+                due += interval
+                if due < time_now:
+                    due = time_now + interval
+                self._shards[key] = (effect, virtual, ring, due)
+            next_frame = min(next_frame, due)
+        return max(0, next_frame - time.monotonic())
+
+    def _handle(self, command, *args):
+        if command == "attach":
+            self._attach(*args)
+        elif command == "detach":
+            self._detach(*args)
+        elif command == "config":
+            key, config = args
+            # attaching the effect may have failed
+            shard = self._shards.get(key)
+            if shard is not None:
+                shard[0].update_config(config)
+        elif command == "virtual":
+            self._update_virtual(*args)
+        elif command == "audio":
+            self._update_audio(*args)
+        elif command == "stop":
+            self._running = False
+
+    def _attach(
+        self, key, effect_type, config, snapshot, ring_name, audio, shared
+    ):
+        for name, values in shared.items():
+            # collections like self.colors hold on to these dicts
+            self.config[name].clear()
+            self.config[name].update(values)
+        effect = None
+        try:
+            if audio is not None:
+                self._update_audio(audio)
+            effect = self.effects.create(
+                type=effect_type, id=key, config=config, ledfx=self
+            )
+            virtual = WorkerVirtual(snapshot)
+            effect.activate(virtual)
+            ring = FrameRing(
+                snapshot["pixel_count"],
+                snapshot["pixel_dtype"],
+                name=ring_name,
+            )
+        except Exception:
+            _LOGGER.exception(f"Unable to create {effect_type} for {key}")
+            if effect is not None:
+                effect._deactivate()
+                self.effects.destroy(key)
+            # the main process renders it itself instead
+            self._connection.send(("failed", key))
+            return
+        self._shards[key] = (effect, virtual, ring, time.monotonic())
+
+    def _detach(self, key):
+        shard = self._shards.pop(key, None)
+        if shard is None:
+            return
+        effect, _, ring, _ = shard
+        effect._deactivate()
+        self.effects.destroy(key)
+        ring.close()
+
+    def _update_virtual(self, key, snapshot):
+        shard = self._shards.get(key)
+        if shard is None:
+            return
+        effect, virtual, _, _ = shard
+        old_range = virtual.frequency_range
+        old_rows = virtual.config.get("rows")
+        virtual.update(snapshot)
+        if virtual.frequency_range != old_range and hasattr(
+            effect, "clear_melbank_freq_props"
+        ):
+            effect.clear_melbank_freq_props()
+        if virtual.config.get("rows") != old_rows and hasattr(
+            effect, "set_init"
+        ):
+            effect.set_init()
+
+    def _update_audio(self, spec):
+        if self.audio is None:
+            self.audio = WorkerAudioSource(self, spec)
+        elif self.audio._block.name != spec["name"]:
+            self.audio.update_spec(spec)
+            for effect, _, _, _ in self._shards.values():
+                if hasattr(effect, "clear_melbank_freq_props"):
+                    effect.clear_melbank_freq_props()
+
+
+def run_render_worker(connection, log_level, gif_cache_path):
+    """Entry point of a render worker process"""
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s %(levelname)s render worker: %(message)s",
+    )
+    RenderWorker(connection, gif_cache_path).run()
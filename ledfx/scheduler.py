@@ -0,0 +1,302 @@
+import logging
+import threading
+import time
+import timeit
+
+from ledfx.events import Event
+from ledfx.utils import SLEEP_RESOLUTION, fps_to_sleep_interval
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class VirtualFrameStats:
+    """Scheduling statistics for a single virtual"""
+
+    __slots__ = (
+        "frames",
+        "overruns",
+        "last_lag",
+        "avg_lag",
+        "max_lag",
+        "last_frame_time",
+        "avg_frame_time",
+        "max_frame_time",
+    )
+
+    # weight of the newest sample in the exponential moving averages
+    SMOOTHING = 0.05
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.overruns = 0
+        self.last_lag = 0.0
+        self.avg_lag = 0.0
+        self.max_lag = 0.0
+        self.last_frame_time = 0.0
+        self.avg_frame_time = 0.0
+        self.max_frame_time = 0.0
+
+    def record(self, lag, frame_time, budget):
+        """
+        Records the timing of one frame.
+
+        Args:
+            lag (float): Seconds between the scheduled tick and the start of the frame.
+            frame_time (float): Seconds spent assembling and flushing the frame.
+            budget (float): The frame interval of the virtual's refresh rate group.
+        """
+        if self.frames == 0:
+            self.avg_lag = lag
+            self.avg_frame_time = frame_time
+        else:
+            self.avg_lag += (lag - self.avg_lag) * self.SMOOTHING
+            self.avg_frame_time += (
+                frame_time - self.avg_frame_time
+            ) * self.SMOOTHING
+        self.frames += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.last_frame_time = frame_time
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+        if frame_time > budget:
+            self.overruns += 1
+
+    def to_dict(self):
+        return {
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "lag_ms": round(self.last_lag * 1000, 3),
+            "avg_lag_ms": round(self.avg_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "frame_time_ms": round(self.last_frame_time * 1000, 3),
+            "avg_frame_time_ms": round(self.avg_frame_time * 1000, 3),
+            "max_frame_time_ms": round(self.max_frame_time * 1000, 3),
+        }
+
+
+class RefreshRateGroup:
+    """All the virtuals that are ticked at the same refresh rate"""
+
+    def __init__(self, refresh_rate, start_time):
+        self.refresh_rate = refresh_rate
+        self.interval = fps_to_sleep_interval(refresh_rate)
+        self.next_tick = start_time
+        self.virtuals = []
+        self.passes = 0
+        self.missed_ticks = 0
+
+    def to_dict(self):
+        return {
+            "refresh_rate": self.refresh_rate,
+            "interval_ms": round(self.interval * 1000, 3),
+            "virtuals": [virtual.id for virtual in self.virtuals],
+            "passes": self.passes,
+            "missed_ticks": self.missed_ticks,
+        }
+
+
+class FrameScheduler:
+    """
+    Central frame clock for all active virtuals.
+
+    Rather than each virtual running its own render thread, active virtuals
+    register with the scheduler and are grouped by refresh rate. A single
+    thread sleeps until the next group is due and then assembles and flushes
+    every virtual in that group in one pass.
+    """
+
+    def __init__(self, ledfx):
+        self._ledfx = ledfx
+        self._groups = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        # signalled whenever the virtual currently being ticked changes
+        self._frame_done = threading.Condition(self._lock)
+        self._current = None
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+
+        def on_shutdown(e):
+            self.stop()
+
+        self._ledfx.events.add_listener(on_shutdown, Event.LEDFX_SHUTDOWN)
+
+    def register(self, virtual):
+        """
+        Adds a virtual to the group matching its refresh rate.
+
+        Registering a virtual that is already scheduled is a no-op.
+
+        Args:
+            virtual (Virtual): The virtual to tick.
+        """
+        with self._lock:
+            if self._find_group(virtual) is None:
+                self._add_to_group(virtual, timeit.default_timer())
+                self._stats.setdefault(virtual.id, VirtualFrameStats())
+            self._ensure_running()
+        self._wake.set()
+
+    def unregister(self, virtual):
+        """
+        Removes a virtual from the scheduler.
+
+        If the virtual is in the middle of a frame on the scheduler thread,
+        this blocks until that frame has completed so the caller can safely
+        tear the virtual down afterwards.
+
+        Args:
+            virtual (Virtual): The virtual to stop ticking.
+        """
+        with self._lock:
+            group = self._find_group(virtual)
+            if group is not None:
+                self._remove_from_group(group, virtual)
+            self._stats.pop(virtual.id, None)
+            if threading.current_thread() is not self._thread:
+                while self._current is virtual:
+                    self._frame_done.wait()
+
+    def stop(self):
+        """Stops the scheduler thread"""
+        self._running = False
+        self._wake.set()
+        if (
+            self._thread is not None
+            and threading.current_thread() is not self._thread
+        ):
+            self._thread.join()
+        self._thread = None
+
+    def get_stats(self):
+        """
+        Returns the state of every refresh rate group and the scheduling
+        lag and overruns of every scheduled virtual.
+        """
+        with self._lock:
+            groups = {
+                str(rate): group.to_dict()
+                for rate, group in self._groups.items()
+            }
+            virtuals = {
+                virtual_id: stats.to_dict()
+                for virtual_id, stats in self._stats.items()
+            }
+        return {"groups": groups, "virtuals": virtuals}
+
+    def _ensure_running(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            name="Frame Scheduler", target=self._thread_function
+        )
+        self._thread.start()
+
+    def _find_group(self, virtual):
+        for group in self._groups.values():
+            if virtual in group.virtuals:
+                return group
+        return None
+
+    def _add_to_group(self, virtual, now):
+        refresh_rate = virtual.refresh_rate
+        group = self._groups.get(refresh_rate)
+        if group is None:
+            group = self._groups[refresh_rate] = RefreshRateGroup(
+                refresh_rate, now
+            )
+        group.virtuals.append(virtual)
+
+    def _remove_from_group(self, group, virtual):
+        group.virtuals.remove(virtual)
+        if not group.virtuals:
+            del self._groups[group.refresh_rate]
+
+    def _regroup(self, now):
+        """Moves virtuals whose refresh rate has changed to their new group"""
+        for group in list(self._groups.values()):
+            for virtual in list(group.virtuals):
+                if virtual.refresh_rate != group.refresh_rate:
+                    self._remove_from_group(group, virtual)
+                    self._add_to_group(virtual, now)
+
+    def _tick_group(self, group):
+        deadline = group.next_tick
+        with self._lock:
+            virtuals = list(group.virtuals)
+
+        for virtual in virtuals:
+            with self._lock:
+                # the virtual may have been unregistered since the pass began
+                if virtual not in group.virtuals:
+                    continue
+                self._current = virtual
+            start_time = timeit.default_timer()
+            try:
+                virtual.process_frame()
+            except Exception as e:
+                _LOGGER.exception(
+                    f"Virtual {virtual.id}: Error processing frame: {e}"
+                )
+            finally:
+                end_time = timeit.default_timer()
+                with self._lock:
+                    self._current = None
+                    self._frame_done.notify_all()
+                    stats = self._stats.get(virtual.id)
+                    if stats is not None:
+                        stats.record(
+                            start_time - deadline,
+                            end_time - start_time,
+                            group.interval,
+                        )
+
+        group.passes += 1
+        group.next_tick += group.interval
+        now = timeit.default_timer()
+        if group.next_tick < now:
+            # we've fallen at least a whole frame behind, don't try to catch
+            # up with a burst of frames, just restart the clock from now
+            group.missed_ticks += 1
+            group.next_tick = now
+
+    def _thread_function(self):
+        _LOGGER.debug("Frame scheduler started.")
+        while self._running:
+            with self._lock:
+                groups = list(self._groups.values())
+            if not groups:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            start_time = timeit.default_timer()
+            for group in groups:
+                if group.next_tick <= start_time:
+                    self._tick_group(group)
+
+            with self._lock:
+                now = timeit.default_timer()
+                self._regroup(now)
+                next_tick = min(
+                    (group.next_tick for group in self._groups.values()),
+                    default=now,
+                )
+
+            # min allowed sleep 1 ms, this will be more frame accurate on
+            # high res sleep systems
+            sleep_time = max(0.001, next_tick - now)
+            time.sleep(sleep_time)
+
+            # use an aggressive check for did we sleep against expected min clk
+            # for all high res scenarios this will be passive
+            # for unexpected high res sleep on windows scenarios it will adapt
+            pass_time = timeit.default_timer() - start_time
+            if pass_time < (SLEEP_RESOLUTION / 2):
+                time.sleep(max(0.001, SLEEP_RESOLUTION - pass_time))
+        _LOGGER.debug("Frame scheduler stopped.")
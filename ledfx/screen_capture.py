@@ -0,0 +1,297 @@
+import logging
+import threading
+import time
+
+import mss
+import numpy as np
+
+from ledfx.events import Event
+
+_LOGGER = logging.getLogger(__name__)
+
+# Consecutive failed grabs after which a screen is no longer captured,
+# until a region on it is added again
+MAX_FAILURES = 5
+
+
+def block_average(image, height, width):
+    """
+    Downscales an (h, w, channels) uint8 image to (height, width, channels)
+    by averaging the block of source pixels under each output pixel.
+
+    Every output pixel averages a block of h // height by w // width
+    pixels, starting at the output pixel's position scaled to the source,
+    so sizes that don't divide evenly still cover the whole image and
+    upscaling repeats the nearest pixel. The rows of every block are
+    gathered once and summed through a (height, block, w) view of them,
+    then the columns the same way, which keeps the reductions on
+    contiguous memory.
+    """
+    in_height, in_width = image.shape[:2]
+    block_height = max(1, in_height // height)
+    block_width = max(1, in_width // width)
+    rows = (np.arange(height) * in_height // height)[:, np.newaxis]
+    rows = (rows + np.arange(block_height)).ravel()
+    columns = (np.arange(width) * in_width // width)[:, np.newaxis]
+    columns = (columns + np.arange(block_width)).ravel()
+    sums = (
+        image[rows]
+        .reshape(height, block_height, in_width, -1)
+        .sum(axis=1, dtype=np.uint32)
+    )
+    sums = sums[:, columns].reshape(height, width, block_width, -1).sum(axis=2)
+    sums //= block_height * block_width
+    return sums.astype(np.uint8)
+
+
+class CaptureRegion:
+    """A subscriber's region of a screen, relative to the screen's origin"""
+
+    __slots__ = ("screen", "top", "left", "width", "height")
+
+    def __init__(self, screen, top, left, width, height):
+        self.screen = screen
+        self.top = top
+        self.left = left
+        self.width = width
+        self.height = height
+
+
+class CapturedScreen:
+    """
+    The latest grab of one screen, covering every region on it.
+
+    Grabs are written into whichever of two buffers isn't published and
+    published under the service's lock, which readers hold while they
+    crop, so a published frame is never overwritten while it is read.
+    """
+
+    __slots__ = ("top", "left", "buffers", "published", "frames")
+
+    def __init__(self, top, left, width, height):
+        self.top = top
+        self.left = left
+        self.buffers = [
+            np.zeros((height, width, 4), dtype=np.uint8) for _ in range(2)
+        ]
+        self.published = 0
+        self.frames = 0
+
+    @property
+    def shape(self):
+        return self.buffers[0].shape[:2]
+
+
+class ScreenCapture:
+    """
+    Shared screen grabber for the effects that mirror the screen.
+
+    Each screen with regions on it is grabbed once per tick on the capture
+    thread, covering the bounding box of its regions, so any
+    number of Clone effects on the same screen cost a single grab. Effects
+    read their region downscaled from the latest grab, at whatever rate
+    they render at. The thread runs at the screen_capture_fps core config
+    rate while there are regions and exits once the last one is removed.
+    """
+
+    def __init__(self, ledfx):
+        self._ledfx = ledfx
+        self._lock = threading.Lock()
+        self._regions = []
+        self._screens = {}
+        self._failures = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+        def on_shutdown(event):
+            self.stop()
+
+        self._ledfx.events.add_listener(on_shutdown, Event.LEDFX_SHUTDOWN)
+
+    @property
+    def fps(self):
+        return self._ledfx.config.get("screen_capture_fps", 30)
+
+    def add_region(self, screen, top, left, width, height):
+        """
+        Starts capturing a region of a screen.
+
+        Args:
+            screen (int): Index into mss' monitors, 0 spans all screens.
+            top (int): Offset of the region from the top of the screen.
+            left (int): Offset of the region from the left of the screen.
+            width (int): Width of the region.
+            height (int): Height of the region.
+
+        Returns:
+            CaptureRegion: Handle to read and remove the region with.
+        """
+        region = CaptureRegion(screen, top, left, width, height)
+        with self._lock:
+            self._regions.append(region)
+            # a new region gives a screen that was given up on another go
+            self._failures.pop(screen, None)
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(
+                    target=self._run, name="LedFx Screen Capture", daemon=True
+                )
+                self._thread.start()
+        return region
+
+    def remove_region(self, region):
+        """Stops capturing a region, the thread exits with the last one"""
+        with self._lock:
+            if region in self._regions:
+                self._regions.remove(region)
+
+    def read(self, region, width, height):
+        """
+        Returns the region from the latest grab of its screen, downscaled to
+        a (height, width, 3) uint8 RGB array, or None if it hasn't been
+        grabbed yet or lies off the screen.
+        """
+        with self._lock:
+            captured = self._screens.get(region.screen)
+            if captured is None or not captured.frames:
+                return None
+            top, left, bottom, right = self._clip(region, captured)
+            if bottom <= top or right <= left:
+                return None
+            frame = captured.buffers[captured.published]
+            bgrx = block_average(frame[top:bottom, left:right], height, width)
+        return np.ascontiguousarray(bgrx[..., 2::-1])
+
+    def stop(self):
+        self._stop.set()
+
+    def _clip(self, region, captured):
+        """The region's bounds within the grab of its screen"""
+        grab_height, grab_width = captured.shape
+        top = max(0, region.top - captured.top)
+        left = max(0, region.left - captured.left)
+        bottom = min(grab_height, region.top + region.height - captured.top)
+        right = min(grab_width, region.left + region.width - captured.left)
+        return top, left, bottom, right
+
+    def _grabs(self, monitors):
+        """
+        Works out the area to grab per screen, the bounding box of its
+        regions clipped to the screen.
+
+        Returns:
+            dict: screen to (top, left, width, height), relative to the
+            screen's origin.
+        """
+        bounds = {}
+        for region in self._regions:
+            screen = region.screen
+            if self._failures.get(screen, 0) >= MAX_FAILURES:
+                continue
+            if screen >= len(monitors):
+                continue
+            monitor = monitors[screen]
+            box = (
+                max(0, region.top),
+                max(0, region.left),
+                min(monitor["height"], region.top + region.height),
+                min(monitor["width"], region.left + region.width),
+            )
+            if box[2] <= box[0] or box[3] <= box[1]:
+                continue
+            if screen in bounds:
+                previous = bounds[screen]
+                box = (
+                    min(previous[0], box[0]),
+                    min(previous[1], box[1]),
+                    max(previous[2], box[2]),
+                    max(previous[3], box[3]),
+                )
+            bounds[screen] = box
+
+        return {
+            screen: (top, left, right - left, bottom - top)
+            for screen, (top, left, bottom, right) in bounds.items()
+        }
+
+    def _grab(self, sct, monitors, screen, area):
+        top, left, width, height = area
+        monitor = monitors[screen]
+        shot = sct.grab(
+            {
+                "top": monitor["top"] + top,
+                "left": monitor["left"] + left,
+                "width": width,
+                "height": height,
+            }
+        )
+        with self._lock:
+            captured = self._screens.get(screen)
+            if (
+                captured is None
+                or (captured.top, captured.left) != (top, left)
+                or captured.shape != (height, width)
+            ):
+                captured = CapturedScreen(top, left, width, height)
+                self._screens[screen] = captured
+        # the unpublished buffer is never read, so it's filled unlocked
+        back = 1 - captured.published
+        np.copyto(
+            captured.buffers[back],
+            np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4),
+        )
+        with self._lock:
+            captured.published = back
+            captured.frames += 1
+
+    def _run(self):
+        try:
+            # mss handles can't be shared between threads
+            sct = mss.mss()
+            monitors = sct.monitors
+        except Exception as e:
+            _LOGGER.warning(f"Screen capture unavailable: {e}")
+            with self._lock:
+                for region in self._regions:
+                    self._failures[region.screen] = MAX_FAILURES
+                self._thread = None
+            return
+
+        with sct:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                with self._lock:
+                    if not self._regions:
+                        self._screens.clear()
+                        self._thread = None
+                        return
+                    grabs = self._grabs(monitors)
+                    # screens without regions or given up on go dark
+                    for screen in list(self._screens):
+                        if screen not in grabs:
+                            del self._screens[screen]
+
+                for screen, area in grabs.items():
+                    try:
+                        self._grab(sct, monitors, screen, area)
+                    except Exception as e:
+                        with self._lock:
+                            failures = self._failures.get(screen, 0) + 1
+                            self._failures[screen] = failures
+                        _LOGGER.warning(
+                            f"Screen capture failed on screen {screen}: "
+                            f"{failures} {e}"
+                        )
+                        if failures >= MAX_FAILURES:
+                            _LOGGER.warning(
+                                f"Screen capture giving up on screen "
+                                f"{screen} after {failures} failures"
+                            )
+                    else:
+                        with self._lock:
+                            self._failures.pop(screen, None)
+
+                elapsed = time.perf_counter() - start
+                self._stop.wait(max(0.0, 1 / self.fps - elapsed))
+
+        with self._lock:
+            self._thread = None
@@ -0,0 +1,68 @@
+# Name: Registry Manifest Generator
+# Description: Writes the manifest LedFx uses to load the effect registry lazily.
+#
+# Run from the repository root whenever an effect is added, renamed or moved:
+#
+#     python -m ledfx.tools.registry_manifest
+
+import importlib
+import json
+import logging
+import os
+import pkgutil
+
+from ledfx.effects import Effect, Effects
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def generate_manifest(package, cls):
+    """
+    Imports every module of a registry package and returns its manifest.
+
+    The manifest lists every module found, so helper modules that register
+    no types are not imported at startup either, and maps each type to the
+    module it lives in along with its name and category.
+    """
+    module = importlib.import_module(package)
+    modules = [
+        name
+        for _, name, _ in pkgutil.iter_modules(module.__path__, package + ".")
+    ]
+    for name in modules:
+        importlib.import_module(name)
+
+    types = {}
+    for type, _cls in cls.registry().items():
+        # skip subclasses registered from outside the package
+        if _cls.__module__ not in modules:
+            continue
+        types[type] = {
+            "module": _cls.__module__,
+            "name": getattr(_cls, "NAME", None),
+            "category": getattr(_cls, "CATEGORY", None),
+        }
+
+    return {"modules": modules, "types": types}
+
+
+def manifest_path(package, manifest_file):
+    """Returns where the manifest of a registry package lives"""
+    module = importlib.import_module(package)
+    return os.path.join(module.__path__[0], manifest_file)
+
+
+def write_manifest(package, cls, manifest_file):
+    """Generates the manifest of a registry package and writes it out"""
+    manifest = generate_manifest(package, cls)
+    path = manifest_path(package, manifest_file)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+        file.write("\n")
+    _LOGGER.info(f"Wrote {len(manifest['types'])} types to {path}")
+    return path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    write_manifest(Effects.PACKAGE_NAME, Effect, Effects.MANIFEST_FILE)
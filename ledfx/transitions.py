@@ -1,4 +1,5 @@
 import logging
+from bisect import bisect_left
 
 import numpy as np
 
@@ -11,6 +12,15 @@ class IterClass(type):
 
 
 class Transitions(metaclass=IterClass):
+    """
+    Blends the frames of two effects while switching between them.
+
+    Every transition blends into the new effect's frame in place. The
+    position dependent ones are worked out once per pixel count: dissolve
+    and iris keep their pixels ordered by the weight at which they switch
+    over, so each frame only copies the pixels up to a rank threshold.
+    """
+
     def __init__(self, pixel_count, max_brightness=1, min_brightness=0):
         self.pixel_count = pixel_count
         self.max_brightness = max_brightness
@@ -22,6 +32,9 @@ class Transitions(metaclass=IterClass):
         # [-1::-2] or [-2::-2]
         # https://discord.com/channels/469985374052286474/785654790247546941/835507683129032725
         self.iris_array = np.concatenate([i[::2], i[-1 + len(i) % -2 :: -2]])
+        self._dissolve_ranks = self._ranks(self.dissolve_array)
+        self._iris_ranks = self._ranks(self.iris_array)
+        self._scratch = np.zeros((pixel_count, 3))
 
     def __getitem__(cls, mode):
         return getattr(cls, "NAMED_FUNCTIONS")[mode]
@@ -41,13 +54,67 @@ class Transitions(metaclass=IterClass):
             return False
         return True
 
+    @staticmethod
+    def _ranks(thresholds):
+        """
+        Orders the pixels from the highest threshold to the lowest, so the
+        pixels above any weight are the first ones of the order.
+        """
+        order = np.argsort(-thresholds, kind="stable")
+        # a list, as bisecting it is far quicker than np.searchsorted for a
+        # single weight
+        return order, (-thresholds[order]).tolist()
+
+    def _buffer(self, x1, x2):
+        """
+        Scratch space for a frame blended from x1 and x2, in the type both
+        promote to, so a float frame blended with an integer one or a
+        float32 frame with a float64 one isn't truncated on the way.
+        """
+        dtype = np.result_type(x1, x2)
+        if self._scratch.shape != x2.shape or self._scratch.dtype != dtype:
+            self._scratch = np.zeros(x2.shape, dtype=dtype)
+        return self._scratch
+
+    def _copy_ranked(self, x1, x2, ranks, weight):
+        """Copies the pixels of x2 whose threshold is above weight to x1"""
+        order, negated = ranks
+        # number of thresholds greater than weight
+        count = bisect_left(negated, -weight)
+        if count == 0:
+            return
+        if not (
+            x1.dtype == x2.dtype
+            and x1.flags.c_contiguous
+            and x2.flags.c_contiguous
+        ):
+            indexes = order[:count]
+            x1[indexes] = x2[indexes]
+            return
+
+        # copy whole pixels as single items rather than by channel
+        pixel = np.dtype((np.void, x1.strides[0]))
+        new = x1.view(pixel).ravel()
+        old = x2.view(pixel).ravel()
+        if count <= len(order) // 2:
+            indexes = order[:count]
+            new[indexes] = old[indexes]
+        else:
+            # cheaper to take the old frame and put back the pixels of the
+            # new one that have already switched over
+            indexes = order[count:]
+            kept = new[indexes]
+            np.copyto(x1, x2)
+            new[indexes] = kept
+
     def add(self, x1, x2, weight):
         """
         weighted additive blending of x1 and x2
         operates on x1 directly
         """
         np.multiply(x1, weight, x1)
-        x3 = np.multiply(x2, 1 - weight)
+        x3 = self._buffer(x1, x2)
+        np.multiply(x2, 1 - weight, x3)
         np.add(x1, x3, x1)
 
     def dissolve(self, x1, x2, weight):
@@ -55,16 +122,15 @@ class Transitions(metaclass=IterClass):
         random indexes of x1 are set to the value of x2
         roughly proportional in quantity to weight
         """
-        indexes = np.greater(self.dissolve_array, weight)
-        x1[indexes, :] = x2[indexes, :]
+        self._copy_ranked(x1, x2, self._dissolve_ranks, weight)
 
     def push(self, x1, x2, weight):
         """
         x1 "pushes" x2 to the side, proportional to weight
         """
         idx = int((1 - weight) * self.pixel_count)
-        x2 = np.roll(x2, idx, axis=0)
-        x1[:idx, :] = x2[:idx, :]
+        # the first idx pixels of x2 rolled by idx are its last idx pixels
+        x1[:idx, :] = x2[len(x2) - idx :, :]
 
     def slide(self, x1, x2, weight):
         """
@@ -77,8 +143,7 @@ class Transitions(metaclass=IterClass):
         """
         x2 overlaps x1 from the centre, proportional to weight
         """
-        indexes = np.greater(self.iris_array, weight)
-        x1[indexes, :] = x2[indexes, :]
+        self._copy_ranked(x1, x2, self._iris_ranks, weight)
 
     def throughWhite(self, x1, x2, weight):
         """
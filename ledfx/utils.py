@@ -5,7 +5,9 @@ import datetime
 import importlib
 import inspect
 import ipaddress
+import json
 import logging
+import logging.handlers
 import math
 import os
 import pkgutil
@@ -1008,11 +1010,17 @@ class BaseRegistry(ABC):
 class RegistryLoader:
     """Manages loading of components for a given registry"""
 
+    # Manifest in the package listing its types and the modules they live
+    # in, as written by ledfx.tools.registry_manifest. Modules listed there
+    # are only imported once one of their types is asked for.
+    MANIFEST_FILE = None
+
     def __init__(self, ledfx, cls, package):
         self._package = package
         self._cls = cls
         self._objects = {}
         self._object_id = 1
+        self._lazy_types = {}
 
         self._ledfx = ledfx
         self.import_registry(package)
@@ -1054,10 +1062,45 @@ class RegistryLoader:
         """
 
         found = self.discover_modules(package)
+        manifest = self.load_manifest(package)
+        listed = set(manifest.get("modules", []))
+        self._lazy_types = {
+            type: info
+            for type, info in manifest.get("types", {}).items()
+            if info["module"] in found
+        }
+        # Modules added since the manifest was written are imported now
+        found = [name for name in found if name not in listed]
         _LOGGER.debug(f"Importing {found} from {package}")
         for name in found:
             importlib.import_module(name)
 
+    def load_manifest(self, package):
+        """Loads the manifest of the package, if it has one"""
+        if self.MANIFEST_FILE is None:
+            return {}
+
+        module = importlib.import_module(package)
+        path = os.path.join(module.__path__[0], self.MANIFEST_FILE)
+        try:
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(
+                f"Unable to load the {package} manifest, importing all "
+                f"modules: {e}"
+            )
+            return {}
+
+    def import_type(self, type):
+        """Imports the module a type lives in, if it isn't loaded yet"""
+        registry = self._cls.registry()
+        if type not in registry and type in self._lazy_types:
+            module = self._lazy_types[type]["module"]
+            _LOGGER.debug(f"Importing {module} for {type}")
+            importlib.import_module(module)
+        return registry.get(type)
+
     def discover_modules(self, package):
         """Discovers all modules in the package"""
         module = importlib.import_module(package)
@@ -1073,13 +1116,32 @@ class RegistryLoader:
 
     def types(self):
         """Returns all the type strings in the registry"""
-        return list(self._cls.registry().keys())
+        types = list(self._lazy_types)
+        types.extend(
+            type for type in self._cls.registry() if type not in types
+        )
+        return types
+
+    def info(self, type):
+        """Returns the name and category of a type without importing it"""
+        info = self._lazy_types.get(type)
+        if info is None:
+            _cls = self.get_class(type)
+            info = {
+                "name": getattr(_cls, "NAME", None),
+                "category": getattr(_cls, "CATEGORY", None),
+            }
+        return {"name": info["name"], "category": info["category"]}
 
     def classes(self):
         """Returns all the classes in the registry"""
+        for type in self._lazy_types:
+            self.import_type(type)
         return self._cls.registry()
 
     def get_class(self, type):
+        if self.import_type(type) is None:
+            raise KeyError(type)
         return self._cls.registry()[type]
 
     def values(self):
@@ -1110,7 +1172,7 @@ class RegistryLoader:
     def create(self, type, id=None, *args, **kwargs):
         """Loads and creates a object from the registry by type"""
 
-        if type not in self._cls.registry():
+        if self.import_type(type) is None:
             raise AttributeError(
                 ("Couldn't find '{}' in the {} registry").format(
                     type, self._cls.__name__.lower()
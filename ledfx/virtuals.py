@@ -1,9 +1,6 @@
 import itertools
 import logging
-import sys
 import threading
-import time
-import timeit
 from functools import cached_property
 from typing import Optional
 
@@ -13,7 +10,7 @@ import voluptuous as vol
 from ledfx.color import parse_color
 from ledfx.config import save_config
 from ledfx.effects import DummyEffect
-from ledfx.effects.math import interpolate_pixels, make_pattern
+from ledfx.effects.math import make_pattern
 from ledfx.effects.melbank import (
     MAX_FREQ,
     MIN_FREQ,
@@ -30,13 +27,18 @@ from ledfx.events import (
     VirtualPauseEvent,
     VirtualUpdateEvent,
 )
+from ledfx.mapping import MappingPlan
+from ledfx.perf import VIRTUAL_STAGES, FrameTimings, perf_counter
 from ledfx.transitions import Transitions
-from ledfx.utils import fps_to_sleep_interval
 
 _LOGGER = logging.getLogger(__name__)
 
 color_list = ["red", "green", "blue", "cyan", "magenta", "#ffff00"]
 
+# Seconds between resends of a frame that hasn't changed, well inside the
+# realtime timeouts of the network devices so they stay in realtime mode
+STATIC_FRAME_REFRESH = 0.5
+
 
 class Virtual:
     CONFIG_SCHEMA = vol.Schema(
@@ -114,6 +116,11 @@ class Virtual:
                 description="Amount of rows. > 1 if this virtual is a matrix",
                 default=1,
             ): int,
+            vol.Optional(
+                "frame_rate_priority",
+                description="Which virtuals keep their frame rate longest when the CPU can't keep up",
+                default="normal",
+            ): vol.In(["low", "normal", "high"]),
         }
     )
 
@@ -133,17 +140,9 @@ class Virtual:
 
     _paused = False
     _active = False
-    _output_thread = None
     _active_effect = None
     _transition_effect = None
 
-    if (
-        sys.version_info[0] == 3 and sys.version_info[1] >= 11
-    ) or sys.version_info[0] >= 4:
-        _min_time = time.get_clock_info("perf_counter").resolution
-    else:
-        _min_time = time.get_clock_info("monotonic").resolution
-
     def __init__(self, ledfx, config):
         self._ledfx = ledfx
         self._config = config
@@ -168,6 +167,18 @@ class Virtual:
         self.fallback_timer = None
         self.fallback_suppress_transition = False
         self._streaming = False
+        self.perf = FrameTimings(VIRTUAL_STAGES)
+        # what the devices last received, to skip resending unchanged frames
+        self._static_frame_key = None
+        self._sent_frame = None
+        self._sent_time = 0.0
+        # uint8 frames handed to the devices, alternated between frames so
+        # the one published last stays intact while the next is assembled
+        self._output_frames = None
+        self._output_index = 0
+        # frame rate limit set by the governor, None renders at the
+        # devices' refresh rate
+        self.fps_cap = None
 
         self.frequency_range = FrequencyRange(
             self._config["frequency_min"], self._config["frequency_max"]
@@ -249,12 +260,17 @@ class Virtual:
             return segment
 
     def invalidate_cached_props(self):
+        # the devices may not be showing the last frame any more
+        self._sent_frame = None
+        self._static_frame_key = None
         # invalidate cached properties
         for prop in [
             "pixel_count",
+            "max_refresh_rate",
             "refresh_rate",
             "_devices",
             "_segments_by_device",
+            "_mapping_plan",
             "effective_pixel_count",
             "group_size",
         ]:
@@ -480,7 +496,7 @@ class Virtual:
 
             self.flush_pending_clear_frame()
 
-            self._active_effect = effect
+            self._active_effect = self._ledfx.render_workers.shard(effect)
             self._active_effect.activate(self)
             self._ledfx.events.fire_event(
                 EffectSetEvent(
@@ -575,7 +591,11 @@ class Virtual:
             self.clear_active_effect()
             self.clear_transition_effect()
             if self._active:
-                assembled_frame = np.zeros((self.pixel_count, 3))
+                self._sent_frame = None
+                self._static_frame_key = None
+                assembled_frame = np.zeros(
+                    (self.pixel_count, 3), dtype=np.uint8
+                )
                 self.flush(assembled_frame)
                 self._fire_update_event(assembled_frame)
 
@@ -591,7 +611,11 @@ class Virtual:
         Force all pixels in device to color
         Use for pre-clearing in calibration scenarios
         """
-        self.assembled_frame = np.full((self.effective_pixel_count, 3), color)
+        self.assembled_frame = np.full(
+            (self.effective_pixel_count, 3), color, dtype=np.uint8
+        )
+        self._sent_frame = None
+        self._static_frame_key = None
         self.flush(self.assembled_frame)
         self._fire_update_event()
 
@@ -599,10 +623,12 @@ class Virtual:
         if frame is None:
             frame = self.assembled_frame
 
-        self._ledfx.events.fire_event(
-            VirtualUpdateEvent(
+        self._ledfx.visualisation.publish(
+            Event.VIRTUAL_UPDATE,
+            self.id,
+            lambda: VirtualUpdateEvent(
                 self.id, self._effective_to_physical_pixels(frame)
-            )
+            ),
         )
 
     def set_calibration(self, calibration):
@@ -637,64 +663,128 @@ class Virtual:
     def active_effect(self):
         return self._active_effect
 
-    def thread_function(self):
-        while True:
-            if not self._active:
-                break
-            start_time = timeit.default_timer()
+    def process_frame(self):
+        """
+        Renders, assembles and flushes a single frame.
 
-            if self.fallback_fire:
-                self.set_fallback()
-                self.fallback_fire = False
+        Called by the frame scheduler once per tick of this virtual's
+        refresh rate group.
+        """
+        if not self._active:
+            return
 
-            # we need to lock before we test, or we could deactivate
-            # between test and execution
-            with self.lock:
-                if (
-                    self._active_effect
-                    and self._active_effect.is_active
-                    and hasattr(self._active_effect, "pixels")
-                ):
-                    # self.assembled_frame = await self._ledfx.loop.run_in_executor(
-                    #     self._ledfx.thread_executor, self.assemble_frame
-                    # )
-                    self.assembled_frame = self.assemble_frame()
-                    if self.assembled_frame is not None and not self._paused:
-                        if not self._config["preview_only"]:
-                            # self._ledfx.thread_executor.submit(self.flush)
-                            # await self._ledfx.loop.run_in_executor(
-                            #     self._ledfx.thread_executor, self.flush
-                            # )
-                            self.flush()
-
-                        self._fire_update_event()
-
-            # adjust for the frame assemble time, min allowed sleep 1 ms
-            # this will be more frame accurate on high res sleep systems
-            run_time = timeit.default_timer() - start_time
-            sleep_time = max(
-                0.001, fps_to_sleep_interval(self.refresh_rate) - run_time
-            )
-            time.sleep(sleep_time)
+        if self.fallback_fire:
+            self.set_fallback()
+            self.fallback_fire = False
+
+        # we need to lock before we test, or we could deactivate
+        # between test and execution
+        with self.lock:
+            if (
+                self._active_effect
+                and self._active_effect.is_active
+                and hasattr(self._active_effect, "pixels")
+            ):
+                static_frame = self._can_hold_frame()
+                if static_frame and self._holding_static_frame():
+                    if (
+                        perf_counter() - self._sent_time
+                        >= STATIC_FRAME_REFRESH
+                    ):
+                        self._send_frame()
+                    return
+
+                self.assembled_frame = self.assemble_frame()
+                if self.assembled_frame is not None and not self._paused:
+                    if (
+                        static_frame
+                        and self._frame_unchanged()
+                        and perf_counter() - self._sent_time
+                        < STATIC_FRAME_REFRESH
+                    ):
+                        return
+                    self._send_frame()
+
+    def _send_frame(self):
+        if self._paused:
+            return
+        if not self._config["preview_only"]:
+            self.flush()
+        self._fire_update_event()
+        self._sent_time = perf_counter()
+
+    def _can_hold_frame(self):
+        """
+        Whether the devices may be left showing the last frame when the next
+        one is the same. Transitions, oneshots and calibration change the
+        output on their own, and a device fed by other virtuals as well is
+        only flushed along with this virtual's frames.
+        """
+        if (
+            self._transition_effect is not None
+            or self._oneshots
+            or self._calibration
+        ):
+            self._static_frame_key = None
+            self._sent_frame = None
+            return False
+        for device in self._devices:
+            if device is not None and len(device.active_virtuals) > 1:
+                self._static_frame_key = None
+                self._sent_frame = None
+                return False
+        return True
+
+    def _holding_static_frame(self):
+        """
+        Whether the active effect declared its output unchanged since the
+        last frame, so rendering and post-processing it can be skipped.
+        """
+        static_frame = self._active_effect.static_frame()
+        if static_frame is None:
+            self._static_frame_key = None
+            return False
+        key = (
+            id(self._active_effect),
+            static_frame,
+            self._config["max_brightness"],
+            self._config["center_offset"],
+            self._ledfx.config["global_brightness"],
+        )
+        if key == self._static_frame_key:
+            return True
+        # the frame assembled next is the one to hold on to
+        self._static_frame_key = key
+        return False
 
-            # use an aggressive check for did we sleep against expected min clk
-            # for all high res scenarios this will be passive
-            # for unexpected high res sleep on windows scenarios it will adapt
-            pass_time = timeit.default_timer() - start_time
-            if pass_time < (self._min_time / 2):
-                time.sleep(max(0.001, self._min_time - pass_time))
+    def _frame_unchanged(self):
+        """
+        Whether the assembled frame is the same as the one the devices last
+        received, keeping a copy of it otherwise.
+        """
+        frame = self.assembled_frame
+        sent = self._sent_frame
+        if sent is not None and sent.shape == frame.shape:
+            if np.array_equal(sent, frame):
+                return True
+            np.copyto(sent, frame)
+        else:
+            self._sent_frame = frame.copy()
+        return False
 
     def assemble_frame(self):
         """
         Assembles the frame to be flushed.
         """
         # Get and process active effect frame
+        render_start = perf_counter()
         self._active_effect._render()
+        render_end = perf_counter()
         frame = self._active_effect.get_pixels()
+        self.perf.record("render", render_end - render_start)
+        self.perf.record("get_pixels", perf_counter() - render_end)
         if frame is not None:
-            frame[frame > 255] = 255
-            frame[frame < 0] = 0
-            # np.clip(frame, 0, 255, frame)
+            np.clip(frame, 0, 255, frame)
 
             if self._config["center_offset"]:
                 frame = np.roll(frame, self._config["center_offset"], axis=0)
@@ -705,11 +795,11 @@ class Virtual:
                 and self._transition_effect.is_active
                 and hasattr(self._transition_effect, "pixels")
             ):
+                transition_start = perf_counter()
                 # Get and process transition effect frame
                 self._transition_effect._render()
                 transition_frame = self._transition_effect.get_pixels()
-                transition_frame[transition_frame > 255] = 255
-                transition_frame[transition_frame < 0] = 0
+                np.clip(transition_frame, 0, 255, transition_frame)
 
                 if self._config["center_offset"]:
                     transition_frame = np.roll(
@@ -747,11 +837,41 @@ class Virtual:
                     == self.transition_frame_total
                 ):
                     self.clear_transition_effect()
+                self.perf.record(
+                    "transition", perf_counter() - transition_start
+                )
 
-            np.multiply(frame, self._config["max_brightness"], frame)
-            np.multiply(frame, self._ledfx.config["global_brightness"], frame)
+            # the brightness is applied while quantizing the clipped frame
+            # into the uint8 frame the devices send as is, truncating like
+            # the device encoders did
+            brightness = (
+                self._config["max_brightness"]
+                * self._ledfx.config["global_brightness"]
+            )
+            output = self._next_output_frame(frame.shape)
+            np.multiply(frame, brightness, out=output, casting="unsafe")
+            frame = output
         return frame
 
+    def _next_output_frame(self, shape):
+        """
+        Returns the uint8 frame to assemble the next frame into,
+        (re)allocating the frames whenever the shape changes.
+        """
+        frames = self._output_frames
+        if frames is None or frames[0].shape != shape:
+            frames = self._output_frames = (
+                np.zeros(shape, dtype=np.uint8),
+                np.zeros(shape, dtype=np.uint8),
+            )
+        self._output_index ^= 1
+        return frames[self._output_index]
+
+    @property
+    def pixel_dtype(self):
+        """The type of the pixels effects render on this virtual"""
+        return np.dtype(self._ledfx.config["render_precision"])
+
     def activate(self):
         if not self._devices:
             error = f"Virtual {self.id}: Cannot activate, no configured device segments"
@@ -762,9 +882,6 @@ class Virtual:
             _LOGGER.warning(error)
             raise RuntimeError(error)
 
-        if hasattr(self, "_thread"):
-            self._thread.join()
-
         _LOGGER.debug(
             f"Virtual {self.id}: Activating with segments {self._segments}"
         )
@@ -776,22 +893,14 @@ class Virtual:
                 _LOGGER.error(e)
             self._os_active = False
 
-        # self.thread_function()
-
-        self._thread = threading.Thread(
-            name=f"Virtual: {self.id}", target=self.thread_function
-        )
-        self._thread.start()
+        self._ledfx.scheduler.register(self)
         self._ledfx.events.fire_event(VirtualPauseEvent(self.id))
-        # self._task = self._ledfx.loop.create_task(self.thread_function())
-        # self._task.add_done_callback(lambda task: task.result())
         self._ledfx.virtuals.check_and_deactivate_devices()
 
     def deactivate(self):
         self._active = False
         self._os_active = False
-        if hasattr(self, "_thread"):
-            self._thread.join()
+        self._ledfx.scheduler.unregister(self)
         self.deactivate_segments()
         self._ledfx.events.fire_event(VirtualPauseEvent(self.id))
         self._ledfx.virtuals.check_and_deactivate_devices()
@@ -825,6 +934,10 @@ class Virtual:
         if pixels is None:
             pixels = self.assembled_frame
 
+        flush_start = perf_counter()
+        # time spent inside the devices is timed by the devices themselves
+        device_time = 0
+
         # Where we update oneshots
         oneshot_index = 0
         while oneshot_index < len(self._oneshots):
@@ -835,61 +948,39 @@ class Virtual:
             else:
                 oneshot_index += 1
 
-        if self._config["mapping"] == "span":
-            # In span mode we can calculate the final pixels once for all segments
-            pixels = self._effective_to_physical_pixels(pixels)
+        plan = self._mapping_plan
+        if plan.frame_length != len(pixels):
+            # frames that aren't effect frames, such as the clear frame
+            plan = self._build_mapping_plan(len(pixels))
+
+        if not self._calibration:
+            plan.map(pixels)
+            # Where we override segments
+            for oneshot in self._oneshots:
+                oneshot.apply(plan.buffer, 0, len(plan.buffer))
 
         color_cycle = itertools.cycle(color_list)
 
-        for device_id, segments in self._segments_by_device.items():
-            data = []
+        for device_id, data in plan.devices:
             device = self._ledfx.devices.get(device_id)
             if device is not None:
                 if device.is_active():
                     if self._calibration:
+                        data = []
                         self.render_calibration(
-                            data, device, segments, device_id, color_cycle
+                            data,
+                            device,
+                            self._segments_by_device[device_id],
+                            device_id,
+                            color_cycle,
                         )
-                    elif self._config["mapping"] == "span":
-                        for (
-                            start,
-                            stop,
-                            step,
-                            device_start,
-                            device_end,
-                        ) in segments:
-                            seg = pixels[start:stop:step]
-                            # Where we override segment
-                            for oneshot in self._oneshots:
-                                oneshot.apply(seg, start, stop)
-                            data.append((seg, device_start, device_end))
-                    elif self._config["mapping"] == "copy":
-                        for (
-                            start,
-                            stop,
-                            step,
-                            device_start,
-                            device_end,
-                        ) in segments:
-                            target_physical_len = device_end - device_start + 1
-                            target_effect_len = (
-                                self._get_effective_pixel_count(
-                                    target_physical_len
-                                )
-                            )
-                            # In copy mode, we need to scale the effect and afterwards expand the
-                            # pixel groups separately for every segment, because pre-calculating once
-                            # and scaling would lead to incorrect pixel group lengths.
-                            seg = interpolate_pixels(
-                                pixels, target_effect_len
-                            )[::step]
-                            seg = self._effective_to_physical_pixels(
-                                seg, target_physical_len
-                            )
-                            for oneshot in self._oneshots:
-                                oneshot.apply(seg, start, stop)
-                            data.append((seg, device_start, device_end))
+                    device_start_time = perf_counter()
                     device.update_pixels(self.id, data)
+                    device_time += perf_counter() - device_start_time
+
+        self.perf.record(
+            "segment_mapping", perf_counter() - flush_start - device_time
+        )
 
     def render_calibration(
         self, data, device, segments, device_id, color_cycle
@@ -1001,6 +1092,23 @@ class Virtual:
             data_start += segment_width
         return segments_by_device
 
+    @cached_property
+    def _mapping_plan(self):
+        """
+        The compiled mapping of effect frames onto the devices
+        """
+        return self._build_mapping_plan(self.effective_pixel_count)
+
+    def _build_mapping_plan(self, frame_length):
+        return MappingPlan(
+            self._segments_by_device,
+            self._config["mapping"],
+            frame_length,
+            self.group_size,
+            self.pixel_count,
+            np.uint8,
+        )
+
     @cached_property
     def _devices(self):
         """
@@ -1012,11 +1120,29 @@ class Virtual:
         )
 
     @cached_property
-    def refresh_rate(self):
+    def max_refresh_rate(self):
         if not self._devices:
             return False
         return min(device.max_refresh_rate for device in self._devices)
 
+    @cached_property
+    def refresh_rate(self):
+        if self.fps_cap and self.max_refresh_rate:
+            return min(self.fps_cap, self.max_refresh_rate)
+        return self.max_refresh_rate
+
+    def set_fps_cap(self, fps):
+        """
+        Limits the rate this virtual renders at, or lifts the limit if fps
+        is None. The scheduler moves it to its new rate on the next tick.
+        """
+        self.fps_cap = fps
+        # drop the cached refresh rate
+        self.__dict__.pop("refresh_rate", None)
+        # the devices flush with their fastest virtual
+        for device in self._devices:
+            device.invalidate_cached_props()
+
     @cached_property
     def pixel_count(self):
         if self._config["mapping"] == "span":
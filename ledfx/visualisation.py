@@ -0,0 +1,88 @@
+import logging
+import time
+
+from ledfx.events import Event
+
+_LOGGER = logging.getLogger(__name__)
+
+# fraction of the sample interval a frame may arrive early and still be
+# sampled, so frame timing jitter doesn't make us skip every other frame
+SAMPLE_TOLERANCE = 0.25
+
+
+class VisualisationSampler:
+    """
+    Decides on the producer side whether a virtual or device pixel update
+    needs to be published.
+
+    The frontend only needs pixels at visualisation_fps and only while a
+    websocket client is subscribed to visualisation updates. Frames that
+    would be dropped are skipped before their event is even built, rather
+    than being scheduled onto the event loop only to be thrown away there.
+    """
+
+    def __init__(self, ledfx):
+        self._ledfx = ledfx
+        self._handler = None
+        self._interval = 0
+        self._next_sample = {}
+
+    def configure(self, handler, fps):
+        """
+        Sets the handler that turns sampled pixel updates into
+        visualisation updates on the event loop.
+
+        Args:
+            handler (callable): Called on the event loop with the sampled
+                VirtualUpdateEvent or DeviceUpdateEvent.
+            fps (int): The rate at which each virtual and device is sampled.
+        """
+        self._handler = handler
+        self._interval = 1 / fps
+        self._next_sample = {}
+
+    def publish(self, event_type, vis_id, make_event):
+        """
+        Fires a pixel update event if anything needs it.
+
+        Listeners of the raw event type get every frame, the visualisation
+        handler only gets a frame once per sample interval per id. Both are
+        called later on the event loop, by which time the render thread has
+        moved on and may be reusing the frame's buffer, so the event gets a
+        copy of the pixels.
+
+        Args:
+            event_type (str): Event.VIRTUAL_UPDATE or Event.DEVICE_UPDATE.
+            vis_id (str): The id of the virtual or device.
+            make_event (callable): Builds the event, only called if the
+                frame is needed.
+        """
+        events = self._ledfx.events
+        fire = events.has_listeners(event_type)
+        visualise = (
+            self._handler is not None
+            and events.has_listeners(Event.VISUALISATION_UPDATE)
+            and self._due(vis_id)
+        )
+        if not (fire or visualise):
+            return
+
+        event = make_event()
+        event.pixels = event.pixels.copy()
+        if fire:
+            events.fire_event(event)
+        if visualise:
+            self._ledfx.loop.call_soon_threadsafe(self._handler, event)
+
+    def _due(self, vis_id):
+        time_now = time.monotonic()
+        next_sample = self._next_sample.get(vis_id, 0)
+        if time_now < next_sample - self._interval * SAMPLE_TOLERANCE:
+            return False
+        # stay on the sample grid so the average rate holds, but don't try
+        # to catch up on samples missed while nothing was being produced
+        next_sample += self._interval
+        if next_sample < time_now:
+            next_sample = time_now + self._interval
+        self._next_sample[vis_id] = next_sample
+        return True
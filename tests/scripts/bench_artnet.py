@@ -0,0 +1,110 @@
+"""
+Benchmark of Art-Net universe packing and sending
+
+Compares ArtNetDevice.flush, which scatters the frame into prebuilt ArtDmx
+datagrams, against the previous implementation that rebuilt the channel
+layout and went through StupidArtnet one universe at a time. Packets are
+sent to the local machine.
+
+Run from the repository root:
+    python tests/scripts/bench_artnet.py
+"""
+
+import timeit
+
+import numpy as np
+from stupidArtnet import StupidArtnet
+
+from ledfx.devices.artnet import ArtNetDevice
+from ledfx.devices.utils.rgbw_conversion import rgb_to_output_mode
+
+UNIVERSE_COUNTS = (1, 10, 40)
+PACKET_SIZE = 510
+DESTINATION = "127.0.0.1"
+REPEATS = 5
+
+
+def make_device(universes):
+    config = ArtNetDevice.schema()(
+        {
+            "name": "Benchmark",
+            "ip_address": DESTINATION,
+            "pixel_count": universes * PACKET_SIZE // 3,
+            "packet_size": PACKET_SIZE,
+            "pre_amble": "255",
+            "pixels_per_device": 10,
+        }
+    )
+    device = ArtNetDevice(None, config)
+    device._destination = DESTINATION
+    device.activate()
+    return device
+
+
+def legacy_flush(artnet, device, data):
+    """The ArtNetDevice.flush implementation prior to the prebuilt datagrams"""
+    data = rgb_to_output_mode(data, device.output_mode)
+    data = data.flatten()[: device.data_max * device.channels_per_pixel]
+    devices_data = np.empty(device.channel_count, dtype=np.uint8)
+    reshaped_data = data.reshape(
+        (
+            device.num_devices,
+            device.pixels_per_device * device.channels_per_pixel,
+        )
+    )
+    pre_amble_repeated = np.tile(device.pre_amble, (device.num_devices, 1))
+    post_amble_repeated = np.tile(device.post_amble, (device.num_devices, 1))
+    full_device_data = np.concatenate(
+        (pre_amble_repeated, reshaped_data, post_amble_repeated),
+        axis=1,
+    )
+    devices_data[0 : device.dmx_start_address] = 0
+    devices_data[device.dmx_start_address :] = full_device_data.ravel()
+
+    for i in range(device.universe_count):
+        start = i * device.packet_size
+        end = start + device.packet_size
+        packet = np.zeros(device.packet_size, dtype=np.uint8)
+        packet[: min(device.packet_size, device.channel_count - start)] = (
+            devices_data[start:end]
+        )
+        artnet.set_universe(i + device._config["universe"])
+        artnet.set(packet)
+        artnet.show()
+
+
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=REPEATS)) / number
+
+
+def main():
+    print(
+        f"{'universes':>9} {'legacy (universes/s)':>21} "
+        f"{'current (universes/s)':>22} {'speedup':>8}"
+    )
+    for universes in UNIVERSE_COUNTS:
+        device = make_device(universes)
+        artnet = StupidArtnet(
+            target_ip=DESTINATION,
+            universe=device._config["universe"],
+            packet_size=device.packet_size,
+        )
+        frame = np.random.default_rng(0).random((device.pixel_count, 3))
+        frame *= 255
+        number = max(5, 400 // universes)
+        try:
+            legacy = time_call(
+                lambda: legacy_flush(artnet, device, frame), number
+            )
+            current = time_call(lambda: device.flush(frame), number)
+        finally:
+            artnet.close()
+            device.deactivate()
+        print(
+            f"{universes:>9} {universes / legacy:>21.0f} "
+            f"{universes / current:>22.0f} {legacy / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark of E1.31 universe packing and sending
+
+Compares E131Device.flush, which packs prebuilt packets with numpy, against
+the previous implementation that went through the sacn library's
+per-universe DMX lists. Packets are sent to the local machine.
+
+Run from the repository root:
+    python tests/scripts/bench_e131.py
+"""
+
+import timeit
+
+import numpy as np
+import sacn
+
+from ledfx.devices.e131 import E131Device
+
+UNIVERSE_COUNTS = (1, 10, 40)
+UNIVERSE_SIZE = 510
+DESTINATION = "127.0.0.1"
+REPEATS = 5
+
+
+def make_device(universes):
+    config = E131Device.schema()(
+        {
+            "name": "Benchmark",
+            "ip_address": DESTINATION,
+            "pixel_count": universes * UNIVERSE_SIZE // 3,
+            "universe_size": UNIVERSE_SIZE,
+        }
+    )
+    device = E131Device(None, config)
+    device._destination = DESTINATION
+    device.activate()
+    return device
+
+
+def make_legacy_sender(device):
+    config = device._config
+    sender = sacn.sACNsender(source_name=device.name)
+    for universe in range(config["universe"], config["universe_end"] + 1):
+        sender.activate_output(universe)
+        sender[universe].destination = DESTINATION
+    sender.start()
+    sender.manual_flush = True
+    return sender
+
+
+def legacy_flush(sender, config, data):
+    """The E131Device.flush implementation prior to the prebuilt packets"""
+    data = data.flatten()
+    current_index = 0
+    for universe in range(config["universe"], config["universe_end"] + 1):
+        universe_start = (universe - config["universe"]) * config[
+            "universe_size"
+        ]
+        universe_end = (universe - config["universe"] + 1) * config[
+            "universe_size"
+        ]
+        dmx_start = (
+            max(universe_start, config["channel_offset"])
+            % config["universe_size"]
+        )
+        dmx_end = (
+            min(
+                universe_end,
+                config["channel_offset"] + config["channel_count"],
+            )
+            % config["universe_size"]
+        )
+        if dmx_end == 0:
+            dmx_end = config["universe_size"]
+
+        input_start = current_index
+        input_end = current_index + dmx_end - dmx_start
+        current_index = input_end
+
+        dmx_data = np.array(sender[universe].dmx_data)
+        dmx_data[dmx_start:dmx_end] = data[input_start:input_end]
+        sender[universe].dmx_data = dmx_data.tolist()
+    sender.flush()
+
+
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=REPEATS)) / number
+
+
+def main():
+    print(
+        f"{'universes':>9} {'legacy (universes/s)':>21} "
+        f"{'current (universes/s)':>22} {'speedup':>8}"
+    )
+    for universes in UNIVERSE_COUNTS:
+        device = make_device(universes)
+        sender = make_legacy_sender(device)
+        frame = np.random.default_rng(0).random((device.pixel_count, 3))
+        frame *= 255
+        number = max(5, 400 // universes)
+        try:
+            legacy = time_call(
+                lambda: legacy_flush(sender, device._config, frame), number
+            )
+            current = time_call(lambda: device.flush(frame), number)
+        finally:
+            sender.stop()
+            device.deactivate()
+        print(
+            f"{universes:>9} {universes / legacy:>21.0f} "
+            f"{universes / current:>22.0f} {legacy / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Micro-benchmark for the Water, Fire and Rain effect kernels.
+
+Renders each effect on a 1500 pixel strip, comparing the array kernels
+against the per pixel, per spark and per drop Python loops they used
+before. Rain is rendered with 200 drops falling at once.
+
+Run from the repository root:
+
+    python tests/scripts/bench_effect_kernels.py
+"""
+
+import itertools
+import timeit
+import types
+
+import numpy as np
+
+from ledfx.effects import fire as fire_module
+from ledfx.effects import smooth
+from ledfx.effects.fire import Fire
+from ledfx.effects.rain import RainAudioEffect
+from ledfx.effects.water import Water
+
+REPEATS = 5
+NUMBER = 20
+PIXEL_COUNT = 1500
+DROP_COUNT = 200
+
+
+class LegacyWater(Water):
+    """Water with the per pixel ripple loop it had before"""
+
+    def _do_ripple(self, buf, buf_idx, damp_factor):
+        src = 1 if buf_idx == 0 else 0
+        dest = 0 if buf_idx == 0 else 1
+        for pixel in range(1, self.pixel_count - 1):
+            buf[dest][pixel] = (
+                (
+                    buf[src][pixel - 1]
+                    + buf[src][pixel + 1]
+                    + buf[src][pixel] * 2
+                )
+                / 2
+            ) - buf[dest][pixel]
+        buf[dest] = smooth(buf[dest], 1.0)
+        buf[dest] -= buf[dest] / damp_factor
+
+
+class LegacyFire(Fire):
+    """Fire with the per pixel diffusion and per spark loops it had before"""
+
+    def render_hsv(self):
+        current_time = fire_module.time.time()
+        delta = (current_time - self.delta_last) * 1000 * self.speed
+        self.delta_last = current_time
+
+        pixels = self.spark_pixels
+        np.multiply(pixels, self.cooling, out=pixels)
+        for k in range(self.pixel_count - 1, 4, -1):
+            h1 = pixels[k - 1]
+            h2 = pixels[k - 2]
+            h3 = pixels[k - 3]
+            h4 = pixels[k - 4]
+            pixels[k] = (h1 + h2 + h3 * 2 + h4 * 3) / 7
+
+        for i in range(self.spark_count):
+            if self.sparks[i] <= 0:
+                self.sparks[i] = np.random.random(1)[0]
+            self.sparks[i] += self.accel * delta
+            ox = self.sparkX[i]
+            self.sparkX[i] += self.sparks[i] * self.sparks[i] * delta
+            if self.sparkX[i] > self.pixel_count:
+                self.sparkX[i] = 0
+                self.sparks[i] = 0
+                continue
+            j = int(ox)
+            while j < self.sparkX[i]:
+                pixels[j] += np.clip(1 - self.sparks[i] * 0.4, 0, 1) * 0.5
+                j += 1
+
+
+class LegacyRain(RainAudioEffect):
+    """Rain with the per drop overlay loop it had before"""
+
+    def render(self):
+        overlaid_frames = np.zeros((3, self.pixel_count + self.frame_width))
+        for index in np.flatnonzero(self.drop_frames):
+            if self.drop_frames[index] >= len(self.drop_animation):
+                continue
+            colored_frame = [
+                self.drop_animation[self.drop_frames[index]]
+                * self.drop_colors[color, index]
+                for color in range(3)
+            ]
+            overlaid_frames[
+                :, index : index + self.frame_width
+            ] += colored_frame
+        self.pixels = overlaid_frames[
+            :,
+            self.frame_side_lengths : self.frame_side_lengths
+            + self.pixel_count,
+        ].T
+        self.pixels += self.pulse_pixels
+        self.pulse_pixels = (self.pulse_pixels * 9) // 10
+
+
+def activate(cls, **config):
+    effect = cls(None, cls.schema()(config))
+    effect.pixels = np.zeros((PIXEL_COUNT, 3))
+    for base in reversed(type(effect).__mro__):
+        if "on_activate" in vars(base):
+            base.on_activate(effect, PIXEL_COUNT)
+    return effect
+
+
+def water(cls):
+    effect = activate(cls)
+    for position in range(10, PIXEL_COUNT, 100):
+        effect.drops_queue.put((position, 5.0))
+    effect.render_hsv()
+    return effect.render_hsv
+
+
+def fire(cls):
+    # every render is one frame at 60 fps later
+    frames = itertools.count()
+    fire_module.time = types.SimpleNamespace(time=lambda: next(frames) / 60)
+    effect = activate(cls, intensity=30)
+    return effect.render_hsv
+
+
+def rain(cls):
+    effect = activate(cls)
+    rng = np.random.default_rng(0)
+    for location in rng.choice(PIXEL_COUNT, DROP_COUNT, replace=False):
+        effect.new_drop(location, rng.integers(0, 256, 3))
+    # spread the drops over the animation
+    effect.drop_frames[effect.drop_frames > 0] = rng.integers(
+        1, effect.n_frames - 1, DROP_COUNT
+    )
+    return effect.render
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEATS)) / NUMBER
+
+
+def main():
+    print(
+        f"{'effect':>8} {'legacy (us)':>12} {'kernel (us)':>12} "
+        f"{'speedup':>8}"
+    )
+    for name, setup, legacy_cls, cls in (
+        ("water", water, LegacyWater, Water),
+        ("fire", fire, LegacyFire, Fire),
+        ("rain", rain, LegacyRain, RainAudioEffect),
+    ):
+        before = time_call(setup(legacy_cls))
+        after = time_call(setup(cls))
+        print(
+            f"{name:>8} {before * 1e6:>12.1f} {after * 1e6:>12.1f} "
+            f"{before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
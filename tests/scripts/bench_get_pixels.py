@@ -0,0 +1,90 @@
+"""
+Benchmark of Effect.get_pixels post-processing
+
+Compares the current buffer reusing implementation against the previous
+copy-per-step implementation at a range of strip lengths, and checks both
+produce the same frames.
+
+Run from the repository root:
+    python tests/scripts/bench_get_pixels.py
+"""
+
+import timeit
+
+import numpy as np
+
+from ledfx.effects import _gaussian_kernel1d
+from ledfx.effects.rainbow import RainbowEffect
+
+PIXEL_COUNTS = (300, 3000, 30000)
+CONFIGS = {
+    "plain": {},
+    "flip+mirror": {"flip": True, "mirror": True},
+    "bg+brightness": {"background_color": "#102030", "brightness": 0.5},
+    "blur": {"blur": 2.0},
+    "all": {
+        "flip": True,
+        "mirror": True,
+        "background_color": "#102030",
+        "brightness": 0.5,
+        "blur": 2.0,
+    },
+}
+REPEATS = 5
+
+
+def legacy_get_pixels(effect):
+    """The get_pixels implementation prior to the output buffers"""
+    pixels = np.copy(effect.pixels)
+    config = effect._config
+    if effect.flip:
+        pixels = np.flipud(pixels)
+    if effect.mirror:
+        mirrored_pixels = np.concatenate((pixels[::-1], pixels))
+        pixels = np.maximum(mirrored_pixels[::2], mirrored_pixels[1::2])
+    if effect.bg_color_use:
+        pixels += effect._bg_color
+    if effect.brightness is not None:
+        np.multiply(pixels, effect.brightness, out=pixels, casting="unsafe")
+    if config["blur"] != 0.0 and effect.pixel_count > 3:
+        kernel = _gaussian_kernel1d(config["blur"], 0, len(pixels))
+        pixels[:, 0] = np.convolve(pixels[:, 0], kernel, mode="same")
+        pixels[:, 1] = np.convolve(pixels[:, 1], kernel, mode="same")
+        pixels[:, 2] = np.convolve(pixels[:, 2], kernel, mode="same")
+    return pixels
+
+
+def make_effect(pixel_count, config):
+    # any effect will do, only the base class post-processing is timed
+    effect = RainbowEffect(None, config)
+    effect.pixels = np.random.default_rng(0).random((pixel_count, 3)) * 255
+    effect._active = True
+    return effect
+
+
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=REPEATS)) / number
+
+
+def main():
+    print(
+        f"{'pixels':>8} {'config':<14} {'legacy (us)':>12} "
+        f"{'current (us)':>13} {'speedup':>8}"
+    )
+    for pixel_count in PIXEL_COUNTS:
+        number = max(10, 300000 // pixel_count)
+        for name, config in CONFIGS.items():
+            effect = make_effect(pixel_count, config)
+            np.testing.assert_allclose(
+                effect.get_pixels(), legacy_get_pixels(effect)
+            )
+            legacy = time_call(lambda: legacy_get_pixels(effect), number)
+            current = time_call(effect.get_pixels, number)
+            print(
+                f"{pixel_count:>8} {name:<14} {legacy * 1e6:>12.1f} "
+                f"{current * 1e6:>13.1f} {legacy / current:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark for the batched melbank engine.
+
+Compares computing every melbank with one stacked filterbank matrix and
+filters that run over all the melbanks at once against running each
+melbank processor on its own.
+
+Run from the repository root:
+
+    python tests/scripts/bench_melbank.py
+"""
+
+import timeit
+from types import SimpleNamespace
+
+import aubio
+import numpy as np
+
+from ledfx.effects.melbank import FFT_SIZE, MIC_RATE, Melbanks
+
+REPEATS = 5
+NUMBER = 2000
+SAMPLE_RATE = 60
+
+
+def make_melbanks(config, batched):
+    ledfx = SimpleNamespace(
+        config={},
+        dev_enabled=lambda: False,
+        events=SimpleNamespace(fire_event=lambda event: None),
+    )
+    audio = SimpleNamespace(
+        _config={"min_volume": 0.2},
+        _frequency_domain=None,
+        volume=lambda filtered=True: 1.0,
+    )
+    melbanks = Melbanks(ledfx, audio, config)
+    melbanks._batched = batched
+    return melbanks
+
+
+def frequency_domain():
+    block = MIC_RATE // SAMPLE_RATE
+    pvoc = aubio.pvoc(FFT_SIZE, block)
+    rng = np.random.default_rng(0)
+    for _ in range(FFT_SIZE // block + 1):
+        spectrum = pvoc(rng.standard_normal(block).astype(np.float32))
+    return spectrum
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEATS)) / NUMBER
+
+
+def main():
+    spectrum = frequency_domain()
+    print(
+        f"{'melbanks':>8} {'samples':>8} {'per proc (us)':>14} "
+        f"{'batched (us)':>13} {'speedup':>8}"
+    )
+    for max_frequencies in ([350, 2000, 15000], [100, 250, 3000, 10000]):
+        for samples in (24, 64):
+            config = {"samples": samples, "max_frequencies": max_frequencies}
+            timings = []
+            for batched in (False, True):
+                melbanks = make_melbanks(config, batched)
+                melbanks._audio._frequency_domain = spectrum
+                timings.append(time_call(melbanks))
+            legacy, batched = timings
+            print(
+                f"{len(max_frequencies):>8} {samples:>8} "
+                f"{legacy * 1e6:>14.1f} {batched * 1e6:>13.1f} "
+                f"{legacy / batched:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark of the numpy packet encoders
+
+Compares the Open Pixel Control and Hue Entertainment encoders in
+ledfx.devices.packets against the per pixel Python implementations they
+replaced.
+
+Run from the repository root:
+    python tests/scripts/bench_packets.py
+"""
+
+import timeit
+
+import numpy as np
+
+from ledfx.devices.packets import (
+    build_hue_entertainment_packet,
+    build_opc_packet,
+)
+from tests.test_packets import (
+    ENTERTAINMENT_ID,
+    reference_hue_packet,
+    reference_opc_packet,
+)
+
+OPC_PIXEL_COUNTS = (30, 300, 3000)
+# the Hue Entertainment API supports at most 20 channels
+HUE_CHANNEL_COUNTS = (1, 10, 20)
+REPEATS = 5
+
+
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=REPEATS)) / number
+
+
+def compare(name, counts, reference, current):
+    for count in counts:
+        data = np.random.default_rng(0).random((count, 3)) * 255
+        number = max(20, 30000 // count)
+        legacy = time_call(lambda: reference(data), number)
+        numpy = time_call(lambda: current(data), number)
+        print(
+            f"{name:<5} {count:>7} {legacy * 1e6:>12.1f} "
+            f"{numpy * 1e6:>11.1f} {legacy / numpy:>7.1f}x"
+        )
+
+
+def main():
+    print(
+        f"{'':<5} {'pixels':>7} {'legacy (us)':>12} "
+        f"{'numpy (us)':>11} {'speedup':>8}"
+    )
+    compare(
+        "OPC",
+        OPC_PIXEL_COUNTS,
+        lambda data: reference_opc_packet(data, 0),
+        lambda data: build_opc_packet(data, 0),
+    )
+    compare(
+        "Hue",
+        HUE_CHANNEL_COUNTS,
+        lambda data: reference_hue_packet(data, ENTERTAINMENT_ID),
+        lambda data: build_hue_entertainment_packet(data, ENTERTAINMENT_ID),
+    )
+
+
+if __name__ == "__main__":
+    main()
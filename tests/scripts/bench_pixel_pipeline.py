@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for the pixel pipeline between an effect and its devices.
+
+Takes one rendered frame through assemble_frame, the segment mapping and
+the device encoding, comparing float64 pixels that every device converted
+to bytes itself against float32 effect pixels quantized once to uint8 by
+the virtual. Also reports the bytes moved per frame.
+
+Run from the repository root:
+
+    python tests/scripts/bench_pixel_pipeline.py
+"""
+
+import timeit
+
+import numpy as np
+
+from ledfx.mapping import MappingPlan
+
+REPEATS = 5
+NUMBER = 500
+DEVICES = 4
+DEVICE_LENGTH = 300
+BRIGHTNESS = 0.8
+GLOBAL_BRIGHTNESS = 0.9
+
+
+def segments_by_device():
+    """Virtual._segments_by_device, one whole device per segment"""
+    by_device = {}
+    for device in range(DEVICES):
+        data_start = device * DEVICE_LENGTH
+        by_device[f"device-{device}"] = [
+            (
+                data_start,
+                data_start + DEVICE_LENGTH,
+                1,
+                0,
+                DEVICE_LENGTH - 1,
+            )
+        ]
+    return by_device
+
+
+def legacy_pipeline(pixels, plan):
+    """Float64 end to end, each device converting its frame to bytes"""
+    frame = np.clip(pixels, 0, 255)
+    frame *= BRIGHTNESS
+    frame *= GLOBAL_BRIGHTNESS
+    plan.map(frame)
+    return [
+        data[0][0].astype(np.dtype("B")).tobytes() for _, data in plan.devices
+    ]
+
+
+def quantized_pipeline(pixels, plan, out):
+    """Float32 effect pixels, quantized to uint8 once by the virtual"""
+    frame = np.clip(pixels, 0, 255)
+    np.multiply(
+        frame, BRIGHTNESS * GLOBAL_BRIGHTNESS, out=out, casting="unsafe"
+    )
+    plan.map(out)
+    return [
+        data[0][0].astype(np.dtype("B"), copy=False).tobytes()
+        for _, data in plan.devices
+    ]
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEATS)) / NUMBER
+
+
+def main():
+    by_device = segments_by_device()
+    pixel_count = DEVICES * DEVICE_LENGTH
+    pixels = np.random.default_rng(0).random((pixel_count, 3)) * 300
+    pixels32 = pixels.astype(np.float32)
+    out = np.zeros((pixel_count, 3), dtype=np.uint8)
+    args = (by_device, "span", pixel_count, 1, pixel_count)
+    plan = MappingPlan(*args)
+    plan8 = MappingPlan(*args, dtype=np.uint8)
+
+    legacy = time_call(lambda: legacy_pipeline(pixels, plan))
+    quantized = time_call(lambda: quantized_pipeline(pixels32, plan8, out))
+    # effect pixels, brightness frame and mapped segments
+    legacy_bytes = pixels.nbytes * 2 + plan.buffer.nbytes
+    quantized_bytes = pixels32.nbytes + out.nbytes + plan8.buffer.nbytes
+
+    print(f"{'pipeline':>10} {'frame (us)':>11} {'bytes':>8}")
+    print(f"{'float64':>10} {legacy * 1e6:>11.1f} {legacy_bytes:>8}")
+    print(f"{'uint8':>10} {quantized * 1e6:>11.1f} {quantized_bytes:>8}")
+    print(
+        f"\n{legacy / quantized:.1f}x faster, "
+        f"{legacy_bytes / quantized_bytes:.1f}x fewer bytes per frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for the shared screen capture service of the Clone effect.
+
+Serves 1 to 8 Clone regions of a 1920x1080 screen. Before, every Clone
+grabbed its own region on the render thread and resized it through PIL,
+as Clone.draw did. Now the capture thread grabs the regions' bounding box
+once and every Clone only block averages its region out of that grab.
+Render thread and capture thread time are reported apart, the capture
+thread runs at screen_capture_fps whatever the render rate. A screen grab
+is simulated by copying the screen's bytes, so grab costs are a lower
+bound, real grabs go through the display server.
+
+Run from the repository root:
+
+    python tests/scripts/bench_screen_capture.py
+"""
+
+import timeit
+
+import numpy as np
+from PIL import Image
+
+from ledfx.screen_capture import block_average
+
+REPEATS = 5
+NUMBER = 50
+SCREEN = (1080, 1920)
+REGION = (270, 480)
+MATRIX = (32, 64)
+
+
+def make_screen():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (*SCREEN, 4), dtype=np.uint8)
+
+
+def regions(count):
+    """(top, left) of count regions spread over the screen"""
+    return [
+        (
+            (i * 131) % (SCREEN[0] - REGION[0]),
+            (i * 211) % (SCREEN[1] - REGION[1]),
+        )
+        for i in range(count)
+    ]
+
+
+def grab(screen, top, left, height, width):
+    """What mss hands back, a buffer of the area's BGRX bytes"""
+    area = screen[top : top + height, left : left + width]
+    return np.ascontiguousarray(area).data
+
+
+def legacy_clones(screen, tops_lefts):
+    """Every Clone grabs its own region and resizes it with PIL"""
+    for top, left in tops_lefts:
+        raw = grab(screen, top, left, *REGION)
+        image = Image.frombytes(
+            "RGB", (REGION[1], REGION[0]), raw, "raw", "BGRX"
+        )
+        image.resize((MATRIX[1], MATRIX[0]), Image.BILINEAR)
+
+
+def shared_capture(screen, tops_lefts, buffer):
+    """The capture thread grabs the regions' bounding box once"""
+    top = min(t for t, _ in tops_lefts)
+    left = min(l for _, l in tops_lefts)
+    bottom = max(t for t, _ in tops_lefts) + REGION[0]
+    right = max(l for _, l in tops_lefts) + REGION[1]
+    height, width = bottom - top, right - left
+    raw = grab(screen, top, left, height, width)
+    frame = buffer[:height, :width]
+    np.copyto(frame, np.frombuffer(raw, np.uint8).reshape(height, width, 4))
+    return frame, top, left
+
+
+def shared_clones(frame, top, left, tops_lefts):
+    """Every Clone block averages its region out of the latest grab"""
+    for region_top, region_left in tops_lefts:
+        y, x = region_top - top, region_left - left
+        bgrx = block_average(
+            frame[y : y + REGION[0], x : x + REGION[1]], *MATRIX
+        )
+        Image.fromarray(np.ascontiguousarray(bgrx[..., 2::-1]), "RGB")
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEATS)) / NUMBER
+
+
+def main():
+    screen = make_screen()
+    buffer = np.zeros_like(screen)
+    print(
+        f"{'clones':>7} {'legacy render (ms)':>18} "
+        f"{'shared render (ms)':>19} {'shared capture (ms)':>20} "
+        f"{'grabs':>6}"
+    )
+    for count in (1, 2, 4, 8):
+        tops_lefts = regions(count)
+        legacy = time_call(lambda: legacy_clones(screen, tops_lefts))
+        capture = time_call(lambda: shared_capture(screen, tops_lefts, buffer))
+        frame, top, left = shared_capture(screen, tops_lefts, buffer)
+        render = time_call(lambda: shared_clones(frame, top, left, tops_lefts))
+        print(
+            f"{count:>7} {legacy * 1e3:>18.2f} {render * 1e3:>19.2f} "
+            f"{capture * 1e3:>20.2f} {f'{count}/1':>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for the compiled segment mapping plans of Virtual.flush.
+
+Maps a frame onto 100 segments spread over 20 devices, comparing the
+vectorized gathers of a MappingPlan against slicing, interpolating and
+expanding every segment on every frame.
+
+Run from the repository root:
+
+    python tests/scripts/bench_segment_mapping.py
+"""
+
+import timeit
+
+import numpy as np
+
+from ledfx.effects.math import interpolate_pixels
+from ledfx.mapping import MappingPlan
+
+REPEATS = 5
+NUMBER = 500
+DEVICES = 20
+SEGMENTS_PER_DEVICE = 5
+SEGMENT_LENGTH = 60
+
+
+def segments_by_device():
+    """Virtual._segments_by_device for 100 segments over 20 devices"""
+    by_device = {}
+    data_start = 0
+    for index in range(SEGMENTS_PER_DEVICE):
+        for device in range(DEVICES):
+            device_start = index * SEGMENT_LENGTH
+            device_end = device_start + SEGMENT_LENGTH - 1
+            if index % 2:
+                stop = None if data_start == 0 else data_start - 1
+                info = (data_start + SEGMENT_LENGTH - 1, stop, -1)
+            else:
+                info = (data_start, data_start + SEGMENT_LENGTH, 1)
+            by_device.setdefault(f"device-{device}", []).append(
+                (*info, device_start, device_end)
+            )
+            data_start += SEGMENT_LENGTH
+    return by_device
+
+
+def grouped(pixels, group_size, pixel_count):
+    if group_size <= 1:
+        return pixels
+    return np.repeat(pixels, group_size, axis=0)[:pixel_count]
+
+
+def legacy_flush(by_device, mapping, pixels, group_size, pixel_count):
+    """The per segment mapping Virtual.flush did before the plans"""
+    if mapping == "span":
+        pixels = grouped(pixels, group_size, pixel_count)
+    for segments in by_device.values():
+        data = []
+        for start, stop, step, device_start, device_end in segments:
+            if mapping == "span":
+                seg = pixels[start:stop:step]
+            else:
+                length = device_end - device_start + 1
+                seg = interpolate_pixels(
+                    pixels, int(np.ceil(length / group_size))
+                )[::step]
+                seg = grouped(seg, group_size, length)
+            data.append((seg, device_start, device_end))
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEATS)) / NUMBER
+
+
+def main():
+    by_device = segments_by_device()
+    pixel_count = DEVICES * SEGMENTS_PER_DEVICE * SEGMENT_LENGTH
+    print(
+        f"{'mapping':>8} {'group':>6} {'frame':>6} {'legacy (us)':>12} "
+        f"{'plan (us)':>10} {'speedup':>8}"
+    )
+    for mapping in ("span", "copy"):
+        for group_size in (1, 4):
+            frame_length = -(-pixel_count // group_size)
+            if mapping == "copy":
+                # every segment shows the whole effect
+                frame_length = -(-SEGMENT_LENGTH // group_size) * 2
+            frame = np.random.default_rng(0).random((frame_length, 3)) * 255
+            plan = MappingPlan(
+                by_device, mapping, frame_length, group_size, pixel_count
+            )
+            legacy = time_call(
+                lambda: legacy_flush(
+                    by_device, mapping, frame, group_size, pixel_count
+                )
+            )
+            compiled = time_call(lambda: plan.map(frame))
+            print(
+                f"{mapping:>8} {group_size:>6} {frame_length:>6} "
+                f"{legacy * 1e6:>12.1f} {compiled * 1e6:>10.1f} "
+                f"{legacy / compiled:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
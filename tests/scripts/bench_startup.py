@@ -0,0 +1,110 @@
+"""
+Startup benchmark for loading the effect registry.
+
+Starts a fresh interpreter under ``python -X importtime`` that loads the
+effect registry, once from the manifest and once importing every effect
+module up front as it did before, and reports the time spent importing
+and how many modules were loaded. The base ledfx.effects import, which
+both share, is reported on its own.
+
+Modules loaded through importlib.import_module aren't listed by
+importtime, though the imports they make are, so the modules loaded are
+read from sys.modules at exit.
+
+Run from the repository root:
+
+    python tests/scripts/bench_startup.py
+"""
+
+import os
+import subprocess
+import sys
+
+REPEATS = 5
+
+# Lists the modules loaded once the code has run
+MODULES = """
+import sys
+
+print("\\n".join(sys.modules))
+"""
+
+BASE = "import ledfx.effects"
+
+LAZY = """
+from ledfx.effects import Effects
+
+class Ledfx:
+    def dev_enabled(self):
+        return False
+
+Effects(Ledfx())
+"""
+
+EAGER = """
+from ledfx.effects import Effects
+
+class EagerEffects(Effects):
+    MANIFEST_FILE = None
+
+class Ledfx:
+    def dev_enabled(self):
+        return False
+
+EagerEffects(Ledfx())
+"""
+
+
+def import_times(code):
+    """Returns the total import time in us and every module loaded"""
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code + MODULES],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    total = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # nested imports are indented below the import that caused them
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, set(result.stdout.split())
+
+
+def startup(code):
+    """Returns the best total import time in ms and the modules loaded"""
+    runs = [import_times(code) for _ in range(REPEATS)]
+    best = min(total for total, _ in runs)
+    return best / 1000, runs[0][1]
+
+
+def main():
+    base_ms, base = startup(BASE)
+    lazy_ms, lazy = startup(LAZY)
+    eager_ms, eager = startup(EAGER)
+
+    print(f"{'registry':>10} {'imports (ms)':>13} {'modules':>8}")
+    for name, ms, modules in (
+        ("base", base_ms, base),
+        ("eager", eager_ms, eager),
+        ("lazy", lazy_ms, lazy),
+    ):
+        print(f"{name:>10} {ms:>13.1f} {len(modules):>8}")
+    print(
+        f"\nlazy loading saves {eager_ms - lazy_ms:.1f} ms, "
+        f"{eager_ms - base_ms:.1f} ms were spent importing effects"
+    )
+    effects = sorted(
+        name for name in eager - lazy if name.startswith("ledfx.effects.")
+    )
+    print(f"effect modules no longer loaded at startup: {len(effects)}")
+
+
+if __name__ == "__main__":
+    main()
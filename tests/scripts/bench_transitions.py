@@ -0,0 +1,108 @@
+"""
+Micro-benchmark for the effect transitions.
+
+Runs every transition in NAMED_FUNCTIONS from start to end on 1000
+pixel frames, comparing the precomputed, in place Transitions against the per frame
+masks, rolls and temporaries they used before.
+
+Run from the repository root:
+
+    python tests/scripts/bench_transitions.py
+"""
+
+import timeit
+
+import numpy as np
+
+from ledfx.transitions import Transitions
+
+REPEATS = 5
+NUMBER = 50
+PIXEL_COUNT = 1000
+WEIGHTS = np.linspace(0, 1, 64)
+
+
+class LegacyTransitions:
+    """The transitions as they were before the precomputed ranks"""
+
+    def __init__(self, transitions):
+        self.pixel_count = transitions.pixel_count
+        self.dissolve_array = transitions.dissolve_array
+        self.iris_array = transitions.iris_array
+
+    def add(self, x1, x2, weight):
+        np.multiply(x1, weight, x1)
+        x3 = np.multiply(x2, 1 - weight)
+        np.add(x1, x3, x1)
+
+    def dissolve(self, x1, x2, weight):
+        indexes = np.greater(self.dissolve_array, weight)
+        x1[indexes, :] = x2[indexes, :]
+
+    def push(self, x1, x2, weight):
+        idx = int((1 - weight) * self.pixel_count)
+        x2 = np.roll(x2, idx, axis=0)
+        x1[:idx, :] = x2[:idx, :]
+
+    def slide(self, x1, x2, weight):
+        idx = int((1 - weight) * self.pixel_count)
+        x1[:idx, :] = x2[:idx, :]
+
+    def iris(self, x1, x2, weight):
+        indexes = np.greater(self.iris_array, weight)
+        x1[indexes, :] = x2[indexes, :]
+
+    def throughWhite(self, x1, x2, weight):
+        if weight < 0.5:
+            np.clip(x2, weight * 2 * 255, None, out=x1)
+        else:
+            np.clip(x1, (1 - weight) * 2 * 255, None, out=x1)
+
+    def throughBlack(self, x1, x2, weight):
+        if weight < 0.5:
+            np.clip(x2, None, 255 * (1 - (weight * 2)), x1)
+        else:
+            np.clip(x1, None, 255 * 2 * (weight - 0.5), x1)
+
+
+def time_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEATS)) / NUMBER
+
+
+def sweep(function, new, old, frame):
+    """Blends a whole transition, one frame per weight"""
+    for weight in WEIGHTS:
+        np.copyto(frame, new)
+        function(frame, old, weight)
+
+
+def main():
+    transitions = Transitions(PIXEL_COUNT)
+    legacy = LegacyTransitions(transitions)
+    rng = np.random.default_rng(0)
+    new = rng.random((PIXEL_COUNT, 3)) * 255
+    old = rng.random((PIXEL_COUNT, 3)) * 255
+    frame = np.empty_like(new)
+
+    print(
+        f"{'transition':>14} {'legacy (us)':>12} {'engine (us)':>12} "
+        f"{'speedup':>8}"
+    )
+    for mode in Transitions:
+        if mode == "None":
+            continue
+        function = transitions[mode].__get__(transitions)
+        legacy_function = getattr(legacy, function.__name__)
+        before = time_call(lambda: sweep(legacy_function, new, old, frame))
+        after = time_call(lambda: sweep(function, new, old, frame))
+        # per frame, including restoring the new effect's frame
+        before /= len(WEIGHTS)
+        after /= len(WEIGHTS)
+        print(
+            f"{mode:>14} {before * 1e6:>12.1f} {after * 1e6:>12.1f} "
+            f"{before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
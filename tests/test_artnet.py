@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+from stupidArtnet import StupidArtnet
+
+from ledfx.devices.artnet import ArtNetDevice
+from ledfx.devices.utils.rgbw_conversion import OutputMode, rgb_to_output_mode
+
+DESTINATION = "192.0.2.10"
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, datagram, target):
+        self.sent.append((bytes(datagram), target))
+
+    def close(self):
+        pass
+
+
+def make_device(**config):
+    config = ArtNetDevice.schema()(
+        {"name": "Art-Net", "ip_address": DESTINATION, **config}
+    )
+    device = ArtNetDevice(None, config)
+    device._sock = FakeSocket()
+    device._target = (DESTINATION, config["port"])
+    return device
+
+
+def flush(device, data):
+    device._sock.sent.clear()
+    device.flush(data)
+    return device._sock.sent
+
+
+def reference_channels(device, data):
+    """The channels of the device, laid out the way the old flush did"""
+    data = rgb_to_output_mode(data, device.output_mode)
+    data = data.flatten()[: device.data_max * device.channels_per_pixel]
+    channels = np.zeros(device.channel_count, dtype=np.uint8)
+    reshaped_data = data.reshape(
+        (
+            device.num_devices,
+            device.pixels_per_device * device.channels_per_pixel,
+        )
+    )
+    full_device_data = np.concatenate(
+        (
+            np.tile(device.pre_amble, (device.num_devices, 1)),
+            reshaped_data,
+            np.tile(device.post_amble, (device.num_devices, 1)),
+        ),
+        axis=1,
+    )
+    channels[device.dmx_start_address :] = full_device_data.ravel()
+    return channels
+
+
+def reference_datagrams(device, data, sequence):
+    """The datagrams StupidArtnet builds for each universe of the frame"""
+    config = device._config
+    channels = reference_channels(device, data)
+    artnet = StupidArtnet(
+        target_ip=DESTINATION,
+        packet_size=device.packet_size,
+        even_packet_size=config["even_packet_size"],
+    )
+    # the full 15 bit Port-Address, as net, sub-net and universe
+    artnet.set_simplified(False)
+    datagrams = []
+    try:
+        for i in range(device.universe_count):
+            universe = config["universe"] + i
+            artnet.sequence = sequence
+            artnet.set_net(universe >> 8)
+            artnet.set_subnet((universe >> 4) & 0xF)
+            artnet.set_universe(universe & 0xF)
+            # odd sized universes are padded to the announced size
+            dmx = np.zeros(artnet.packet_size, dtype=np.uint8)
+            start = i * device.packet_size
+            universe_channels = channels[start : start + device.packet_size]
+            dmx[: universe_channels.size] = universe_channels
+            datagrams.append(
+                (
+                    bytes(artnet.packet_header) + dmx.tobytes(),
+                    (DESTINATION, config["port"]),
+                )
+            )
+    finally:
+        artnet.close()
+    return datagrams
+
+
+def random_frame(device, seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (device.pixel_count, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"pixel_count": 1},
+        {"pixel_count": 170},
+        # several universes, the last one partly used
+        {"pixel_count": 400, "universe": 3},
+        {"pixel_count": 50, "dmx_start_address": 100, "packet_size": 128},
+        # odd universe sizes, padded or not
+        {"pixel_count": 100, "packet_size": 171},
+        {"pixel_count": 100, "packet_size": 171, "even_packet_size": False},
+        {
+            "pixel_count": 60,
+            "pre_amble": "255, 0",
+            "post_amble": "7",
+            "pixels_per_device": 8,
+        },
+        {"pixel_count": 200, "output_mode": OutputMode.RGBW_NONE},
+        # universes above 255 need the net of the Port-Address
+        {"pixel_count": 400, "universe": 300},
+        {"pixel_count": 200, "universe": 32766},
+    ],
+    ids=str,
+)
+def test_datagrams_match_stupidartnet(config):
+    device = make_device(**config)
+    for sequence in range(1, 4):
+        data = random_frame(device, sequence)
+        assert flush(device, data) == reference_datagrams(
+            device, data, sequence
+        )
+
+
+def test_header():
+    device = make_device(pixel_count=200, universe=0x1234, packet_size=301)
+    header = flush(device, random_frame(device, 0))[1][0][:18]
+    assert header == (
+        b"Art-Net\x00"
+        + bytes([0x00, 0x50])  # OpCode ArtDmx, low byte first
+        + bytes([0x00, 14])  # protocol version 14, high byte first
+        + bytes([1, 0])  # sequence, physical port
+        + bytes([0x35, 0x12])  # SubUni, Net of Port-Address 0x1235
+        + bytes([0x01, 0x2E])  # 302 channels, high byte first
+    )
+
+
+def test_sequence_is_shared_and_wraps_from_255_to_1():
+    device = make_device(pixel_count=400)
+    data = random_frame(device, 0)
+    sequences = []
+    for _ in range(257):
+        datagrams = flush(device, data)
+        frame_sequences = {datagram[12] for datagram, _ in datagrams}
+        # every universe of a frame carries the same sequence
+        assert len(frame_sequences) == 1
+        sequences.append(frame_sequences.pop())
+    # zero is reserved for receivers to ignore the sequence
+    assert sequences == [*range(1, 256), 1, 2]
@@ -0,0 +1,376 @@
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ledfx.effects.audio import (
+    ANALYSIS_COST_SMOOTHING,
+    ANALYSIS_DEMAND_TIMEOUT,
+    AudioAnalysisSource,
+    AudioCallbackWorker,
+    audio_analysis,
+    resolve_analyses,
+)
+
+SAMPLE_RATE = 10
+# blocks after which an analysis read outside a callback stops being run
+TIMEOUT_BLOCKS = int(SAMPLE_RATE * ANALYSIS_DEMAND_TIMEOUT)
+
+
+class FakeAnalysisSource(AudioAnalysisSource):
+    """Two analyses of its own on top of the real ones, which never run"""
+
+    @audio_analysis()
+    def base(self):
+        time.sleep(self.base_delay)
+        self.runs.append("base")
+        return 1
+
+    @audio_analysis("base")
+    def derived(self):
+        value = self.base() + 1
+        self.runs.append("derived")
+        return value
+
+
+def make_source():
+    """An analysis source without an audio stream, melbanks or aubio"""
+    source = FakeAnalysisSource.__new__(FakeAnalysisSource)
+    source._analyses = resolve_analyses(FakeAnalysisSource)
+    source._analysis_results = {}
+    source._analysis_demand = {}
+    source._analysis_consumers = {name: set() for name, _ in source._analyses}
+    source._consumers_lock = threading.Lock()
+    source._analysis_costs = {}
+    source._analysis_nested_time = 0.0
+    source._live_analyses = ()
+    source._analysis_thread = None
+    source._block_index = 0
+    source._analysis_lock = threading.RLock()
+    source._callbacks = []
+    source._callback_worker = None
+    source._config = {"sample_rate": SAMPLE_RATE}
+    source.melbanks = lambda: None
+    source.runs = []
+    source.base_delay = 0
+    return source
+
+
+def process_blocks(source, count=1):
+    """Runs the audio thread's analysis work for count blocks"""
+
+    def run():
+        for _ in range(count):
+            with source._analysis_lock:
+                source._invalidate_caches()
+                source._run_analyses()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 1
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_analyses_only_run_once_read():
+    source = make_source()
+    process_blocks(source)
+    assert source.runs == []
+    assert source._live_analyses == ()
+
+    # a read outside the audio thread computes it, and its dependency
+    assert source.derived() == 2
+    assert source.runs == ["base", "derived"]
+    # cached for the rest of the block
+    assert source.derived() == 2
+    assert source.runs == ["base", "derived"]
+
+    source.runs.clear()
+    process_blocks(source)
+    assert source.runs == ["base", "derived"]
+    assert set(source._live_analyses) == {"base", "derived"}
+
+
+def test_reads_outside_callbacks_time_out():
+    source = make_source()
+    process_blocks(source)
+    source.base()
+    process_blocks(source, TIMEOUT_BLOCKS)
+    assert "base" in source._live_analyses
+    process_blocks(source)
+    assert source._live_analyses == ()
+
+
+def test_callback_reads_hold_a_reference_until_unsubscribed():
+    source = make_source()
+    read = threading.Event()
+
+    def callback():
+        source.derived()
+        read.set()
+
+    source._callbacks.append(callback)
+    source._invoke_callbacks()
+    assert read.wait(1)
+    assert source._analysis_consumers["derived"] == {callback}
+    assert source._analysis_demand == {}
+
+    # no timeout while the callback is subscribed
+    process_blocks(source, TIMEOUT_BLOCKS * 2)
+    assert set(source._live_analyses) == {"base", "derived"}
+
+    source.unsubscribe(callback)
+    assert source._analysis_consumers["derived"] == set()
+    process_blocks(source)
+    assert source._live_analyses == ()
+    source._callback_worker.stop()
+
+
+def test_demand_can_grow_while_blocks_are_processed():
+    source = make_source()
+    stop = threading.Event()
+    errors = []
+
+    def read_new_analyses():
+        while not stop.is_set():
+            # the first read of an analysis adds it to the demand, clear
+            # them out again to keep the dict changing size
+            for name in range(1000):
+                source._record_demand(f"analysis-{name}")
+            source._analysis_demand.clear()
+
+    def process_blocks():
+        for _ in range(2000):
+            try:
+                with source._analysis_lock:
+                    source._run_analyses()
+            except RuntimeError as e:
+                errors.append(e)
+
+    # switch threads often so reads land in the middle of a block
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    reader = threading.Thread(target=read_new_analyses)
+    audio = threading.Thread(target=process_blocks)
+    try:
+        reader.start()
+        audio.start()
+        audio.join()
+    finally:
+        stop.set()
+        reader.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+class Cyclic:
+    ALWAYS_ANALYSED = ("melbanks",)
+
+    @audio_analysis("second")
+    def first(self):
+        pass
+
+    @audio_analysis("first")
+    def second(self):
+        pass
+
+
+class UnknownDependency:
+    ALWAYS_ANALYSED = ("melbanks",)
+
+    @audio_analysis("melbanks", "missing")
+    def first(self):
+        pass
+
+
+class Chain:
+    ALWAYS_ANALYSED = ("melbanks",)
+
+    @audio_analysis("middle")
+    def top(self):
+        pass
+
+    @audio_analysis("melbanks")
+    def bottom(self):
+        pass
+
+    @audio_analysis("bottom")
+    def middle(self):
+        pass
+
+    @audio_analysis()
+    def alone(self):
+        pass
+
+
+def test_analyses_resolve_in_dependency_order():
+    assert resolve_analyses(Chain) == [
+        ("alone", frozenset({"alone"})),
+        ("bottom", frozenset({"bottom", "middle", "top"})),
+        ("middle", frozenset({"middle", "top"})),
+        ("top", frozenset({"top"})),
+    ]
+    order = [name for name, _ in resolve_analyses(FakeAnalysisSource)]
+    assert order.index("base") < order.index("derived")
+
+
+def test_circular_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="Circular"):
+        resolve_analyses(Cyclic)
+
+
+def test_unknown_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="unknown missing"):
+        resolve_analyses(UnknownDependency)
+
+
+def consumers(source, name):
+    return source.get_analysis_stats()["analyses"][name]["consumers"]
+
+
+def test_references_are_counted_per_callback():
+    source = make_source()
+    reads = []
+
+    def first():
+        source.derived()
+        reads.append(first)
+
+    def second():
+        source.base()
+        reads.append(second)
+
+    source._callbacks.extend([first, second])
+    source._invoke_callbacks()
+    wait_until(lambda: len(reads) == 2)
+    # base counts the callbacks reading it through derived too
+    assert consumers(source, "base") == 2
+    assert consumers(source, "derived") == 1
+
+    source.unsubscribe(second)
+    process_blocks(source, TIMEOUT_BLOCKS + 1)
+    assert consumers(source, "base") == 1
+    assert set(source._live_analyses) == {"base", "derived"}
+
+    # subscribing again takes the reference back
+    source._callbacks.append(second)
+    reads.clear()
+    source._invoke_callbacks()
+    wait_until(lambda: len(reads) == 2)
+    assert consumers(source, "base") == 2
+
+    source.unsubscribe(first)
+    source.unsubscribe(second)
+    process_blocks(source)
+    assert consumers(source, "base") == 0
+    assert source._live_analyses == ()
+    source._callback_worker.stop()
+
+
+def test_costs_exclude_dependencies():
+    source = make_source()
+    source.base_delay = 0.02
+    process_blocks(source)
+    # read lazily, so base is computed from inside derived
+    source.derived()
+    costs = source._analysis_costs
+    assert costs["base"] >= 0.02
+    assert costs["derived"] < 0.01
+
+    stats = source.get_analysis_stats()["analyses"]
+    assert stats["base"]["cost_us"] == round(costs["base"] * 1e6, 1)
+    assert stats["derived"]["depends_on"] == ["base"]
+    assert stats["pitch"]["cost_us"] == 0
+
+
+def test_costs_are_moving_averages():
+    source = make_source()
+    source._record_cost("base", 1.0)
+    source._record_cost("base", 2.0)
+    assert source._analysis_costs["base"] == pytest.approx(
+        1.0 + ANALYSIS_COST_SMOOTHING
+    )
+
+
+@pytest.fixture
+def worker():
+    source = SimpleNamespace(_callbacks=[])
+    worker = AudioCallbackWorker(source)
+    yield worker, source._callbacks
+    worker.stop()
+
+
+def test_worker_runs_every_callback(worker):
+    worker, callbacks = worker
+    calls = []
+    callbacks.append(lambda: calls.append("first"))
+    callbacks.append(lambda: calls.append("second"))
+    worker.notify()
+    wait_until(lambda: len(calls) == 2)
+    assert calls == ["first", "second"]
+    assert worker.current is None
+
+
+def test_worker_coalesces_blocks_while_busy(worker):
+    worker, callbacks = worker
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def slow_callback():
+        calls.append(worker.current)
+        started.set()
+        release.wait(1)
+
+    callbacks.append(slow_callback)
+    worker.notify()
+    assert started.wait(1)
+    # one block waits for the callbacks, the rest are dropped
+    for _ in range(4):
+        worker.notify()
+    assert worker.skipped_blocks == 3
+
+    release.set()
+    wait_until(lambda: len(calls) == 2 and worker.current is None)
+    time.sleep(0.05)
+    assert calls == [slow_callback, slow_callback]
+
+
+def test_worker_carries_on_after_a_callback_raises(worker, caplog):
+    worker, callbacks = worker
+    calls = []
+
+    def failing_callback():
+        calls.append("failing")
+        raise ValueError("bad block")
+
+    callbacks.append(failing_callback)
+    callbacks.append(lambda: calls.append("next"))
+    worker.notify()
+    wait_until(lambda: len(calls) == 2)
+    assert calls == ["failing", "next"]
+    assert "bad block" in caplog.text
+
+    worker.notify()
+    wait_until(lambda: len(calls) == 4)
+
+
+def test_worker_stops():
+    source = SimpleNamespace(_callbacks=[])
+    worker = AudioCallbackWorker(source)
+    calls = []
+    source._callbacks.append(lambda: calls.append(1))
+    worker.stop()
+    worker._thread.join(1)
+    assert not worker._thread.is_alive()
+    # blocks arriving after stop are ignored
+    worker.notify()
+    time.sleep(0.02)
+    assert calls == []
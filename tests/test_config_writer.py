@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from ledfx import config as config_module
+from ledfx.api.config import ConfigEndpoint
+from ledfx.config import ConfigWriter, save_config
+
+
+@pytest.fixture(autouse=True)
+def logger():
+    config_module.load_logger()
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Counts the config file writes"""
+    writes = []
+    write_config = config_module.write_config
+
+    def counting_write_config(config, config_dir):
+        writes.append(dict(config))
+        write_config(config, config_dir)
+
+    monkeypatch.setattr(config_module, "write_config", counting_write_config)
+    return writes
+
+
+def read_config(config_dir):
+    with open(os.path.join(config_dir, "config.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_writer(tmp_path, loop, **kwargs):
+    writer = ConfigWriter(str(tmp_path), loop, **kwargs)
+    writer.start()
+    return writer
+
+
+def test_saves_are_coalesced(tmp_path, loop, writes):
+    writer = make_writer(tmp_path, loop, delay=0.05)
+    config = {"global_brightness": 0.0, "ledfx_presets": {}}
+
+    async def drag_slider():
+        for step in range(20):
+            config["global_brightness"] = step / 20
+            save_config(config, str(tmp_path))
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.2)
+
+    loop.run_until_complete(drag_slider())
+    writer.close()
+
+    assert len(writes) == 1
+    saved = read_config(str(tmp_path))
+    assert saved["global_brightness"] == 0.95
+    assert "ledfx_presets" not in saved
+    stats = writer.get_stats()
+    assert (stats["requests"], stats["writes"]) == (20, 1)
+    assert not stats["pending"]
+
+
+def test_max_delay_bounds_continuous_changes(tmp_path, loop, writes):
+    writer = make_writer(tmp_path, loop, delay=0.05, max_delay=0.1)
+    config = {"global_brightness": 0.0}
+
+    async def keep_changing():
+        for step in range(30):
+            config["global_brightness"] = step / 30
+            save_config(config, str(tmp_path))
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+
+    loop.run_until_complete(keep_changing())
+    writer.close()
+
+    assert 2 <= len(writes) < 30
+    assert read_config(str(tmp_path))["global_brightness"] == 29 / 30
+
+
+def test_closed_writer_saves_synchronously(tmp_path, loop, writes):
+    writer = make_writer(tmp_path, loop, delay=10)
+    save_config({"global_brightness": 0.5}, str(tmp_path))
+    assert writes == []
+    assert writer.get_stats()["pending"]
+
+    writer.close()
+    save_config({"global_brightness": 0.5}, str(tmp_path))
+    assert len(writes) == 1
+    assert read_config(str(tmp_path))["global_brightness"] == 0.5
+
+
+def test_write_leaves_no_temporary_files(tmp_path):
+    save_config({"global_brightness": 0.5}, str(tmp_path))
+    save_config({"global_brightness": 0.7}, str(tmp_path))
+    assert os.listdir(tmp_path) == ["config.json"]
+    assert read_config(str(tmp_path))["global_brightness"] == 0.7
+
+
+def test_backups_include_saves_not_written_yet(tmp_path, loop, writes):
+    writer = make_writer(tmp_path, loop, delay=10)
+    save_config({"global_brightness": 0.5}, str(tmp_path))
+    writer.flush()
+    save_config({"global_brightness": 0.7}, str(tmp_path))
+    ledfx = SimpleNamespace(
+        config_dir=str(tmp_path),
+        config_writer=writer,
+        stop=lambda exit_code: None,
+        loop=SimpleNamespace(call_soon_threadsafe=lambda *args: None),
+    )
+    endpoint = ConfigEndpoint.__new__(ConfigEndpoint)
+    endpoint._ledfx = ledfx
+
+    async def reset_config():
+        await endpoint.delete()
+        writer.close()
+
+    loop.run_until_complete(reset_config())
+    (backup,) = [
+        name for name in os.listdir(tmp_path) if name.startswith("config_")
+    ]
+    with open(os.path.join(tmp_path, backup), encoding="utf-8") as f:
+        assert json.load(f)["global_brightness"] == 0.7
+
+
+def test_failed_writes_are_retried(tmp_path, loop, writes, monkeypatch):
+    writer = make_writer(tmp_path, loop, delay=0.05)
+    write_config = config_module.write_config
+    failures = [OSError("disk full")]
+
+    def failing_write_config(config, config_dir):
+        if failures:
+            raise failures.pop()
+        write_config(config, config_dir)
+
+    monkeypatch.setattr(config_module, "write_config", failing_write_config)
+    save_config({"global_brightness": 0.5}, str(tmp_path))
+
+    async def wait_for_write():
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if writer.get_stats()["writes"]:
+                break
+
+    loop.run_until_complete(wait_for_write())
+    writer.close()
+
+    stats = writer.get_stats()
+    assert (stats["failures"], stats["writes"]) == (1, 1)
+    assert not stats["pending"]
+    assert read_config(str(tmp_path))["global_brightness"] == 0.5
@@ -64,6 +64,34 @@ proof_of_life_tests = {
         expected_return_code=200,
         expected_response_keys=["status", "scenes"],
     ),
+    "scheduler_endpoint": APITestCase(
+        execution_order=10,
+        method="GET",
+        api_endpoint="/api/scheduler",
+        expected_return_code=200,
+        expected_response_keys=["groups", "virtuals"],
+    ),
+    "perf_endpoint": APITestCase(
+        execution_order=11,
+        method="GET",
+        api_endpoint="/api/perf",
+        expected_return_code=200,
+        expected_response_keys=["virtuals", "devices", "config_writes"],
+    ),
+    "audio_analysis_endpoint": APITestCase(
+        execution_order=12,
+        method="GET",
+        api_endpoint="/api/audio/analysis",
+        expected_return_code=200,
+        expected_response_keys=["active", "analyses"],
+    ),
+    "governor_endpoint": APITestCase(
+        execution_order=13,
+        method="GET",
+        api_endpoint="/api/governor",
+        expected_return_code=200,
+        expected_response_keys=["enabled", "load", "capped", "decisions"],
+    ),
     # If we have a dirty config, clean up the test jig before we start
     "cleanup_test_device": APITestCase(
         execution_order=3,
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from ledfx.devices import delta as delta_module
+from ledfx.devices.ddp import DDPDevice
+from ledfx.devices.delta import ChunkDelta
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(delta_module.time, "monotonic", clock)
+    return clock
+
+
+def make_frame(length=25, value=0):
+    return np.full(length, value, dtype=np.uint8)
+
+
+def test_first_frame_is_sent_in_full(clock):
+    delta = ChunkDelta(10, 1)
+    assert delta.changed(make_frame()).tolist() == [True, True, True]
+    assert delta.bytes_sent == 25
+    assert delta.bytes_saved == 0
+
+
+def test_only_changed_chunks_are_sent(clock):
+    delta = ChunkDelta(10, 1)
+    frame = make_frame()
+    delta.changed(frame)
+
+    assert delta.changed(frame).tolist() == [False, False, False]
+    frame[12] = 1
+    frame[24] = 1
+    assert delta.changed(frame).tolist() == [False, True, True]
+    assert delta.chunks_sent == 5
+    assert delta.chunks_skipped == 4
+    # the short last chunk only counts its own bytes
+    assert delta.bytes_sent == 25 + 15
+    assert delta.bytes_saved == 25 + 10
+
+
+def test_push_last_sends_last_chunk_with_any_change(clock):
+    delta = ChunkDelta(10, 1, push_last=True)
+    frame = make_frame()
+    delta.changed(frame)
+
+    assert not delta.changed(frame).any()
+    frame[0] = 1
+    assert delta.changed(frame).tolist() == [True, False, True]
+
+
+def test_full_frame_every_refresh_interval(clock):
+    delta = ChunkDelta(10, 1)
+    frame = make_frame()
+    delta.changed(frame)
+
+    clock.now += 0.5
+    assert not delta.changed(frame).any()
+    clock.now += 0.5
+    assert delta.changed(frame).all()
+    clock.now += 0.5
+    assert not delta.changed(frame).any()
+
+
+def test_resized_or_reset_frames_are_sent_in_full(clock):
+    delta = ChunkDelta(10, 1)
+    delta.changed(make_frame())
+    assert delta.changed(make_frame(30)).tolist() == [True, True, True]
+    delta.reset()
+    assert delta.changed(make_frame(30)).all()
+
+
+class FakeSocket:
+    def __init__(self):
+        self.packets = []
+
+    def sendto(self, data, address):
+        self.packets.append(data)
+
+
+def send_ddp(sock, frame, delta):
+    DDPDevice.send_out(sock, "127.0.0.1", 4048, frame, 1, delta)
+
+
+def test_ddp_sends_changed_packets(clock):
+    pixels = DDPDevice.MAX_PIXELS * 3
+    delta = ChunkDelta(DDPDevice.MAX_DATALEN, 1, push_last=True)
+    frame = np.zeros((pixels, 3))
+    sock = FakeSocket()
+    send_ddp(sock, frame, delta)
+    assert len(sock.packets) == 3
+
+    sock.packets.clear()
+    send_ddp(sock, frame, delta)
+    assert sock.packets == []
+
+    frame[0] = 255
+    send_ddp(sock, frame, delta)
+    offsets = [int.from_bytes(packet[4:8], "big") for packet in sock.packets]
+    assert offsets == [0, 2 * DDPDevice.MAX_DATALEN]
+    # the receiver only shows the frame once the packet with PUSH arrives
+    assert sock.packets[-1][0] & DDPDevice.PUSH
+    assert not sock.packets[0][0] & DDPDevice.PUSH
@@ -0,0 +1,199 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ledfx.devices.dummy import DummyDevice
+from ledfx.devices.output import DeviceOutput
+from ledfx.devices.wled import WLEDDevice
+from ledfx.perf import DeviceTimings
+from ledfx.utils import BaseRegistry
+
+
+class FakeDevice(SimpleNamespace):
+    def __init__(self):
+        super().__init__(id="fake", name="Fake", perf=DeviceTimings())
+        self.frames = []
+        self.sent = threading.Event()
+        # cleared to hold the sender inside flush
+        self.release = threading.Event()
+        self.release.set()
+
+    def flush(self, data):
+        self.release.wait(1)
+        self.frames.append(data.copy())
+        self.sent.set()
+
+
+@pytest.fixture
+def device():
+    device = FakeDevice()
+    device.output = DeviceOutput(device)
+    yield device
+    device.release.set()
+    device.output.stop()
+
+
+def make_frame(value):
+    return np.full((4, 3), float(value))
+
+
+def wait_for_send(device):
+    assert device.sent.wait(1)
+    device.sent.clear()
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 1
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_frames_are_sent(device):
+    frame = make_frame(1)
+    device.output.submit(frame)
+    wait_for_send(device)
+    # the mailbox holds a copy, the caller may reuse its frame
+    frame[:] = 0
+    np.testing.assert_array_equal(device.frames[0], make_frame(1))
+    assert device.perf.sent == 1
+    assert device.perf.dropped == 0
+    assert device.perf.to_dict()["queue"]["count"] == 1
+
+
+def test_stale_frames_are_dropped(device):
+    device.release.clear()
+    device.output.submit(make_frame(1))
+    # wait until the sender is stuck on the first frame
+    wait_until(lambda: device.output._pending is None)
+    for value in range(2, 6):
+        device.output.submit(make_frame(value))
+    device.release.set()
+    wait_until(lambda: device.perf.sent == 2)
+
+    assert [frame[0, 0] for frame in device.frames] == [1, 5]
+    assert device.perf.sent == 2
+    assert device.perf.dropped == 3
+    assert device.perf.to_dict()["output"] == {"sent": 2, "dropped": 3}
+
+
+def test_failed_sends_do_not_stop_the_sender(device):
+    flush = device.flush
+    failed = threading.Event()
+
+    def failing_flush(data):
+        device.flush = flush
+        failed.set()
+        raise OSError("unreachable")
+
+    device.flush = failing_flush
+    device.output.submit(make_frame(1))
+    assert failed.wait(1)
+    device.output.submit(make_frame(2))
+    wait_for_send(device)
+    assert device.perf.sent == 1
+    assert device.frames[0][0, 0] == 2
+
+
+def test_stop_ends_the_sender(device):
+    device.output.stop()
+    assert not device.output._thread.is_alive()
+
+
+def test_stop_from_the_sender_does_not_wait_for_itself():
+    device = FakeDevice()
+
+    def flush(data):
+        device.output.stop()
+        device.sent.set()
+
+    device.flush = flush
+    device.output = DeviceOutput(device)
+    device.output.submit(make_frame(1))
+    wait_for_send(device)
+    device.output._thread.join(1)
+    assert not device.output._thread.is_alive()
+
+
+@BaseRegistry.no_registration
+class OfflineDevice(DummyDevice):
+    """Takes itself offline from within flush after a few frames"""
+
+    def flush(self, data):
+        self.flushed += 1
+        if self.flushed == 3:
+            self.set_offline()
+
+
+def test_device_going_offline_during_flush_while_frames_arrive():
+    ledfx = SimpleNamespace(
+        config={},
+        events=SimpleNamespace(fire_event=lambda event: None),
+        visualisation=SimpleNamespace(publish=lambda *args: None),
+    )
+    device = OfflineDevice(
+        ledfx, OfflineDevice.schema()({"name": "offline", "pixel_count": 8})
+    )
+    device.flushed = 0
+    device.priority_virtual = SimpleNamespace(id="virtual")
+    device.activate()
+
+    errors = []
+
+    def render():
+        frame = np.full((8, 3), 255, dtype=np.uint8)
+        deadline = time.monotonic() + 1
+        try:
+            while device.is_active() and time.monotonic() < deadline:
+                device.update_pixels("virtual", [(frame, 0, 7)])
+            # frames arriving after the device went offline are ignored
+            for _ in range(100):
+                device.update_pixels("virtual", [(frame, 0, 7)])
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=render)
+    thread.start()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert errors == []
+    assert not device.is_active()
+    assert not device.is_online()
+    assert device.flushed == 3
+
+
+def output_threads():
+    return [
+        thread
+        for thread in threading.enumerate()
+        if thread.name.startswith("Device Output")
+    ]
+
+
+@pytest.mark.parametrize("sync_mode", ["DDP", "UDP", "E131"])
+def test_wled_device_runs_one_output_thread(sync_mode):
+    ledfx = SimpleNamespace(
+        config={},
+        events=SimpleNamespace(fire_event=lambda event: None),
+    )
+    config = WLEDDevice.schema()(
+        {
+            "name": "wled",
+            "ip_address": "127.0.0.1",
+            "pixel_count": 8,
+            "sync_mode": sync_mode,
+        }
+    )
+    device = WLEDDevice(ledfx, config)
+    device._destination = "127.0.0.1"
+    threads = len(output_threads())
+    device.activate()
+    try:
+        assert len(output_threads()) == threads + 1
+        assert device.subdevice._output is None
+    finally:
+        device.deactivate()
+    assert len(output_threads()) == threads
@@ -0,0 +1,185 @@
+import numpy as np
+import pytest
+from sacn.messages.data_packet import DataPacket, calculate_multicast_addr
+from sacn.messages.sync_packet import SyncPacket
+from sacn.sending.sender_socket_base import DEFAULT_PORT
+
+from ledfx.devices.e131 import SYNC_UNIVERSE, E131Device
+
+DESTINATION = "192.0.2.10"
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, packet, destination):
+        self.sent.append((bytes(packet), destination))
+
+    def close(self):
+        pass
+
+
+def make_device(**config):
+    config = E131Device.schema()(
+        {"name": "sACN", "ip_address": DESTINATION, **config}
+    )
+    device = E131Device(None, config)
+    device._destination = DESTINATION
+    device._build_packets()
+    device._sock = FakeSocket()
+    return device
+
+
+def flush(device, data):
+    """Flushes a frame, returning the data and sync packets sent"""
+    device._sock.sent.clear()
+    device.flush(data)
+    return [
+        (packet, destination)
+        for packet, destination in device._sock.sent
+        if destination[0] != "<broadcast>"
+    ]
+
+
+def reference_dmx(config, data, previous):
+    """
+    The DMX data of every universe, split up the way the sacn library
+    based flush did it.
+    """
+    data = data.flatten()
+    dmx = {}
+    current_index = 0
+    for universe in range(config["universe"], config["universe_end"] + 1):
+        universe_start = (universe - config["universe"]) * config[
+            "universe_size"
+        ]
+        universe_end = (universe - config["universe"] + 1) * config[
+            "universe_size"
+        ]
+        dmx_start = (
+            max(universe_start, config["channel_offset"])
+            % config["universe_size"]
+        )
+        dmx_end = (
+            min(
+                universe_end,
+                config["channel_offset"] + config["channel_count"],
+            )
+            % config["universe_size"]
+        )
+        if dmx_end == 0:
+            dmx_end = config["universe_size"]
+
+        input_start = current_index
+        input_end = current_index + dmx_end - dmx_start
+        current_index = input_end
+
+        dmx_data = list(previous.get(universe, [0] * 512))
+        dmx_data[dmx_start:dmx_end] = data[input_start:input_end].tolist()
+        dmx[universe] = dmx_data
+    return dmx
+
+
+def reference_packets(device, dmx, sequence, multicast=False):
+    """The packets the sacn library builds for the frame"""
+    config = device._config
+    # the CID is random per activation
+    cid = tuple(device._packets[0, 22:38].tolist())
+    packets = []
+    for universe, dmx_data in dmx.items():
+        packet = DataPacket(
+            cid=cid,
+            sourceName=device.name,
+            universe=universe,
+            dmxData=tuple(dmx_data),
+            priority=config["packet_priority"],
+            sequence=sequence,
+            sync_universe=SYNC_UNIVERSE,
+        )
+        if multicast:
+            destination = calculate_multicast_addr(universe)
+        else:
+            destination = DESTINATION
+        packets.append((bytes(packet.getBytes()), (destination, DEFAULT_PORT)))
+    sync = SyncPacket(cid=cid, syncAddr=SYNC_UNIVERSE, sequence=sequence)
+    packets.append(
+        (
+            bytes(sync.getBytes()),
+            (calculate_multicast_addr(SYNC_UNIVERSE), DEFAULT_PORT),
+        )
+    )
+    return packets
+
+
+def random_frame(device, seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(
+        0, 256, (device._config["pixel_count"], 3), dtype=np.uint8
+    )
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"pixel_count": 1},
+        {"pixel_count": 170},
+        # several universes, the last one partly used
+        {"pixel_count": 400, "universe": 3},
+        {"pixel_count": 340, "universe_size": 510},
+        # a start channel offset pushing pixels into the next universe
+        {"pixel_count": 200, "channel_offset": 100},
+        {"pixel_count": 100, "universe_size": 100, "packet_priority": 150},
+        {"pixel_count": 128, "universe_size": 512},
+    ],
+    ids=str,
+)
+def test_packets_match_sacn(config):
+    device = make_device(**config)
+    dmx = {}
+    for sequence in range(3):
+        data = random_frame(device, sequence)
+        dmx = reference_dmx(device._config, data, dmx)
+        assert flush(device, data) == reference_packets(device, dmx, sequence)
+
+
+def test_multicast_packets_match_sacn():
+    device = make_device(ip_address="multicast", pixel_count=400)
+    data = random_frame(device, 0)
+    dmx = reference_dmx(device._config, data, {})
+    assert flush(device, data) == reference_packets(
+        device, dmx, 0, multicast=True
+    )
+
+
+def test_sequence_wraps_around():
+    device = make_device(pixel_count=400)
+    device._sequence = 254
+    dmx = {}
+    for sequence in (254, 255, 0, 1):
+        data = random_frame(device, sequence)
+        dmx = reference_dmx(device._config, data, dmx)
+        assert flush(device, data) == reference_packets(device, dmx, sequence)
+
+
+def test_universe_discovery_is_broadcast_once():
+    device = make_device(pixel_count=400)
+    data = random_frame(device, 0)
+    device.flush(data)
+    broadcasts = [
+        packet
+        for packet, destination in device._sock.sent
+        if destination == ("<broadcast>", DEFAULT_PORT)
+    ]
+    assert broadcasts == device._discovery_packets
+    device._sock.sent.clear()
+    device.flush(data)
+    assert all(
+        destination[0] != "<broadcast>" for _, destination in device._sock.sent
+    )
+
+
+def test_frames_of_the_wrong_size_are_rejected():
+    device = make_device(pixel_count=10)
+    with pytest.raises(Exception, match="Invalid buffer size"):
+        device.flush(np.zeros((9, 3), dtype=np.uint8))
@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+
+from ledfx.effects import fire as fire_module
+from ledfx.effects import smooth
+from ledfx.effects.fire import Fire
+from ledfx.effects.rain import RainAudioEffect
+from ledfx.effects.water import Water
+
+PIXEL_COUNTS = [1, 5, 6, 37, 300]
+FRAMES = 200
+
+
+class LegacyWater(Water):
+    """Water with the per pixel ripple loop it had before"""
+
+    def _do_ripple(self, buf, buf_idx, damp_factor):
+        src = 1 if buf_idx == 0 else 0
+        dest = 0 if buf_idx == 0 else 1
+        for pixel in range(1, self.pixel_count - 1):
+            buf[dest][pixel] = (
+                (
+                    buf[src][pixel - 1]
+                    + buf[src][pixel + 1]
+                    + buf[src][pixel] * 2
+                )
+                / 2
+            ) - buf[dest][pixel]
+        buf[dest] = smooth(buf[dest], 1.0)
+        buf[dest] -= buf[dest] / damp_factor
+
+
+class LegacyFire(Fire):
+    """Fire with the per pixel diffusion and per spark loops it had before"""
+
+    def render_hsv(self):
+        current_time = fire_module.time.time()
+        delta = (current_time - self.delta_last) * 1000 * self.speed
+        self.delta_last = current_time
+
+        pixels = self.spark_pixels
+        np.multiply(pixels, self.cooling, out=pixels)
+        for k in range(self.pixel_count - 1, 4, -1):
+            h1 = pixels[k - 1]
+            h2 = pixels[k - 2]
+            h3 = pixels[k - 3]
+            h4 = pixels[k - 4]
+            pixels[k] = (h1 + h2 + h3 * 2 + h4 * 3) / 7
+
+        for i in range(self.spark_count):
+            if self.sparks[i] <= 0:
+                self.sparks[i] = np.random.random(1)[0]
+            self.sparks[i] += self.accel * delta
+            ox = self.sparkX[i]
+            self.sparkX[i] += self.sparks[i] * self.sparks[i] * delta
+            if self.sparkX[i] > self.pixel_count:
+                self.sparkX[i] = 0
+                self.sparks[i] = 0
+                continue
+            j = int(ox)
+            while j < self.sparkX[i]:
+                pixels[j] += np.clip(1 - self.sparks[i] * 0.4, 0, 1) * 0.5
+                j += 1
+
+
+class LegacyRain(RainAudioEffect):
+    """Rain with the per drop overlay loop it had before"""
+
+    def render(self):
+        overlaid_frames = np.zeros((3, self.pixel_count + self.frame_width))
+        for index in np.flatnonzero(self.drop_frames):
+            if self.drop_frames[index] >= len(self.drop_animation):
+                continue
+            colored_frame = [
+                self.drop_animation[self.drop_frames[index]]
+                * self.drop_colors[color, index]
+                for color in range(3)
+            ]
+            overlaid_frames[
+                :, index : index + self.frame_width
+            ] += colored_frame
+        self.pixels = overlaid_frames[
+            :,
+            self.frame_side_lengths : self.frame_side_lengths
+            + self.pixel_count,
+        ].T
+        self.pixels += self.pulse_pixels
+        self.pulse_pixels = (self.pulse_pixels * 9) // 10
+
+
+def activate(cls, pixel_count, **config):
+    effect = cls(None, cls.schema()(config))
+    effect.pixels = np.zeros((pixel_count, 3))
+    for base in reversed(type(effect).__mro__):
+        if "on_activate" in vars(base):
+            base.on_activate(effect, pixel_count)
+    return effect
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("pixel_count", PIXEL_COUNTS)
+def test_water_matches_legacy(pixel_count):
+    rng = np.random.default_rng(0)
+    water = activate(Water, pixel_count, speed=2)
+    legacy = activate(LegacyWater, pixel_count, speed=2)
+    for _ in range(FRAMES):
+        if pixel_count >= 3 and rng.random() < 0.3:
+            drop = (int(rng.integers(1, pixel_count - 1)), rng.random() * 8)
+            water.drops_queue.put(drop)
+            legacy.drops_queue.put(drop)
+        water.render_hsv()
+        legacy.render_hsv()
+        np.testing.assert_array_equal(water._buffer, legacy._buffer)
+        np.testing.assert_array_equal(water.hsv_array, legacy.hsv_array)
+
+
+@pytest.mark.parametrize("pixel_count", PIXEL_COUNTS)
+def test_fire_matches_legacy(pixel_count, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fire_module.time, "time", clock)
+    fire = activate(Fire, pixel_count, intensity=30)
+    legacy = activate(LegacyFire, pixel_count, intensity=30)
+    rng = np.random.default_rng(1)
+    for frame in range(FRAMES):
+        clock.now += rng.uniform(0.005, 0.05)
+        state = np.random.get_state()
+        fire.render_hsv()
+        np.random.set_state(state)
+        legacy.render_hsv()
+        np.testing.assert_array_equal(fire.sparks, legacy.sparks)
+        np.testing.assert_array_equal(fire.sparkX, legacy.sparkX)
+        # the trails are summed in a different order
+        np.testing.assert_allclose(
+            fire.spark_pixels, legacy.spark_pixels, rtol=1e-9, atol=1e-12
+        )
+
+
+@pytest.mark.parametrize("pixel_count", PIXEL_COUNTS)
+@pytest.mark.parametrize("pulse_strip", ["Off", "Lows"])
+def test_rain_matches_legacy(pixel_count, pulse_strip):
+    rng = np.random.default_rng(2)
+    rain = activate(RainAudioEffect, pixel_count, pulse_strip=pulse_strip)
+    legacy = activate(LegacyRain, pixel_count, pulse_strip=pulse_strip)
+    for frame in range(FRAMES):
+        for effect in (rain, legacy):
+            effect.update_drop_frames()
+        for _ in range(rng.integers(0, 4)):
+            location = int(rng.integers(0, pixel_count))
+            color = rng.integers(0, 256, 3)
+            for effect in (rain, legacy):
+                effect.new_drop(location, color)
+        if pulse_strip != "Off" and frame % 20 == 0:
+            for effect in (rain, legacy):
+                effect.strip_pulse((255, 0, 0))
+        rain.render()
+        legacy.render()
+        np.testing.assert_array_equal(rain.pixels, legacy.pixels)
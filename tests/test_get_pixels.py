@@ -0,0 +1,103 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from ledfx.effects import _gaussian_kernel1d
+from ledfx.effects.rainbow import RainbowEffect
+
+PIXEL_COUNTS = [1, 4, 37, 300]
+OPTIONS = {
+    "flip": {"flip": True},
+    "mirror": {"mirror": True},
+    "background": {"background_color": "#102030"},
+    "brightness": {"brightness": 0.5},
+    "blur": {"blur": 2.0},
+}
+# every combination of the post-processing options
+CONFIGS = [
+    names
+    for count in range(len(OPTIONS) + 1)
+    for names in itertools.combinations(OPTIONS, count)
+]
+
+
+def legacy_get_pixels(effect):
+    """get_pixels as it was before the output buffers"""
+    pixels = np.copy(effect.pixels)
+    config = effect._config
+    if effect.flip:
+        pixels = np.flipud(pixels)
+    if effect.mirror:
+        mirrored_pixels = np.concatenate((pixels[::-1], pixels))
+        pixels = np.maximum(mirrored_pixels[::2], mirrored_pixels[1::2])
+    if effect.bg_color_use:
+        pixels += effect._bg_color
+    if effect.brightness is not None:
+        np.multiply(pixels, effect.brightness, out=pixels, casting="unsafe")
+    if config["blur"] != 0.0 and effect.pixel_count > 3:
+        kernel = _gaussian_kernel1d(config["blur"], 0, len(pixels))
+        pixels[:, 0] = np.convolve(pixels[:, 0], kernel, mode="same")
+        pixels[:, 1] = np.convolve(pixels[:, 1], kernel, mode="same")
+        pixels[:, 2] = np.convolve(pixels[:, 2], kernel, mode="same")
+    return pixels
+
+
+def make_effect(pixel_count, names, dtype=np.float64, seed=0):
+    config = {}
+    for name in names:
+        config.update(OPTIONS[name])
+    # any effect will do, only the base class post-processing is tested
+    effect = RainbowEffect(None, config)
+    rng = np.random.default_rng(seed)
+    effect.pixels = (rng.random((pixel_count, 3)) * 255).astype(dtype)
+    effect._active = True
+    return effect
+
+
+@pytest.mark.parametrize("pixel_count", PIXEL_COUNTS)
+@pytest.mark.parametrize("names", CONFIGS, ids="+".join)
+def test_matches_legacy_get_pixels(pixel_count, names):
+    effect = make_effect(pixel_count, names)
+    source = effect.pixels.copy()
+    np.testing.assert_allclose(effect.get_pixels(), legacy_get_pixels(effect))
+    # the effect's own frame is left alone
+    np.testing.assert_array_equal(effect.pixels, source)
+
+
+@pytest.mark.parametrize("names", [(), tuple(OPTIONS)], ids="+".join)
+def test_matches_legacy_get_pixels_in_float32(names):
+    effect = make_effect(300, names, np.float32)
+    pixels = effect.get_pixels()
+    assert pixels.dtype == np.float32
+    np.testing.assert_allclose(
+        pixels, legacy_get_pixels(effect), rtol=1e-5, atol=1e-3
+    )
+
+
+def test_frames_follow_the_effect_pixels():
+    effect = make_effect(37, tuple(OPTIONS))
+    for seed in range(1, 4):
+        effect.pixels[:] = make_effect(37, (), seed=seed).pixels
+        np.testing.assert_allclose(
+            effect.get_pixels(), legacy_get_pixels(effect)
+        )
+
+
+def test_previous_frame_survives_the_next_one():
+    effect = make_effect(37, ("brightness",))
+    first = effect.get_pixels()
+    kept = first.copy()
+    effect.pixels[:] = 0
+    second = effect.get_pixels()
+    assert second is not first
+    np.testing.assert_array_equal(first, kept)
+    # the call after next reuses the first frame's buffer
+    assert effect.get_pixels() is first
+
+
+def test_buffers_follow_the_pixel_count():
+    effect = make_effect(37, ("mirror", "background"))
+    effect.get_pixels()
+    effect.pixels = make_effect(300, ()).pixels
+    np.testing.assert_allclose(effect.get_pixels(), legacy_get_pixels(effect))
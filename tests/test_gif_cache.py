@@ -0,0 +1,90 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from ledfx import gif_cache as gif_cache_module
+from ledfx.gif_cache import GifFrameCache
+
+
+@pytest.fixture
+def gif_cache(tmp_path):
+    return GifFrameCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.gif"
+    path.write_bytes(b"GIF89a")
+    return str(path)
+
+
+def make_frames(count=4, height=8, width=16):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (count, height, width, 3), dtype=np.uint8)
+
+
+def test_stored_frames_are_memory_mapped(gif_cache, source):
+    key = gif_cache.frames_key(source, (16, 8), "Fast")
+    assert gif_cache.load(key) is None
+
+    frames = make_frames()
+    stored = gif_cache.store(key, frames)
+    loaded = gif_cache.load(key)
+    assert isinstance(loaded, np.memmap)
+    assert not loaded.flags.writeable
+    np.testing.assert_array_equal(stored, frames)
+    np.testing.assert_array_equal(loaded, frames)
+    assert (gif_cache.hits, gif_cache.misses) == (1, 1)
+
+
+def test_key_covers_size_resize_method_and_source(gif_cache, source):
+    key = gif_cache.frames_key(source, (16, 8), "Fast")
+    assert key == gif_cache.frames_key(source, (16, 8), "Fast")
+    assert key != gif_cache.frames_key(source, (8, 16), "Fast")
+    assert key != gif_cache.frames_key(source, (16, 8), "Slow")
+
+    # an edited file is decoded again
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert key != gif_cache.frames_key(source, (16, 8), "Fast")
+
+
+def test_least_recently_used_are_evicted(gif_cache, source):
+    frames = make_frames()
+    keys = [gif_cache.frames_key(source, (16, i), "Fast") for i in range(3)]
+    paths = []
+    for age, key in enumerate(keys):
+        gif_cache.store(key, frames)
+        path = os.path.join(gif_cache.path, key + ".npy")
+        os.utime(path, (age, age))
+        paths.append(path)
+    # using the oldest makes the second oldest the least recently used
+    gif_cache.load(keys[0])
+
+    gif_cache.max_bytes = 2 * os.path.getsize(paths[0])
+    gif_cache.evict()
+    assert [os.path.exists(path) for path in paths] == [True, False, True]
+
+
+def test_remote_sources_are_downloaded_once(gif_cache, monkeypatch):
+    downloads = []
+
+    def urlopen(url):
+        downloads.append(url)
+        return io.BytesIO(b"GIF89a")
+
+    monkeypatch.setattr(gif_cache_module.urllib.request, "urlopen", urlopen)
+    url = "https://example.com/animated.gif"
+    path = gif_cache.fetch(url)
+    assert gif_cache.fetch(url) == path
+    assert downloads == [url]
+    with open(path, "rb") as file:
+        assert file.read() == b"GIF89a"
+    assert gif_cache.frames_key(url, (16, 8), "Fast")
+
+
+def test_local_sources_are_not_copied(gif_cache, source):
+    assert gif_cache.fetch(source) == source
+    assert not os.path.exists(gif_cache.path)
@@ -0,0 +1,192 @@
+import pytest
+
+from ledfx import governor as governor_module
+from ledfx.events import Event
+from ledfx.governor import RESTORE_AFTER, FrameRateGovernor
+
+
+class FakeVirtual:
+    def __init__(self, id, frame_time_ms, priority="normal", rate=62):
+        self.id = id
+        self.active = True
+        self.config = {"frame_rate_priority": priority}
+        self.max_refresh_rate = rate
+        self.fps_cap = None
+        self.frame_time_ms = frame_time_ms
+        self.frames = 0
+        self.overruns = 0
+
+    @property
+    def refresh_rate(self):
+        if self.fps_cap:
+            return min(self.fps_cap, self.max_refresh_rate)
+        return self.max_refresh_rate
+
+    def set_fps_cap(self, fps):
+        self.fps_cap = fps
+
+
+class FakeScheduler:
+    def __init__(self, virtuals):
+        self.virtuals = virtuals
+        self.calls = 0
+
+    def get_stats(self):
+        self.calls += 1
+        return {
+            "virtuals": {
+                virtual.id: {
+                    "frames": virtual.frames,
+                    "overruns": virtual.overruns,
+                    "avg_frame_time_ms": virtual.frame_time_ms,
+                }
+                for virtual in self.virtuals.values()
+            }
+        }
+
+
+class FakeEvents:
+    def __init__(self):
+        self.fired = []
+
+    def fire_event(self, event):
+        self.fired.append(event)
+
+
+class FakeLedFx:
+    def __init__(self, *virtuals):
+        self.config = {"fps_governor": True}
+        self.virtuals = {virtual.id: virtual for virtual in virtuals}
+        self.scheduler = FakeScheduler(self.virtuals)
+        self.events = FakeEvents()
+
+
+@pytest.fixture(autouse=True)
+def cpu(monkeypatch):
+    """The cpu usage psutil reports, idle unless a test sets it"""
+    cpu = {"percent": 0.0}
+    monkeypatch.setattr(
+        governor_module.psutil,
+        "cpu_percent",
+        lambda interval: cpu["percent"],
+    )
+    return cpu
+
+
+def test_low_priority_steps_down_first():
+    low = FakeVirtual("low", 2, priority="low")
+    cheap = FakeVirtual("cheap", 4)
+    costly = FakeVirtual("costly", 10)
+    ledfx = FakeLedFx(costly, cheap, low)
+    governor = FrameRateGovernor(ledfx)
+
+    governor.evaluate()
+    assert low.fps_cap == 45
+    assert cheap.fps_cap is None and costly.fps_cap is None
+
+    # the low priority virtual keeps stepping down while it can
+    for _ in range(10):
+        governor.evaluate()
+    assert low.refresh_rate == 10
+    # then the most expensive virtual of the next priority
+    assert costly.fps_cap is not None
+    assert cheap.fps_cap is None
+
+    event = ledfx.events.fired[0]
+    assert event.event_type == Event.GOVERNOR_UPDATE
+    assert (event.virtual_id, event.refresh_rate) == ("low", 45)
+    assert governor.decisions[0]["from"] == 62
+
+
+def test_overruns_trigger_step_down():
+    virtual = FakeVirtual("virtual", 1)
+    governor = FrameRateGovernor(FakeLedFx(virtual))
+
+    virtual.frames, virtual.overruns = 100, 0
+    governor.evaluate()
+    assert virtual.fps_cap is None
+
+    virtual.frames, virtual.overruns = 200, 30
+    governor.evaluate()
+    assert governor.overrun_ratio == pytest.approx(0.3)
+    assert virtual.fps_cap == 45
+
+
+def test_restores_after_sustained_headroom():
+    virtual = FakeVirtual("virtual", 20)
+    governor = FrameRateGovernor(FakeLedFx(virtual))
+    governor.evaluate()
+    governor.evaluate()
+    assert virtual.refresh_rate == 33
+
+    virtual.frame_time_ms = 1
+    for _ in range(RESTORE_AFTER - 1):
+        governor.evaluate()
+    assert virtual.refresh_rate == 33
+    governor.evaluate()
+    assert virtual.refresh_rate == 45
+
+    # a busy evaluation restarts the count
+    for _ in range(RESTORE_AFTER - 1):
+        governor.evaluate()
+    virtual.frame_time_ms = 12
+    governor.evaluate()
+    virtual.frame_time_ms = 1
+    for _ in range(RESTORE_AFTER - 1):
+        governor.evaluate()
+    assert virtual.refresh_rate == 45
+
+    governor.evaluate()
+    assert virtual.fps_cap is None
+    assert virtual.refresh_rate == 62
+    assert governor.get_stats()["capped"] == {}
+
+
+def test_highest_priority_restores_first():
+    low = FakeVirtual("low", 0, priority="low")
+    high = FakeVirtual("high", 0, priority="high")
+    low.fps_cap = high.fps_cap = 30
+    governor = FrameRateGovernor(FakeLedFx(low, high))
+    for _ in range(RESTORE_AFTER):
+        governor.evaluate()
+    assert high.fps_cap == 40
+    assert low.fps_cap == 30
+
+
+def test_disabling_and_deactivating_lift_caps():
+    first = FakeVirtual("first", 0)
+    second = FakeVirtual("second", 0)
+    first.fps_cap = second.fps_cap = 30
+    ledfx = FakeLedFx(first, second)
+    governor = FrameRateGovernor(ledfx)
+
+    first.active = False
+    governor.evaluate()
+    assert first.fps_cap is None
+    assert second.fps_cap == 30
+
+    ledfx.config["fps_governor"] = False
+    governor.evaluate()
+    assert second.fps_cap is None
+    assert governor.get_stats()["enabled"] is False
+
+
+def test_cpu_usage_triggers_step_down(cpu):
+    virtual = FakeVirtual("virtual", 1)
+    governor = FrameRateGovernor(FakeLedFx(virtual))
+    governor.evaluate()
+    assert virtual.fps_cap is None
+
+    cpu["percent"] = 99.0
+    governor.evaluate()
+    assert virtual.fps_cap == 45
+    assert governor.decisions[-1]["reason"].endswith("cpu 99%")
+
+
+def test_scheduler_stats_are_fetched_once_per_evaluation():
+    virtuals = [FakeVirtual(f"virtual-{i}", 10) for i in range(4)]
+    ledfx = FakeLedFx(*virtuals)
+    governor = FrameRateGovernor(ledfx)
+    governor.evaluate()
+    assert ledfx.scheduler.calls == 1
+    assert sum(virtual.fps_cap is not None for virtual in virtuals) == 1
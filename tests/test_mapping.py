@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from ledfx.effects.math import interpolate_pixels
+from ledfx.mapping import MappingPlan
+
+# (device_id, device_start, device_end, inverse)
+SEGMENTS = [
+    ("a", 0, 29, False),
+    ("b", 10, 16, True),
+    ("a", 30, 30, False),
+    ("c", 0, 99, True),
+    ("b", 0, 9, False),
+]
+
+
+def segments_by_device(segments):
+    """Virtual._segments_by_device"""
+    data_start = 0
+    by_device = {}
+    for device_id, device_start, device_end, inverse in segments:
+        width = device_end - device_start + 1
+        if not inverse:
+            info = (data_start, data_start + width, 1)
+        else:
+            stop = None if data_start == 0 else data_start - 1
+            info = (data_start + width - 1, stop, -1)
+        by_device.setdefault(device_id, []).append(
+            (*info, device_start, device_end)
+        )
+        data_start += width
+    return by_device
+
+
+def grouped(pixels, group_size, pixel_count):
+    return np.repeat(pixels, group_size, axis=0)[:pixel_count]
+
+
+def legacy_mapping(by_device, mapping, pixels, group_size, pixel_count):
+    """The per segment mapping Virtual.flush did before the plans"""
+    if mapping == "span":
+        pixels = grouped(pixels, group_size, pixel_count)
+    result = {}
+    for device_id, segments in by_device.items():
+        data = []
+        for start, stop, step, device_start, device_end in segments:
+            if mapping == "span":
+                seg = pixels[start:stop:step]
+            else:
+                length = device_end - device_start + 1
+                seg = interpolate_pixels(
+                    pixels, int(np.ceil(length / group_size))
+                )[::step]
+                seg = grouped(seg, group_size, length)
+            data.append((seg, device_start, device_end))
+        result[device_id] = data
+    return result
+
+
+# in copy mode the frame is interpolated, so it can be any length
+@pytest.mark.parametrize(
+    "mapping, frame_offset",
+    [("span", 0), ("copy", 0), ("copy", -5), ("copy", 13)],
+)
+@pytest.mark.parametrize("group_size", [1, 2, 3, 7])
+def test_plan_matches_legacy_mapping(mapping, frame_offset, group_size):
+    by_device = segments_by_device(SEGMENTS)
+    pixel_count = sum(end - start + 1 for _, start, end, _ in SEGMENTS)
+    frame_length = -(-pixel_count // group_size) + frame_offset
+    frame = np.random.default_rng(0).random((frame_length, 3)) * 255
+
+    plan = MappingPlan(
+        by_device, mapping, frame_length, group_size, pixel_count
+    )
+    expected = legacy_mapping(
+        by_device, mapping, frame, group_size, pixel_count
+    )
+
+    plan.map(frame)
+    assert [device_id for device_id, _ in plan.devices] == list(expected)
+    for device_id, data in plan.devices:
+        assert len(data) == len(expected[device_id])
+        for (seg, start, end), (expected_seg, e_start, e_end) in zip(
+            data, expected[device_id]
+        ):
+            assert (start, end) == (e_start, e_end)
+            np.testing.assert_allclose(seg, expected_seg, atol=1e-9)
+
+
+@pytest.mark.parametrize("mapping", ["span", "copy"])
+def test_segments_are_views_of_the_buffer(mapping):
+    by_device = segments_by_device(SEGMENTS)
+    plan = MappingPlan(by_device, mapping, 148, 1, 148)
+    plan.map(np.ones((148, 3)))
+    for _, data in plan.devices:
+        for seg, _, _ in data:
+            assert np.shares_memory(seg, plan.buffer)
+            np.testing.assert_array_equal(seg, 1)
+
+
+def test_plan_maps_single_pixel_frames():
+    by_device = segments_by_device(SEGMENTS)
+    frame = np.array([[10.0, 20.0, 30.0]])
+    plan = MappingPlan(by_device, "copy", 1, 1, 148)
+    plan.map(frame)
+    for _, data in plan.devices:
+        for seg, _, _ in data:
+            np.testing.assert_array_equal(
+                seg, np.broadcast_to(frame, seg.shape)
+            )
+
+
+@pytest.mark.parametrize("mapping", ["span", "copy"])
+@pytest.mark.parametrize("group_size", [1, 3])
+def test_uint8_plan_truncates_the_float_plan(mapping, group_size):
+    by_device = segments_by_device(SEGMENTS)
+    pixel_count = sum(end - start + 1 for _, start, end, _ in SEGMENTS)
+    frame_length = -(-pixel_count // group_size) + 5
+    frame = np.random.default_rng(1).random((frame_length, 3)) * 255
+    args = (by_device, mapping, frame_length, group_size, pixel_count)
+    plan = MappingPlan(*args)
+    uint8_plan = MappingPlan(*args, dtype=np.uint8)
+
+    plan.map(frame)
+    uint8_plan.map(frame.astype(np.float32))
+    assert uint8_plan.buffer.dtype == np.uint8
+    # copy mode interpolates in float32, which can land either side of an
+    # integer the float64 plan lands on
+    atol = 0 if mapping == "span" else 1
+    np.testing.assert_allclose(
+        uint8_plan.buffer, plan.buffer.astype(np.uint8), atol=atol
+    )
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import aubio
+import numpy as np
+import pytest
+
+from ledfx.effects.melbank import (
+    FFT_SIZE,
+    MELBANK_COEFFS_TYPES,
+    MIC_RATE,
+    Melbanks,
+)
+
+SAMPLE_RATE = 60
+FRAMES = 300
+
+
+def make_melbanks(config, batched=True):
+    ledfx = SimpleNamespace(
+        config={},
+        dev_enabled=lambda: False,
+        events=SimpleNamespace(fire_event=lambda event: None),
+    )
+    audio = SimpleNamespace(
+        _config={"min_volume": 0.2},
+        _frequency_domain=None,
+        volume=lambda filtered=True: 1.0,
+    )
+    melbanks = Melbanks(ledfx, audio, config)
+    # the per processor path is the reference the batch must reproduce
+    melbanks._batched = batched and melbanks._batched
+    return melbanks
+
+
+def frequency_domains():
+    """Windowed FFTs of a noisy sweep with a pulsing bass line"""
+    block = MIC_RATE // SAMPLE_RATE
+    pvoc = aubio.pvoc(FFT_SIZE, block)
+    rng = np.random.default_rng(1234)
+    t = np.arange(FRAMES * block) / MIC_RATE
+    sweep = np.sin(2 * np.pi * (50 + 400 * t) * t)
+    bass = np.sin(2 * np.pi * 60 * t) * (np.sin(2 * np.pi * 2 * t) > 0)
+    audio = 0.3 * sweep + 0.5 * bass + 0.05 * rng.standard_normal(len(t))
+    for i in range(FRAMES):
+        yield pvoc(audio[i * block : (i + 1) * block].astype(np.float32))
+
+
+@pytest.mark.parametrize("coeffs_type", MELBANK_COEFFS_TYPES)
+@pytest.mark.parametrize("samples", [12, 24])
+def test_batched_melbanks_match_processors(coeffs_type, samples):
+    config = {"coeffs_type": coeffs_type, "samples": samples}
+    batched = make_melbanks(config)
+    reference = make_melbanks(config, batched=False)
+    assert batched._batched
+
+    for frequency_domain in frequency_domains():
+        for melbanks in (batched, reference):
+            melbanks._audio._frequency_domain = frequency_domain
+            melbanks()
+        for i in range(reference.mel_count):
+            np.testing.assert_allclose(
+                batched.melbanks[i],
+                reference.melbanks[i],
+                rtol=1e-4,
+                atol=1e-6,
+            )
+            np.testing.assert_allclose(
+                batched.melbanks_filtered[i],
+                reference.melbanks_filtered[i],
+                rtol=1e-4,
+                atol=1e-6,
+            )
+
+
+def test_melbank_rows_share_the_batch_buffers():
+    melbanks = make_melbanks({})
+    for i in range(melbanks.mel_count):
+        assert np.shares_memory(melbanks.melbanks[i], melbanks._melbank_data)
+        assert np.shares_memory(
+            melbanks.melbanks_filtered[i], melbanks._melbank_filtered_data
+        )
+
+
+def test_silence_zeroes_every_melbank():
+    melbanks = make_melbanks({})
+    for frequency_domain in frequency_domains():
+        melbanks._audio._frequency_domain = frequency_domain
+        melbanks()
+        break
+    melbanks._audio.volume = lambda filtered=True: 0.0
+    melbanks()
+    assert not np.any(melbanks._melbank_data)
+    assert not np.any(melbanks._melbank_filtered_data)
@@ -0,0 +1,100 @@
+import struct
+
+import numpy as np
+import pytest
+
+from ledfx.devices.packets import (
+    build_hue_entertainment_packet,
+    build_opc_packet,
+)
+
+PIXEL_COUNTS = [1, 7, 20, 300]
+ENTERTAINMENT_ID = "1a8d99cc-967b-44f2-9202-43f976c0fa6b"
+
+
+def reference_opc_packet(data, channel):
+    """Per pixel Open Pixel Control encoding the numpy builder replaced"""
+    header = struct.pack(">BBH", channel, 0, len(data) * 3)
+    pieces = [
+        struct.pack(
+            "BBB",
+            min(255, max(0, int(r))),
+            min(255, max(0, int(g))),
+            min(255, max(0, int(b))),
+        )
+        for r, g, b in data
+    ]
+    return header + b"".join(pieces)
+
+
+def reference_hue_packet(data, entertainment_id):
+    """Per pixel Hue Entertainment encoding the numpy builder replaced"""
+    pixels = [[int(r), int(g), int(b)] for r, g, b in data]
+    send_data = bytearray(b"HueStream")
+    send_data.extend([2, 0, 0, 0, 0, 0, 0])
+    send_data.extend(entertainment_id.encode("utf-8"))
+    for i in range(len(pixels)):
+        send_data.append(i)
+        send_data.append(pixels[i][0])
+        send_data.append(pixels[i][0])
+        send_data.append(pixels[i][1])
+        send_data.append(pixels[i][1])
+        send_data.append(pixels[i][2])
+        send_data.append(pixels[i][2])
+    return send_data
+
+
+def random_pixels(pixel_count, low=0, high=255):
+    rng = np.random.default_rng(pixel_count)
+    return rng.uniform(low, high, (pixel_count, 3))
+
+
+@pytest.mark.parametrize("pixel_count", PIXEL_COUNTS)
+@pytest.mark.parametrize("channel", [0, 1, 255])
+def test_opc_packet_matches_reference(pixel_count, channel):
+    data = random_pixels(pixel_count)
+    assert build_opc_packet(data, channel) == reference_opc_packet(
+        data, channel
+    )
+
+
+@pytest.mark.parametrize("pixel_count", PIXEL_COUNTS)
+def test_opc_packet_clips_out_of_range_values(pixel_count):
+    data = random_pixels(pixel_count, low=-100, high=400)
+    assert build_opc_packet(data, 0) == reference_opc_packet(data, 0)
+
+
+def test_opc_packet_header():
+    packet = build_opc_packet(np.zeros((200, 3)), 3)
+    assert packet[:4] == bytes([3, 0, 600 >> 8, 600 & 0xFF])
+    assert len(packet) == 4 + 600
+
+
+@pytest.mark.parametrize("pixel_count", [1, 7, 20])
+def test_hue_packet_matches_reference(pixel_count):
+    data = random_pixels(pixel_count)
+    assert build_hue_entertainment_packet(
+        data, ENTERTAINMENT_ID
+    ) == reference_hue_packet(data, ENTERTAINMENT_ID)
+
+
+def test_hue_packet_doubles_each_channel():
+    data = np.array([[1, 2, 3], [250, 128, 0]], dtype=float)
+    packet = build_hue_entertainment_packet(data, ENTERTAINMENT_ID)
+    body = packet[16 + len(ENTERTAINMENT_ID) :]
+    assert body == bytes([0, 1, 1, 2, 2, 3, 3, 1, 250, 250, 128, 128, 0, 0])
+
+
+def test_hue_packet_clips_out_of_range_values():
+    data = np.array([[-5, 300, 255.9]])
+    packet = build_hue_entertainment_packet(data, ENTERTAINMENT_ID)
+    assert packet[-7:] == bytes([0, 0, 0, 255, 255, 255, 255])
+
+
+def test_packets_encode_uint8_frames_unchanged():
+    data = random_pixels(20)
+    frame = data.astype(np.uint8)
+    assert build_opc_packet(frame, 0) == reference_opc_packet(data, 0)
+    assert build_hue_entertainment_packet(
+        frame, ENTERTAINMENT_ID
+    ) == reference_hue_packet(data, ENTERTAINMENT_ID)
@@ -0,0 +1,150 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ledfx import core
+from ledfx.core import LedFxCore
+from ledfx.events import Event
+from ledfx.perf import (
+    DEVICE_STAGES,
+    VIRTUAL_STAGES,
+    DeviceTimings,
+    FrameTimings,
+    StageTimer,
+    get_perf_stats,
+)
+
+EMPTY = {"count": 0, "p50": 0, "p95": 0, "p99": 0, "max": 0}
+
+
+def test_summary_percentiles():
+    timer = StageTimer()
+    assert timer.summary() == EMPTY
+    # 1ms to 100ms, shuffled so the order they arrive in doesn't matter
+    for ms in list(range(1, 101, 2)) + list(range(100, 0, -2)):
+        timer.record(ms / 1000)
+    assert timer.summary() == {
+        "count": 100,
+        "p50": pytest.approx(50.5),
+        "p95": pytest.approx(95.05),
+        "p99": pytest.approx(99.01),
+        "max": pytest.approx(100.0),
+    }
+
+
+def test_window_wraps_around():
+    timer = StageTimer(4)
+    for ms in range(1, 7):
+        timer.record(ms / 1000)
+    # 1ms and 2ms have been overwritten by 5ms and 6ms
+    assert sorted(timer._samples * 1000) == pytest.approx([3, 4, 5, 6])
+    summary = timer.summary()
+    assert summary["count"] == 6
+    assert summary["p50"] == pytest.approx(4.5)
+    assert summary["max"] == pytest.approx(6.0)
+
+
+def test_clear_discards_the_window():
+    timer = StageTimer(4)
+    for ms in (10, 20, 30):
+        timer.record(ms / 1000)
+    timer.clear()
+    assert timer.summary() == EMPTY
+
+    # samples from before the clear are not part of the new window
+    timer.record(0.001)
+    summary = timer.summary()
+    assert summary["count"] == 1
+    assert summary["max"] == pytest.approx(1.0)
+
+
+def test_device_timings_clear_the_output_counts():
+    timings = DeviceTimings()
+    timings.record("flush", 0.002)
+    timings.sent, timings.dropped = 10, 2
+    stats = timings.to_dict()
+    assert stats.keys() == {*DEVICE_STAGES, "output"}
+    assert stats["flush"]["count"] == 1
+    assert stats["output"] == {"sent": 10, "dropped": 2}
+
+    timings.clear()
+    stats = timings.to_dict()
+    assert stats["flush"] == EMPTY
+    assert stats["output"] == {"sent": 0, "dropped": 0}
+
+
+def make_ledfx():
+    def virtual(id, active):
+        return SimpleNamespace(
+            id=id, active=active, perf=FrameTimings(VIRTUAL_STAGES)
+        )
+
+    def device(id, active):
+        return SimpleNamespace(
+            id=id, is_active=lambda: active, perf=DeviceTimings()
+        )
+
+    return SimpleNamespace(
+        virtuals={
+            "on": virtual("on", True),
+            "off": virtual("off", False),
+        },
+        devices={"on": device("on", True), "off": device("off", False)},
+    )
+
+
+def test_stats_cover_active_virtuals_and_devices():
+    ledfx = make_ledfx()
+    ledfx.virtuals["on"].perf.record("render", 0.001)
+    stats = get_perf_stats(ledfx)
+    assert stats["virtuals"].keys() == {"on"}
+    assert stats["devices"].keys() == {"on"}
+    assert stats["virtuals"]["on"]["render"]["count"] == 1
+    assert stats["devices"]["on"]["output"] == {"sent": 0, "dropped": 0}
+
+
+class FakeEvents:
+    def __init__(self):
+        self.listening = False
+        self.fired = []
+
+    def has_listeners(self, event_type):
+        return self.listening
+
+    def fire_event(self, event):
+        self.fired.append(event)
+
+
+def run_perf_update_loop(ledfx, passes=5):
+    """Runs a few passes of the loop, without waiting between them"""
+
+    async def run():
+        task = asyncio.ensure_future(LedFxCore.perf_update_loop(ledfx))
+        for _ in range(passes):
+            await asyncio.sleep(0)
+        task.cancel()
+
+    asyncio.run(run())
+
+
+def test_perf_updates_only_gathered_while_listened_to(monkeypatch):
+    gathered = []
+    monkeypatch.setattr(core, "PERF_UPDATE_INTERVAL", 0)
+    monkeypatch.setattr(
+        core, "get_perf_stats", lambda ledfx: gathered.append(ledfx)
+    )
+    ledfx = make_ledfx()
+    ledfx.events = FakeEvents()
+    run_perf_update_loop(ledfx)
+    assert gathered == []
+    assert ledfx.events.fired == []
+
+    monkeypatch.setattr(core, "get_perf_stats", get_perf_stats)
+    ledfx.events.listening = True
+    run_perf_update_loop(ledfx)
+    assert ledfx.events.fired
+    event = ledfx.events.fired[0]
+    assert event.event_type == Event.PERF_UPDATE
+    assert event.virtuals.keys() == {"on"}
+    assert event.devices.keys() == {"on"}
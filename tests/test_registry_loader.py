@@ -0,0 +1,170 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ledfx.effects import Effect, Effects
+from ledfx.tools.registry_manifest import generate_manifest, manifest_path
+from ledfx.utils import RegistryLoader
+
+PACKAGE_INIT = """
+from ledfx.utils import BaseRegistry
+
+
+@BaseRegistry.no_registration
+class Thing(BaseRegistry):
+    pass
+"""
+
+MODULE = """
+from lazyreg import Thing
+
+
+class {name}(Thing):
+    NAME = "{name}"
+    CATEGORY = "Things"
+
+    def __init__(self, config=None):
+        self.config = config
+"""
+
+STARTUP = """
+import sys
+
+from ledfx.effects import Effects
+
+
+class Ledfx:
+    def dev_enabled(self):
+        return False
+
+
+effects = Effects(Ledfx())
+print(len(effects.types()))
+print(",".join(name for name in sys.modules if name in MODULES))
+effects.create("fire", ledfx=None, config={})
+print(",".join(name for name in sys.modules if name in MODULES))
+"""
+
+
+class Ledfx:
+    def dev_enabled(self):
+        return False
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """A registry package with modules alpha and beta, and a manifest"""
+    root = tmp_path / "lazyreg"
+    root.mkdir()
+    (root / "__init__.py").write_text(PACKAGE_INIT)
+    (root / "alpha.py").write_text(MODULE.format(name="Alpha"))
+    (root / "beta.py").write_text(MODULE.format(name="Beta"))
+    manifest = {
+        "modules": ["lazyreg.alpha", "lazyreg.beta"],
+        "types": {
+            "alpha": {
+                "module": "lazyreg.alpha",
+                "name": "Alpha",
+                "category": "Things",
+            },
+            "beta": {
+                "module": "lazyreg.beta",
+                "name": "Beta",
+                "category": "Things",
+            },
+        },
+    }
+    (root / "manifest.json").write_text(json.dumps(manifest))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield root
+    for name in list(sys.modules):
+        if name.split(".")[0] == "lazyreg":
+            del sys.modules[name]
+
+
+def make_loader(manifest_file="manifest.json"):
+    from lazyreg import Thing
+
+    class Things(RegistryLoader):
+        MANIFEST_FILE = manifest_file
+
+    return Things(Ledfx(), Thing, "lazyreg")
+
+
+def test_modules_load_on_first_use(package):
+    things = make_loader()
+    assert things.types() == ["alpha", "beta"]
+    assert things.info("beta") == {"name": "Beta", "category": "Things"}
+    assert "lazyreg.alpha" not in sys.modules
+    assert "lazyreg.beta" not in sys.modules
+
+    thing = things.create("alpha", config={})
+    assert type(thing).__name__ == "Alpha"
+    assert thing.type == "alpha"
+    assert "lazyreg.alpha" in sys.modules
+    assert "lazyreg.beta" not in sys.modules
+
+    assert things.get_class("beta").NAME == "Beta"
+    with pytest.raises(KeyError):
+        things.get_class("gamma")
+    with pytest.raises(AttributeError):
+        things.create("gamma")
+
+
+def test_classes_loads_every_module(package):
+    things = make_loader()
+    assert set(things.classes()) == {"alpha", "beta"}
+    assert "lazyreg.beta" in sys.modules
+
+
+def test_modules_missing_from_manifest_load_at_startup(package):
+    (package / "gamma.py").write_text(MODULE.format(name="Gamma"))
+    (package / "beta.py").unlink()
+    things = make_loader()
+    assert "lazyreg.gamma" in sys.modules
+    assert "lazyreg.alpha" not in sys.modules
+    # beta was removed since the manifest was written
+    assert things.types() == ["alpha", "gamma"]
+    assert things.info("gamma") == {"name": "Gamma", "category": "Things"}
+
+
+def test_unreadable_manifest_loads_everything(package):
+    (package / "manifest.json").write_text("{")
+    things = make_loader()
+    assert "lazyreg.alpha" in sys.modules
+    assert "lazyreg.beta" in sys.modules
+    assert sorted(things.types()) == ["alpha", "beta"]
+
+
+def test_effects_manifest_is_up_to_date():
+    path = manifest_path(Effects.PACKAGE_NAME, Effects.MANIFEST_FILE)
+    with open(path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    # regenerate with: python -m ledfx.tools.registry_manifest
+    assert manifest == generate_manifest(Effects.PACKAGE_NAME, Effect)
+
+
+def test_effects_startup_imports_no_effect_modules():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = manifest_path(Effects.PACKAGE_NAME, Effects.MANIFEST_FILE)
+    with open(path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    modules = {info["module"] for info in manifest["types"].values()}
+    result = subprocess.run(
+        [sys.executable, "-c", f"MODULES = {modules!r}\n{STARTUP}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=root,
+        env=dict(os.environ, PYTHONPATH=root),
+    )
+    types, loaded_at_startup, loaded_on_create = result.stdout.split("\n")[:3]
+    assert int(types) == len(manifest["types"])
+    assert loaded_at_startup == ""
+    # fire and the effects it builds on, but no others
+    loaded_on_create = loaded_on_create.split(",")
+    assert "ledfx.effects.fire" in loaded_on_create
+    assert "ledfx.effects.water" not in loaded_on_create
@@ -0,0 +1,356 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ledfx.config import CORE_CONFIG_SCHEMA
+from ledfx.effects.blender import Blender
+from ledfx.effects.rainbow import RainbowEffect
+from ledfx.effects.singleColor import SingleColorEffect
+from ledfx.render_workers import (
+    AudioFeatureBlock,
+    FrameRing,
+    RenderWorkers,
+    ShardedEffect,
+)
+from ledfx.virtuals import Virtual
+
+MEL_SHAPE = (3, 24)
+
+
+@pytest.fixture
+def ring():
+    writer = FrameRing(10)
+    reader = FrameRing(10, name=writer.name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def make_frame(value):
+    return np.full((10, 3), float(value))
+
+
+def test_ring_is_empty_until_first_frame(ring):
+    writer, reader = ring
+    out = np.zeros((10, 3))
+    assert not reader.read_into(out)
+
+
+def test_ring_returns_latest_frame(ring):
+    writer, reader = ring
+    out = np.zeros((10, 3))
+    for value in range(1, 6):
+        writer.write(make_frame(value))
+    assert reader.read_into(out)
+    np.testing.assert_array_equal(out, make_frame(5))
+
+
+def test_ring_never_writes_the_slot_being_read(ring):
+    writer, reader = ring
+    out = np.zeros((10, 3))
+    writer.write(make_frame(1))
+    reader.read_into(out)
+    claimed = reader._header[2]
+    for value in range(2, 10):
+        writer.write(make_frame(value))
+        np.testing.assert_array_equal(reader._slots[claimed], make_frame(1))
+        assert writer._header[1] != claimed
+
+
+def test_ring_retries_frames_overwritten_while_read(ring):
+    writer, reader = ring
+    out = np.zeros((10, 3))
+    writer.write(make_frame(1))
+    # the writer missed the claim and is halfway through the slot
+    slot = writer._header[1]
+    writer._sequences[slot] += 1
+    assert not reader.read_into(out)
+    np.testing.assert_array_equal(out, 0)
+
+    writer._sequences[slot] += 1
+    assert reader.read_into(out)
+    np.testing.assert_array_equal(out, make_frame(1))
+
+
+def test_ring_holds_float32_frames():
+    writer = FrameRing(10, np.float32)
+    reader = FrameRing(10, np.float32, name=writer.name)
+    out = np.zeros((10, 3), dtype=np.float32)
+    writer.write(make_frame(0.5))
+    assert reader.read_into(out)
+    np.testing.assert_array_equal(out, 0.5)
+    assert reader._slots.nbytes == writer._slots.nbytes == 3 * 10 * 3 * 4
+    reader.close()
+    writer.close()
+
+
+def make_audio(seed):
+    rng = np.random.default_rng(seed)
+    melbanks = SimpleNamespace(
+        _melbank_data=rng.random(MEL_SHAPE),
+        _melbank_filtered_data=rng.random(MEL_SHAPE),
+    )
+    return SimpleNamespace(
+        melbanks=melbanks,
+        freq_power=lambda: None,
+        freq_power_raw=rng.random(4),
+        freq_power_filter=SimpleNamespace(value=rng.random(4)),
+        volume=lambda filtered=True: 0.75 if filtered else 0.5,
+        pitch=lambda: 60.0,
+        onset=lambda: True,
+        bpm_beat_now=lambda: False,
+        volume_beat_now=lambda: True,
+        bar_oscillator=lambda: 2.5,
+        beat_counter=2,
+    )
+
+
+def test_audio_block_round_trip():
+    publisher = AudioFeatureBlock(MEL_SHAPE)
+    reader = AudioFeatureBlock(MEL_SHAPE, name=publisher.name)
+    try:
+        assert not reader.read()
+
+        audio = make_audio(0)
+        publisher.publish(audio)
+        assert reader.read()
+        # a block is only handed out once
+        assert not reader.read()
+
+        assert reader.scalars() == {
+            "volume": 0.5,
+            "volume_filtered": 0.75,
+            "pitch": 60.0,
+            "onset": 1.0,
+            "bpm_beat_now": 0.0,
+            "volume_beat_now": 1.0,
+            "bar_oscillator": 2.5,
+            "beat_counter": 2.0,
+        }
+        np.testing.assert_array_equal(
+            reader.freq_power(filtered=False), audio.freq_power_raw
+        )
+        np.testing.assert_array_equal(
+            reader.freq_power(), audio.freq_power_filter.value
+        )
+        np.testing.assert_array_equal(
+            reader.melbanks(), audio.melbanks._melbank_data
+        )
+        np.testing.assert_array_equal(
+            reader.melbanks(filtered=True),
+            audio.melbanks._melbank_filtered_data,
+        )
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_audio_block_skips_block_being_written():
+    publisher = AudioFeatureBlock(MEL_SHAPE)
+    reader = AudioFeatureBlock(MEL_SHAPE, name=publisher.name)
+    try:
+        publisher.publish(make_audio(0))
+        # an odd sequence number marks a block that is still being written
+        publisher._data[0] += 1
+        assert not reader.read()
+        publisher._data[0] += 1
+        assert reader.read()
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def make_pool(render_workers):
+    ledfx = SimpleNamespace(
+        config={"render_workers": render_workers},
+        events=SimpleNamespace(add_listener=lambda *args: None),
+    )
+    return RenderWorkers(ledfx)
+
+
+def make_effect(cls):
+    effect = cls.__new__(cls)
+    effect._config = {}
+    return effect
+
+
+def test_effects_are_not_sharded_by_default():
+    pool = make_pool(0)
+    effect = make_effect(RainbowEffect)
+    assert not pool.enabled
+    assert pool.shard(effect) is effect
+
+
+def test_shardable_effects_are_sharded():
+    pool = make_pool(2)
+    effect = make_effect(RainbowEffect)
+    shard = pool.shard(effect)
+    assert isinstance(shard, ShardedEffect)
+    assert shard.effect is effect
+    assert shard.NAME == RainbowEffect.NAME
+    assert not shard.is_active
+    assert not hasattr(shard, "matrix")
+
+    blender = make_effect(Blender)
+    assert pool.shard(blender) is blender
+
+
+def make_worker_pool(tmp_path):
+    ledfx = SimpleNamespace(
+        config=CORE_CONFIG_SCHEMA({"render_workers": 1}),
+        events=SimpleNamespace(add_listener=lambda *args: None),
+        gif_cache=SimpleNamespace(path=str(tmp_path)),
+    )
+    return ledfx, RenderWorkers(ledfx)
+
+
+def make_virtual(name):
+    return SimpleNamespace(
+        id=name,
+        config=Virtual.CONFIG_SCHEMA({"name": name}),
+        effective_pixel_count=30,
+        pixel_dtype=np.dtype(np.float32),
+        refresh_rate=60,
+    )
+
+
+def make_single_color(ledfx):
+    effect = SingleColorEffect(
+        ledfx, SingleColorEffect.schema()({"color": "#20ff40"})
+    )
+    effect._type = "singleColor"
+    return effect
+
+
+def wait_for_frame(shard, timeout=30):
+    """Returns the first frame the worker renders for the shard"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pixels = shard.get_pixels()
+        if pixels.any():
+            return pixels.copy()
+        time.sleep(0.01)
+    raise AssertionError("no frame from the render worker")
+
+
+def test_sharded_effect_matches_the_effect_in_process(tmp_path):
+    ledfx, pool = make_worker_pool(tmp_path)
+    virtual = make_virtual("sharded")
+    shard = pool.shard(make_single_color(ledfx))
+    try:
+        shard.activate(virtual)
+        pixels = wait_for_frame(shard)
+    finally:
+        pool.stop()
+
+    effect = make_single_color(ledfx)
+    effect.activate(virtual)
+    try:
+        effect._render()
+        expected = effect.get_pixels()
+    finally:
+        effect.deactivate()
+    assert pixels.dtype == np.float32
+    np.testing.assert_allclose(pixels, expected, rtol=1e-6)
+    assert not shard.is_active
+
+
+def wait_for_frames(shard, count=3, timeout=30):
+    """Waits until the worker has written count more frames to the shard"""
+    target = shard.ring._header[0] + count
+    deadline = time.monotonic() + timeout
+    while shard.ring._header[0] < target:
+        assert time.monotonic() < deadline, "the render worker stopped"
+        time.sleep(0.01)
+
+
+def test_crashed_worker_is_replaced(tmp_path):
+    ledfx, pool = make_worker_pool(tmp_path)
+    first = pool.shard(make_single_color(ledfx))
+    second = pool.shard(make_single_color(ledfx))
+    try:
+        first.activate(make_virtual("first"))
+        wait_for_frame(first)
+        crashed = first.worker
+        crashed._process.kill()
+        crashed._process.join(5)
+        assert not crashed.is_alive()
+
+        # the effect is attached to a new worker straight away
+        deadline = time.monotonic() + 30
+        while first.worker is crashed:
+            assert time.monotonic() < deadline, "the worker wasn't replaced"
+            time.sleep(0.01)
+        assert first.worker.is_alive()
+        wait_for_frames(first)
+
+        second.activate(make_virtual("second"))
+        assert pool._workers == [first.worker]
+        assert second.worker is first.worker
+        wait_for_frame(second)
+    finally:
+        pool.stop()
+
+
+def test_worker_ignores_updates_for_effects_it_does_not_have(tmp_path):
+    ledfx, pool = make_worker_pool(tmp_path)
+    shard = pool.shard(make_single_color(ledfx))
+    failed = []
+    try:
+        virtual = make_virtual("rendering")
+        shard.activate(virtual)
+        wait_for_frame(shard)
+        # stands in for a shard whose effect fails to attach
+        pool._shards["missing"] = SimpleNamespace(_fall_back=failed.append)
+        snapshot = pool._virtual_snapshot(virtual)
+        shard.worker.send(("config", "missing", {}))
+        shard.worker.send(("virtual", "missing", snapshot))
+        shard.worker.send(
+            (
+                "attach",
+                "missing",
+                "singleColor",
+                {},
+                snapshot,
+                "no-such-ring",
+                None,
+                {"user_colors": {}},
+            )
+        )
+        wait_for_frames(shard)
+        assert shard.worker.is_alive()
+
+        # the failed attach is reported back
+        deadline = time.monotonic() + 30
+        while not failed:
+            assert time.monotonic() < deadline, "no report of the failure"
+            time.sleep(0.01)
+        assert failed == ["missing"]
+    finally:
+        pool._shards.pop("missing", None)
+        pool.stop()
+
+
+def test_effects_failing_in_a_worker_render_in_process(tmp_path):
+    ledfx, pool = make_worker_pool(tmp_path)
+    virtual = make_virtual("fallback")
+    shard = pool.shard(make_single_color(ledfx))
+    try:
+        shard.activate(virtual)
+        wait_for_frame(shard)
+        # as the worker reports when it can't create the effect
+        pool._worker_message(shard.worker, "failed", shard.key)
+        assert shard.is_active
+        assert shard.ring is None
+        assert shard.key not in pool._shards
+
+        shard._render()
+        pixels = shard.get_pixels()
+        np.testing.assert_array_equal(pixels, shard.effect.get_pixels())
+        assert pixels.any()
+    finally:
+        shard._deactivate()
+        pool.stop()
+    assert not shard.effect.is_active
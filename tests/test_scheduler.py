@@ -0,0 +1,179 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ledfx.scheduler import FrameScheduler, VirtualFrameStats
+
+
+class FakeVirtual:
+    def __init__(self, id, refresh_rate=60):
+        self.id = id
+        self.refresh_rate = refresh_rate
+        self.frames = 0
+
+    def process_frame(self):
+        self.frames += 1
+
+
+class BlockingVirtual(FakeVirtual):
+    """Holds the scheduler thread in its frame until released"""
+
+    def __init__(self, id):
+        super().__init__(id)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def process_frame(self):
+        super().process_frame()
+        self.started.set()
+        self.release.wait(1)
+
+
+@pytest.fixture
+def scheduler():
+    ledfx = SimpleNamespace(
+        events=SimpleNamespace(add_listener=lambda *args: None)
+    )
+    scheduler = FrameScheduler(ledfx)
+    yield scheduler
+    scheduler.stop()
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_virtuals_are_grouped_by_refresh_rate(scheduler):
+    first = FakeVirtual("first", 60)
+    second = FakeVirtual("second", 60)
+    slow = FakeVirtual("slow", 20)
+    for virtual in (first, second, slow, first):
+        scheduler.register(virtual)
+
+    groups = scheduler.get_stats()["groups"]
+    assert groups.keys() == {"60", "20"}
+    assert groups["60"]["virtuals"] == ["first", "second"]
+    assert groups["20"]["virtuals"] == ["slow"]
+
+    wait_until(lambda: slow.frames >= 3)
+    assert first.frames > slow.frames
+    # every virtual in a group is ticked once per pass
+    assert abs(first.frames - second.frames) <= 1
+
+
+def test_unregister_waits_for_the_frame_in_progress(scheduler):
+    virtual = BlockingVirtual("blocking")
+    scheduler.register(virtual)
+    assert virtual.started.wait(1)
+
+    done = threading.Event()
+
+    def unregister():
+        scheduler.unregister(virtual)
+        done.set()
+
+    thread = threading.Thread(target=unregister)
+    thread.start()
+    # the frame hasn't finished, so unregister can't return yet
+    assert not done.wait(0.05)
+    virtual.release.set()
+    thread.join(1)
+    assert done.is_set()
+
+    frames = virtual.frames
+    time.sleep(0.05)
+    assert virtual.frames == frames
+    assert scheduler.get_stats() == {"groups": {}, "virtuals": {}}
+
+
+def test_virtuals_can_unregister_during_their_frame(scheduler):
+    virtual = FakeVirtual("self-removing")
+
+    def process_frame():
+        virtual.frames += 1
+        scheduler.unregister(virtual)
+
+    virtual.process_frame = process_frame
+    scheduler.register(virtual)
+    wait_until(lambda: virtual.frames == 1)
+    wait_until(lambda: not scheduler.get_stats()["groups"])
+    assert scheduler.get_stats()["virtuals"] == {}
+
+
+def test_virtuals_move_group_when_their_rate_changes(scheduler):
+    virtual = FakeVirtual("changing", 60)
+    other = FakeVirtual("other", 60)
+    scheduler.register(virtual)
+    scheduler.register(other)
+    virtual.refresh_rate = 30
+    wait_until(lambda: "30" in scheduler.get_stats()["groups"])
+    groups = scheduler.get_stats()["groups"]
+    assert groups["30"]["virtuals"] == ["changing"]
+    assert groups["60"]["virtuals"] == ["other"]
+
+    # the emptied group is removed
+    other.refresh_rate = 30
+    wait_until(lambda: "60" not in scheduler.get_stats()["groups"])
+    frames = virtual.frames
+    wait_until(lambda: virtual.frames > frames)
+
+
+def test_errors_in_a_frame_do_not_stop_the_group(scheduler, caplog):
+    failing = FakeVirtual("failing")
+    failing.process_frame = lambda: 1 / 0
+    working = FakeVirtual("working")
+    scheduler.register(failing)
+    scheduler.register(working)
+    wait_until(lambda: working.frames >= 3)
+    assert "Virtual failing: Error processing frame" in caplog.text
+    assert scheduler.get_stats()["virtuals"]["failing"]["frames"] >= 2
+
+
+def test_stats_are_dropped_when_unregistered(scheduler):
+    virtual = FakeVirtual("stats")
+    scheduler.register(virtual)
+    wait_until(lambda: virtual.frames >= 2)
+    stats = scheduler.get_stats()["virtuals"]["stats"]
+    assert stats["frames"] >= 2
+    assert stats["overruns"] == 0
+
+    scheduler.unregister(virtual)
+    assert "stats" not in scheduler.get_stats()["virtuals"]
+    # scheduling it again starts the stats over
+    scheduler.register(virtual)
+    assert scheduler.get_stats()["virtuals"]["stats"]["frames"] <= 1
+
+
+def test_frame_stats():
+    stats = VirtualFrameStats()
+    stats.record(0.002, 0.010, 0.016)
+    assert stats.avg_lag == 0.002
+    assert stats.avg_frame_time == 0.010
+
+    stats.record(0.004, 0.020, 0.016)
+    assert stats.frames == 2
+    assert stats.overruns == 1
+    assert stats.avg_lag == pytest.approx(
+        0.002 + 0.002 * VirtualFrameStats.SMOOTHING
+    )
+    assert stats.avg_frame_time == pytest.approx(
+        0.010 + 0.010 * VirtualFrameStats.SMOOTHING
+    )
+    assert stats.to_dict() == {
+        "frames": 2,
+        "overruns": 1,
+        "lag_ms": 4.0,
+        "avg_lag_ms": round(stats.avg_lag * 1000, 3),
+        "max_lag_ms": 4.0,
+        "frame_time_ms": 20.0,
+        "avg_frame_time_ms": round(stats.avg_frame_time * 1000, 3),
+        "max_frame_time_ms": 20.0,
+    }
+
+    stats.reset()
+    assert stats.frames == stats.overruns == 0
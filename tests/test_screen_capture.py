@@ -0,0 +1,158 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ledfx import screen_capture
+from ledfx.screen_capture import MAX_FAILURES, ScreenCapture, block_average
+
+MONITORS = [
+    {"top": 0, "left": 0, "width": 160, "height": 90},
+    {"top": 0, "left": 0, "width": 160, "height": 90},
+]
+
+
+def reference_block_average(image, height, width):
+    """Loop over the output pixels, averaging the block under each"""
+    in_height, in_width = image.shape[:2]
+    block_height = max(1, in_height // height)
+    block_width = max(1, in_width // width)
+    out = np.zeros((height, width, image.shape[2]), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            top = y * in_height // height
+            left = x * in_width // width
+            block = image[top : top + block_height, left : left + block_width]
+            out[y, x] = block.reshape(-1, image.shape[2]).mean(axis=0)
+    return out
+
+
+class FakeScreenshots:
+    """mss.mss stand in drawing the screen as a gradient of its position"""
+
+    def __init__(self, fail=False):
+        self.monitors = MONITORS
+        self.grabs = []
+        self.fail = fail
+        ys, xs = np.mgrid[0:90, 0:160]
+        # BGRX
+        self.screen = np.stack(
+            [xs, ys, (xs + ys) % 256, np.zeros_like(xs)], axis=-1
+        ).astype(np.uint8)
+
+    def grab(self, monitor):
+        self.grabs.append(monitor)
+        if self.fail:
+            raise RuntimeError("no screen")
+        top, left = monitor["top"], monitor["left"]
+        area = self.screen[
+            top : top + monitor["height"], left : left + monitor["width"]
+        ]
+        return SimpleNamespace(raw=np.ascontiguousarray(area).tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch):
+    screenshots = FakeScreenshots()
+    monkeypatch.setattr(
+        screen_capture, "mss", SimpleNamespace(mss=lambda: screenshots)
+    )
+    ledfx = SimpleNamespace(
+        config={"screen_capture_fps": 200},
+        events=SimpleNamespace(add_listener=lambda *args: None),
+    )
+    capture = ScreenCapture(ledfx)
+    yield capture, screenshots
+    capture.stop()
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < end, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize(
+    "in_shape, out_shape",
+    [((64, 64), (8, 8)), ((90, 160), (7, 13)), ((5, 6), (10, 12))],
+)
+def test_block_average_matches_reference(in_shape, out_shape):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (*in_shape, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(
+        block_average(image, *out_shape),
+        reference_block_average(image, *out_shape),
+    )
+
+
+def test_regions_on_a_screen_share_one_grab(service):
+    capture, screenshots = service
+    first = capture.add_region(1, 10, 20, 40, 30)
+    second = capture.add_region(1, 50, 100, 40, 30)
+    # the bounding box of both regions
+    grab = {"top": 10, "left": 20, "width": 120, "height": 70}
+    wait_for(lambda: screenshots.grabs[-1:] == [grab])
+    wait_for(lambda: capture.read(second, 40, 30) is not None)
+    for region in (first, second):
+        expected = screenshots.screen[
+            region.top : region.top + region.height,
+            region.left : region.left + region.width,
+            2::-1,
+        ]
+        np.testing.assert_array_equal(
+            capture.read(region, region.width, region.height), expected
+        )
+        np.testing.assert_array_equal(
+            capture.read(region, 8, 6), block_average(expected, 6, 8)
+        )
+
+
+def test_regions_are_clipped_to_the_screen(service):
+    capture, screenshots = service
+    region = capture.add_region(1, 80, 150, 40, 30)
+    off_screen = capture.add_region(1, 200, 0, 10, 10)
+    wait_for(lambda: capture.read(region, 10, 10) is not None)
+    # the off screen region doesn't widen the grab
+    assert screenshots.grabs[-1] == {
+        "top": 80,
+        "left": 150,
+        "width": 10,
+        "height": 10,
+    }
+    assert capture.read(off_screen, 10, 10) is None
+
+
+def test_thread_exits_with_the_last_region(service):
+    capture, screenshots = service
+    region = capture.add_region(0, 0, 0, 16, 16)
+    wait_for(lambda: capture.read(region, 4, 4) is not None)
+    capture.remove_region(region)
+    wait_for(lambda: capture._thread is None)
+    assert capture.read(region, 4, 4) is None
+
+    grabs = len(screenshots.grabs)
+    capture.add_region(0, 0, 0, 16, 16)
+    wait_for(lambda: len(screenshots.grabs) > grabs)
+
+
+def test_capture_gives_up_on_a_failing_screen(service):
+    capture, screenshots = service
+    screenshots.fail = True
+    region = capture.add_region(1, 0, 0, 16, 16)
+    wait_for(lambda: capture._failures.get(1) == MAX_FAILURES)
+    time.sleep(0.05)
+    assert len(screenshots.grabs) == MAX_FAILURES
+    assert capture.read(region, 4, 4) is None
+
+    # adding a region gives it another go
+    screenshots.fail = False
+    capture.add_region(1, 0, 0, 16, 16)
+    wait_for(lambda: capture.read(region, 4, 4) is not None)
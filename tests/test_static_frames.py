@@ -0,0 +1,63 @@
+import numpy as np
+
+from ledfx.effects.gradient import TemporalGradientEffect
+from ledfx.effects.singleColor import SingleColorEffect
+
+
+def make_effect(cls, **config):
+    effect = cls(None, config)
+    effect.pixels = np.zeros((10, 3))
+    return effect
+
+
+def test_single_color_is_static_once_rendered():
+    effect = make_effect(SingleColorEffect, color="#ff0000")
+    assert effect.static_frame() is None
+
+    effect.effect_loop()
+    frame = effect.static_frame()
+    assert frame is not None
+    np.testing.assert_array_equal(effect.pixels[0], [255, 0, 0])
+
+    # nothing is recalculated while the output can't change
+    effect.pixels = None
+    effect.effect_loop()
+    assert effect.pixels is None
+    assert effect.static_frame() == frame
+
+
+def test_config_update_ends_static_frame():
+    effect = make_effect(SingleColorEffect, color="#ff0000")
+    effect.effect_loop()
+    frame = effect.static_frame()
+
+    effect.update_config({"color": "#0000ff"})
+    assert effect.static_frame() is None
+    effect.effect_loop()
+    assert effect.static_frame() not in (None, frame)
+    np.testing.assert_array_equal(effect.pixels[0], [0, 0, 255])
+
+
+def test_render_racing_config_update_is_not_static():
+    effect = make_effect(SingleColorEffect, color="#ff0000")
+    config_version = effect._config_version
+    effect.update_config({"color": "#0000ff"})
+    # a render that started before the update finishes after it
+    effect.mark_static(config_version)
+    assert effect.static_frame() is None
+
+
+def test_modulated_effects_are_not_static():
+    effect = make_effect(SingleColorEffect, modulate=True)
+    effect.effect_loop()
+    assert effect.static_frame() is None
+
+
+def test_gradient_is_static_without_roll():
+    effect = make_effect(TemporalGradientEffect, gradient_roll=0)
+    effect.effect_loop()
+    assert effect.static_frame() is not None
+
+    rolling = make_effect(TemporalGradientEffect, gradient_roll=1)
+    rolling.effect_loop()
+    assert rolling.static_frame() is None
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from ledfx.transitions import Transitions
+
+MODES = [mode for mode in Transitions if mode != "None"]
+WEIGHTS = [0, 0.01, 0.25, 0.5, 0.5001, 0.75, 0.999, 1]
+
+
+class LegacyTransitions:
+    """The transitions as they were before the precomputed ranks"""
+
+    def __init__(self, transitions):
+        self.pixel_count = transitions.pixel_count
+        self.dissolve_array = transitions.dissolve_array
+        self.iris_array = transitions.iris_array
+
+    def add(self, x1, x2, weight):
+        np.multiply(x1, weight, x1)
+        x3 = np.multiply(x2, 1 - weight)
+        np.add(x1, x3, x1)
+
+    def dissolve(self, x1, x2, weight):
+        indexes = np.greater(self.dissolve_array, weight)
+        x1[indexes, :] = x2[indexes, :]
+
+    def push(self, x1, x2, weight):
+        idx = int((1 - weight) * self.pixel_count)
+        x2 = np.roll(x2, idx, axis=0)
+        x1[:idx, :] = x2[:idx, :]
+
+    def slide(self, x1, x2, weight):
+        idx = int((1 - weight) * self.pixel_count)
+        x1[:idx, :] = x2[:idx, :]
+
+    def iris(self, x1, x2, weight):
+        indexes = np.greater(self.iris_array, weight)
+        x1[indexes, :] = x2[indexes, :]
+
+    def throughWhite(self, x1, x2, weight):
+        if weight < 0.5:
+            np.clip(x2, weight * 2 * 255, None, out=x1)
+        else:
+            np.clip(x1, (1 - weight) * 2 * 255, None, out=x1)
+
+    def throughBlack(self, x1, x2, weight):
+        if weight < 0.5:
+            np.clip(x2, None, 255 * (1 - (weight * 2)), x1)
+        else:
+            np.clip(x1, None, 255 * 2 * (weight - 0.5), x1)
+
+
+def frames(pixel_count, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.random((pixel_count, 3)) * 255,
+        rng.random((pixel_count, 3)) * 255,
+    )
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("pixel_count", [1, 2, 7, 64, 301])
+def test_transition_matches_legacy(mode, pixel_count):
+    transitions = Transitions(pixel_count)
+    legacy = LegacyTransitions(transitions)
+    function = transitions[mode]
+    legacy_function = getattr(legacy, function.__name__)
+
+    for weight in WEIGHTS:
+        x1, x2 = frames(pixel_count)
+        expected = x1.copy()
+        legacy_function(expected, x2.copy(), weight)
+        function(transitions, x1, x2, weight)
+        np.testing.assert_array_equal(x1, expected)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_transition_leaves_old_frame_untouched(mode):
+    transitions = Transitions(50)
+    x1, x2 = frames(50)
+    old = x2.copy()
+    transitions[mode](transitions, x1, x2, 0.3)
+    np.testing.assert_array_equal(x2, old)
+
+
+def test_dissolve_at_weight_thresholds():
+    transitions = Transitions(100)
+    for weight in np.sort(transitions.dissolve_array)[::7]:
+        x1, x2 = frames(100)
+        expected = x1.copy()
+        LegacyTransitions(transitions).dissolve(expected, x2, weight)
+        transitions.dissolve(x1, x2, weight)
+        np.testing.assert_array_equal(x1, expected)
+
+
+@pytest.mark.parametrize(
+    "new_dtype, old_dtype",
+    [
+        (np.float32, np.float64),
+        (np.float64, np.float32),
+        (np.float32, np.uint8),
+    ],
+)
+def test_add_blends_mixed_types(new_dtype, old_dtype):
+    transitions = Transitions(64)
+    legacy = LegacyTransitions(transitions)
+    for weight in WEIGHTS:
+        x1, x2 = frames(64)
+        x1, x2 = x1.astype(new_dtype), x2.astype(old_dtype)
+        expected = x1.copy()
+        legacy.add(expected, x2, weight)
+        transitions.add(x1, x2, weight)
+        assert x1.dtype == new_dtype
+        np.testing.assert_allclose(x1, expected, rtol=1e-6)
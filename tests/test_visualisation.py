@@ -0,0 +1,185 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ledfx import visualisation
+from ledfx.devices.dummy import DummyDevice
+from ledfx.events import (
+    DeviceUpdateEvent,
+    Event,
+    VirtualUpdateEvent,
+)
+from ledfx.virtuals import Virtual
+from ledfx.visualisation import VisualisationSampler
+
+INTERVAL = 1 / 30
+
+
+class FakeEvents:
+    def __init__(self, *event_types):
+        self.listening = set(event_types)
+        self.fired = []
+
+    def has_listeners(self, event_type):
+        return event_type in self.listening
+
+    def fire_event(self, event):
+        self.fired.append(event)
+
+
+class FakeLoop:
+    """Holds on to scheduled calls until run, like the event loop would"""
+
+    def __init__(self):
+        self.calls = []
+
+    def call_soon_threadsafe(self, callback, *args):
+        self.calls.append((callback, args))
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for callback, args in calls:
+            callback(*args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(visualisation.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def sampler(clock):
+    ledfx = SimpleNamespace(
+        events=FakeEvents(Event.VISUALISATION_UPDATE, Event.DEVICE_UPDATE),
+        loop=FakeLoop(),
+    )
+    handled = []
+    sampler = VisualisationSampler(ledfx)
+    sampler.configure(handled.append, 30)
+    return sampler, ledfx, handled
+
+
+def test_events_get_a_copy_of_the_frame(sampler):
+    sampler, ledfx, handled = sampler
+    frame = np.full((10, 3), 100.0)
+    sampler.publish(
+        Event.DEVICE_UPDATE,
+        "device",
+        lambda: DeviceUpdateEvent("device", frame),
+    )
+    # the render thread reuses the buffer before the loop gets to it
+    frame[:] = 0
+    ledfx.loop.run()
+    np.testing.assert_array_equal(handled[0].pixels, 100.0)
+    np.testing.assert_array_equal(ledfx.events.fired[0].pixels, 100.0)
+
+
+def publish(sampler, vis_id, event_type=Event.VIRTUAL_UPDATE):
+    """Publishes a frame, returning whether its event was built"""
+    built = []
+
+    def make_event():
+        built.append(vis_id)
+        return VirtualUpdateEvent(vis_id, np.zeros((1, 3)))
+
+    sampler.publish(event_type, vis_id, make_event)
+    return bool(built)
+
+
+def test_each_id_is_sampled_at_the_visualisation_rate(sampler, clock):
+    sampler, ledfx, handled = sampler
+    assert publish(sampler, "first")
+    assert publish(sampler, "second")
+    clock.now += INTERVAL / 2
+    assert not publish(sampler, "first")
+    # a frame a little early still makes the sample
+    clock.now += INTERVAL * 0.4
+    assert publish(sampler, "first")
+    assert not publish(sampler, "first")
+    clock.now += INTERVAL
+    assert publish(sampler, "first")
+    assert publish(sampler, "second")
+    ledfx.loop.run()
+    assert [event.virtual_id for event in handled] == [
+        "first",
+        "second",
+        "first",
+        "first",
+        "second",
+    ]
+
+
+def test_missed_samples_are_not_caught_up(sampler, clock):
+    sampler, ledfx, handled = sampler
+    publish(sampler, "virtual")
+    clock.now += INTERVAL * 10
+    assert publish(sampler, "virtual")
+    assert not publish(sampler, "virtual")
+    clock.now += INTERVAL
+    assert publish(sampler, "virtual")
+
+
+def test_raw_listeners_get_every_frame(sampler):
+    sampler, ledfx, handled = sampler
+    for _ in range(3):
+        assert publish(sampler, "device", Event.DEVICE_UPDATE)
+    assert len(ledfx.events.fired) == 3
+    ledfx.loop.run()
+    assert len(handled) == 1
+
+
+def test_events_are_not_built_without_listeners(sampler, clock):
+    sampler, ledfx, handled = sampler
+    ledfx.events.listening = set()
+    assert not publish(sampler, "virtual")
+
+    # listeners without the visualisation being configured
+    ledfx.events.listening = {Event.VISUALISATION_UPDATE}
+    unconfigured = VisualisationSampler(ledfx)
+    assert not publish(unconfigured, "virtual")
+
+    # virtual updates are only listened to through the visualisation
+    assert publish(sampler, "virtual")
+    assert not publish(sampler, "virtual")
+    assert ledfx.events.fired == []
+
+
+def test_devices_and_virtuals_both_publish(sampler):
+    sampler, ledfx, handled = sampler
+    ledfx.config = {}
+    ledfx.visualisation = sampler
+
+    device = DummyDevice(
+        ledfx, DummyDevice.schema()({"name": "device", "pixel_count": 4})
+    )
+    device._id = "device"
+    device.priority_virtual = SimpleNamespace(id="virtual")
+    device.activate()
+    frame = np.full((4, 3), 255, dtype=np.uint8)
+    device.update_pixels("virtual", [(frame, 0, 3)])
+    device.deactivate()
+
+    virtual = Virtual.__new__(Virtual)
+    virtual._ledfx = ledfx
+    virtual._id = "virtual"
+    virtual._config = {"grouping": 2}
+    virtual.pixel_count = 4
+    virtual._fire_update_event(np.array([[1, 2, 3], [4, 5, 6]]))
+
+    ledfx.loop.run()
+    device_event, virtual_event = handled
+    assert isinstance(device_event, DeviceUpdateEvent)
+    assert device_event.device_id == "device"
+    np.testing.assert_array_equal(device_event.pixels, frame)
+    assert isinstance(virtual_event, VirtualUpdateEvent)
+    assert virtual_event.virtual_id == "virtual"
+    # the virtual's grouped pixels are spread back over the physical ones
+    np.testing.assert_array_equal(
+        virtual_event.pixels, [[1, 2, 3], [1, 2, 3], [4, 5, 6], [4, 5, 6]]
+    )
+    assert [event.event_type for event in ledfx.events.fired] == [
+        Event.DEVICE_UPDATE
+    ]
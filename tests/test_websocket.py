@@ -0,0 +1,210 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pybase64
+import pytest
+
+import ledfx.api.websocket as websocket
+from ledfx.api.websocket import (
+    BINARY_FRAME_DEVICE,
+    BINARY_FRAME_HEADER,
+    BINARY_FRAME_VERSION,
+    BINARY_MESSAGE_KEY,
+    ENCODED_MESSAGE_KEY,
+    EncodedEvent,
+    WebsocketBroadcaster,
+    WebsocketConnection,
+)
+from ledfx.config import Transmission
+from ledfx.events import (
+    Event,
+    Events,
+    VirtualPauseEvent,
+    VisualisationUpdateEvent,
+)
+
+SUBSCRIPTION_ID = 7
+
+
+def make_ledfx(configured_mode=Transmission.BASE64_COMPRESSED):
+    ledfx = SimpleNamespace(config={"transmission_mode": configured_mode})
+    # run listeners straight away rather than on an event loop
+    ledfx.loop = SimpleNamespace(
+        call_soon_threadsafe=lambda callback, event: callback(event)
+    )
+    ledfx.events = Events(ledfx)
+    return ledfx
+
+
+def make_connection(ledfx=None):
+    ledfx = ledfx or make_ledfx()
+    broadcaster = WebsocketBroadcaster(ledfx)
+    return WebsocketConnection(ledfx, broadcaster)
+
+
+def make_event(vis_id="my-virtual", is_device=False, shape=(2, 3)):
+    pixels = np.arange(shape[0] * shape[1] * 3, dtype=np.uint8).reshape(-1, 3)
+    rgb = pixels.tobytes()
+    return VisualisationUpdateEvent(
+        is_device,
+        vis_id,
+        pybase64.b64encode(rgb).decode("ASCII"),
+        shape,
+        rgb,
+    )
+
+
+def queued(connection):
+    messages = []
+    while not connection._sender_queue.empty():
+        message = connection._sender_queue.get_nowait()
+        if ENCODED_MESSAGE_KEY in message:
+            message = json.loads(message[ENCODED_MESSAGE_KEY])
+        messages.append(message)
+    return messages
+
+
+def send(connection, event):
+    connection.send_encoded_event(SUBSCRIPTION_ID, EncodedEvent(event))
+
+
+def set_mode(connection, mode):
+    connection.set_transmission_mode_handler(
+        {"id": 1, "type": "set_transmission_mode", "transmission_mode": mode}
+    )
+    return queued(connection)[0]
+
+
+def test_default_connection_sends_configured_json():
+    connection = make_connection()
+    event = make_event()
+    send(connection, event)
+    (message,) = queued(connection)
+    expected = {"id": SUBSCRIPTION_ID, "type": "event", **event.to_dict()}
+    assert message == json.loads(json.dumps(expected))
+    assert "rgb" not in message
+
+
+def test_binary_frames():
+    connection = make_connection()
+    assert set_mode(connection, Transmission.BINARY)["success"]
+
+    virtual = make_event()
+    device = make_event("my-device", is_device=True, shape=(1, 4))
+    messages = []
+    for event in (virtual, device, virtual):
+        send(connection, event)
+        messages.extend(queued(connection))
+
+    # each virtual/device is announced once, before its first frame
+    assert [m.get("type") for m in messages] == [
+        "visualisation_index",
+        None,
+        "visualisation_index",
+        None,
+        None,
+    ]
+    assert messages[0]["vis_id"] == "my-virtual"
+    assert messages[2] == {
+        "id": SUBSCRIPTION_ID,
+        "type": "visualisation_index",
+        "index": 1,
+        "is_device": True,
+        "vis_id": "my-device",
+    }
+
+    frames = [messages[1], messages[3], messages[4]]
+    expected = [
+        (virtual, 0, 0, 0),
+        (device, BINARY_FRAME_DEVICE, 1, 0),
+        (virtual, 0, 0, 1),
+    ]
+    for frame, (event, flags, index, sequence) in zip(frames, expected):
+        data = frame[BINARY_MESSAGE_KEY]
+        header = BINARY_FRAME_HEADER.unpack_from(data)
+        assert header == (
+            BINARY_FRAME_VERSION,
+            flags,
+            index,
+            *event.shape,
+            sequence,
+        )
+        assert data[BINARY_FRAME_HEADER.size :] == event.rgb
+
+
+@pytest.mark.parametrize(
+    "mode", [Transmission.BASE64_COMPRESSED, Transmission.UNCOMPRESSED]
+)
+def test_json_mode_negotiated_per_connection(mode):
+    # the event is encoded in the configured mode, the connection differs
+    configured_mode = (
+        Transmission.UNCOMPRESSED
+        if mode == Transmission.BASE64_COMPRESSED
+        else Transmission.BASE64_COMPRESSED
+    )
+    connection = make_connection(make_ledfx(configured_mode))
+    set_mode(connection, mode)
+    event = make_event()
+    send(connection, event)
+    (message,) = queued(connection)
+    pixels = np.frombuffer(event.rgb, dtype=np.uint8).reshape(-1, 3)
+    if mode == Transmission.BASE64_COMPRESSED:
+        assert pybase64.b64decode(message["pixels"]) == event.rgb
+    else:
+        assert message["pixels"] == pixels.T.tolist()
+
+
+def test_unknown_transmission_mode():
+    connection = make_connection()
+    message = set_mode(connection, "carrier-pigeon")
+    assert message["success"] is False
+    assert connection._transmission_mode is None
+
+
+def test_broadcast_encodes_each_event_once(monkeypatch):
+    ledfx = make_ledfx()
+    broadcaster = WebsocketBroadcaster(ledfx)
+    connections = [WebsocketConnection(ledfx, broadcaster) for _ in range(5)]
+    for i, connection in enumerate(connections):
+        broadcaster.subscribe(connection, i, Event.VISUALISATION_UPDATE)
+
+    encodes = []
+    dumps = json.dumps
+    monkeypatch.setattr(
+        websocket.json,
+        "dumps",
+        lambda obj, **kwargs: encodes.append(obj) or dumps(obj, **kwargs),
+    )
+    event = make_event()
+    ledfx.events.fire_event(event)
+
+    assert len(encodes) == 1
+    for i, connection in enumerate(connections):
+        (message,) = queued(connection)
+        assert message["id"] == i
+        assert message["pixels"] == event.pixels
+
+
+def test_broadcast_honours_filters_and_unsubscribe():
+    ledfx = make_ledfx()
+    broadcaster = WebsocketBroadcaster(ledfx)
+    everything, filtered = make_connection(ledfx), make_connection(ledfx)
+    broadcaster.subscribe(everything, 1, Event.VIRTUAL_PAUSE)
+    unsubscribe = broadcaster.subscribe(
+        filtered, 2, Event.VIRTUAL_PAUSE, {"virtual_id": "wanted"}
+    )
+
+    ledfx.events.fire_event(VirtualPauseEvent("wanted"))
+    ledfx.events.fire_event(VirtualPauseEvent("other"))
+    assert [m["virtual_id"] for m in queued(everything)] == [
+        "wanted",
+        "other",
+    ]
+    assert [m["virtual_id"] for m in queued(filtered)] == ["wanted"]
+
+    unsubscribe()
+    ledfx.events.fire_event(VirtualPauseEvent("wanted"))
+    assert queued(filtered) == []
+    assert len(queued(everything)) == 1
+    assert ledfx.events.has_listeners(Event.VIRTUAL_PAUSE)